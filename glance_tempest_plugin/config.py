@@ -0,0 +1,186 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from oslo_config import cfg
+from oslo_config import types
+
+glance_perf_group = cfg.OptGroup(name='glance_perf',
+                                 title='Glance performance test options')
+
+GlancePerfGroup = [
+    cfg.IntOpt('workers',
+               default=16,
+               min=1,
+               help='Number of concurrent workers used to create and delete '
+                    'the images the benchmarks are run against.'),
+    cfg.ListOpt('image_sizes',
+                item_type=types.Integer(min=0),
+                default=[1, 16, 64],
+                help='Sizes of the images uploaded and downloaded by the '
+                     'transfer benchmarks, in MiB.'),
+    cfg.ListOpt('concurrency_levels',
+                item_type=types.Integer(min=1),
+                default=[1, 4],
+                help='Numbers of concurrent transfers the throughput, '
+                     'image import and copy benchmarks are run with.'),
+    cfg.IntOpt('iterations',
+               default=2,
+               min=1,
+               help='Number of measured rounds of each benchmark.'),
+    cfg.IntOpt('warmup_rounds',
+               default=0,
+               min=0,
+               help='Number of rounds of each benchmark run before the '
+                    'measured ones and left out of the results.'),
+    cfg.ListOpt('catalog_sizes',
+                item_type=types.Integer(min=1),
+                default=[1000],
+                help='Numbers of images the image list benchmark seeds the '
+                     'project with.'),
+    cfg.ListOpt('page_sizes',
+                item_type=types.Integer(min=1),
+                default=[25, 100, 1000],
+                help='Page sizes the image list benchmark pages through the '
+                     'images with.'),
+    cfg.ListOpt('member_counts',
+                item_type=types.Integer(min=1),
+                default=[10, 50, 100],
+                help='Numbers of projects the image member benchmark shares '
+                     'an image with. Glance limits the members of an image '
+                     'to its image_member_quota option, 128 by default. '
+                     'The benchmark stops at the limit, skipping the '
+                     'counts above it.'),
+    cfg.IntOpt('metadef_namespaces',
+               default=500,
+               min=1,
+               help='Number of namespaces the metadef catalog benchmark '
+                    'creates.'),
+    cfg.IntOpt('metadef_objects',
+               default=50,
+               min=0,
+               help='Number of objects in each namespace of the metadef '
+                    'catalog benchmark.'),
+    cfg.IntOpt('metadef_properties',
+               default=100,
+               min=0,
+               help='Number of properties in each namespace of the metadef '
+                    'catalog benchmark.'),
+    cfg.IntOpt('metadef_tags',
+               default=200,
+               min=0,
+               help='Number of tags in each namespace of the metadef '
+                    'catalog benchmark.'),
+    cfg.ListOpt('tag_counts',
+                item_type=types.Integer(min=1),
+                default=[10, 100, 1000, 10000],
+                help='Numbers of tags the metadef tag creation benchmark '
+                     'creates in a namespace.'),
+    cfg.ListOpt('tag_batch_sizes',
+                item_type=types.Integer(min=1),
+                default=[100, 1000],
+                help='Numbers of tags per call the metadef tag creation '
+                     'benchmark creates the tags with, besides all of them '
+                     'in one call and one per call.'),
+    cfg.ListOpt('import_methods',
+                default=['glance-direct'],
+                help='Import methods the image import benchmark runs, '
+                     'among those the image service enables. The '
+                     'multi-store import benchmark uses the first one '
+                     'enabled. web-download needs web_download_port set '
+                     'to a port the image service imports from.'),
+    cfg.ListOpt('store_counts',
+                item_type=types.Integer(min=1),
+                default=[1, 2, 4],
+                help='Numbers of stores the multi-store import benchmark '
+                     'imports each image to at once. Counts higher than the '
+                     'number of writable stores of the image service are '
+                     'skipped.'),
+    cfg.IntOpt('copy_images',
+               default=16,
+               min=1,
+               help='Number of images the image copy benchmark copies to '
+                    'another store at each image size and concurrency '
+                    'level.'),
+    cfg.IntOpt('copy_retries',
+               default=2,
+               min=0,
+               help='Number of times the image copy benchmark retries a '
+                    'copy which failed or conflicted with another import.'),
+    cfg.FloatOpt('max_poll_interval',
+                 default=2.0,
+                 min=0,
+                 help='Longest interval, in seconds, the image copy '
+                      'benchmark polls the images at. The interval doubles '
+                      'from 0.05s while a copy makes no progress.'),
+    cfg.HostAddressOpt('web_download_host',
+                       default='127.0.0.1',
+                       help='Address of the test node the image service '
+                            'fetches the web-download imports of the image '
+                            'import benchmark from.'),
+    cfg.PortOpt('web_download_port',
+                default=0,
+                help='Port the web-download imports are served on, 0 to '
+                     'pick a free one. By default, glance only imports '
+                     'from ports 80 and 443, see its [import_filtering_opts] '
+                     'allowed_ports option.'),
+    cfg.BoolOpt('keep_alive',
+                default=True,
+                help='Whether the clients of the tests share keep-alive '
+                     'connections to the services, rather than opening a '
+                     'connection for every request as tempest does.'),
+    cfg.IntOpt('connection_pools',
+               default=10,
+               min=1,
+               help='Number of hosts the shared connections are kept open '
+                    'to.'),
+    cfg.IntOpt('connection_pool_size',
+               default=16,
+               min=1,
+               help='Number of connections kept open to each host. Set it '
+                    'to at least the highest number of concurrent requests '
+                    'the tests make.'),
+    cfg.IntOpt('load_requests',
+               default=0,
+               min=0,
+               help='Number of times the RBAC tests repeat each read and '
+                    'each call expected to fail once it has been checked. '
+                    'The latencies are published as the rbac_load report '
+                    'of each test. 0 disables the load mode.'),
+    cfg.IntOpt('load_workers',
+               default=1,
+               min=1,
+               help='Number of concurrent workers making the calls repeated '
+                    'by the RBAC tests load mode.'),
+    cfg.StrOpt('api_calls_file',
+               help='File every call made by the RBAC tests is appended to, '
+                    'one JSON document per line, with its test, persona, '
+                    'expected and actual status, wall time and response '
+                    'size.'),
+    cfg.BoolOpt('attach_api_calls',
+                default=False,
+                help='Whether the calls made by each RBAC test are attached '
+                     'to its result as JSON lines.'),
+    cfg.Opt('latency_slo',
+            type=types.Dict(value_type=types.Float(min=0)),
+            default={},
+            help='Latency thresholds, in seconds, request latencies '
+                 'must stay under in every benchmark and the RBAC tests '
+                 'load mode, keyed by percentile, for example '
+                 'p95:0.5,p99:2. The image transfer benchmarks check '
+                 'the upload and download calls, the import and copy '
+                 'benchmarks the import calls. A test fails if a '
+                 'threshold is exceeded, after publishing its report.'),
+    cfg.StrOpt('output_dir',
+               help='Directory the benchmark reports are written to as '
+                    'JSON. The reports are always attached to the test '
+                    'results.'),
+]
@@ -0,0 +1,398 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Index the tests of the plugin without importing them.
+
+The test modules are parsed rather than imported, so the tests can be
+listed in a few milliseconds, without loading tempest. The IDs listed are
+the ones tempest reports, attributes included, so they can be passed to
+``tempest run --load-list``, which runs them without the discovery pass
+stestr makes to resolve a ``--regex``::
+
+    $ python -m glance_tempest_plugin.manifest 'ImageProjectAdminTests' \\
+        > tests.txt
+    $ tempest run --load-list tests.txt
+
+The index can also be written to a manifest once, for example when
+building the CI image, and read from there::
+
+    $ python -m glance_tempest_plugin.manifest --write manifest.json
+    $ python -m glance_tempest_plugin.manifest --manifest manifest.json \\
+        'test_image_throughput'
+
+With the durations of a previous run, the tests can be spread over
+workers so they all finish at about the same time, either as a worker
+file for a single run or as one load list per node::
+
+    $ stestr last --subunit > last.subunit
+    $ python -m glance_tempest_plugin.manifest --durations last.subunit \\
+        --workers 4 --worker-file workers.yaml
+    $ tempest run --worker-file workers.yaml
+    $ python -m glance_tempest_plugin.manifest --durations last.subunit \\
+        --workers 4 --worker 0 > tests.txt
+"""
+
+import argparse
+import ast
+import heapq
+import json
+import os
+import re
+import sys
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DIR = os.path.join(BASE_PATH, 'glance_tempest_plugin', 'tests')
+
+
+def _dotted(node):
+    """Return the dotted name of a Name or Attribute node."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        value = _dotted(node.value)
+        return value and '%s.%s' % (value, node.attr)
+    return None
+
+
+def _strings(node):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [item.value for item in node.elts
+                if isinstance(item, ast.Constant)]
+    return []
+
+
+def _test_method(node):
+    """Return the idempotent ID and attributes of a test method."""
+    method = {'idempotent_id': None, 'attrs': [], 'abstract': False}
+    for decorator in node.decorator_list:
+        if isinstance(decorator, ast.Call):
+            name = _dotted(decorator.func) or ''
+            if name.split('.')[-1] == 'idempotent_id' and decorator.args:
+                method['idempotent_id'] = _strings(decorator.args[0])[0]
+            elif name.split('.')[-1] == 'attr':
+                for keyword in decorator.keywords:
+                    if keyword.arg == 'type':
+                        method['attrs'] += _strings(keyword.value)
+        elif (_dotted(decorator) or '').endswith('abstractmethod'):
+            method['abstract'] = True
+    return method
+
+
+def _parse_module(path, module):
+    """Return the classes defined in a module, by qualified name."""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    names = {}
+    classes = {}
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                names[alias.asname or alias.name] = alias.name
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            for alias in node.names:
+                names[alias.asname or alias.name] = '%s.%s' % (node.module,
+                                                               alias.name)
+        elif isinstance(node, ast.ClassDef):
+            bases = []
+            for base in node.bases:
+                name = _dotted(base)
+                if name:
+                    head, _, tail = name.partition('.')
+                    bases.append('.'.join(filter(None, [names.get(head, head),
+                                                        tail])))
+            methods = dict((item.name, _test_method(item))
+                           for item in node.body
+                           if isinstance(item, ast.FunctionDef) and
+                           item.name.startswith('test'))
+            credentials = None
+            for item in node.body:
+                if (isinstance(item, ast.Assign) and
+                        any(isinstance(target, ast.Name) and
+                            target.id == 'credentials'
+                            for target in item.targets)):
+                    credentials = _strings(item.value)
+            names[node.name] = '%s.%s' % (module, node.name)
+            classes[names[node.name]] = {'module': module,
+                                         'class': node.name,
+                                         'bases': bases,
+                                         'methods': methods,
+                                         'credentials': credentials}
+    return classes
+
+
+def _lineage(classes, name):
+    """Return the plugin classes a class inherits from, in lookup order.
+
+    The second value is whether any base is defined outside the plugin,
+    which is how test case classes are told apart from templates.
+    """
+    lineage = []
+    external = False
+    for base in classes[name]['bases']:
+        if base not in classes:
+            external = external or base != 'object'
+            continue
+        base_lineage, base_external = _lineage(classes, base)
+        external = external or base_external
+        lineage += [cls for cls in base_lineage if cls not in lineage]
+    return [name] + [cls for cls in lineage if cls != name], external
+
+
+def test_id(test):
+    """Return the ID tempest reports for a test of the manifest."""
+    attrs = list(test['attrs'])
+    if test['idempotent_id']:
+        attrs.append('id-%s' % test['idempotent_id'])
+    name = '%s.%s.%s' % (test['module'], test['class'], test['test'])
+    if attrs:
+        name += '[%s]' % ','.join(sorted(attrs))
+    return name
+
+
+def build(test_dir=TEST_DIR, base_path=BASE_PATH):
+    """Index the tests found under test_dir, as discovery would.
+
+    :returns: The manifest, a dict with the tests under the 'tests' key,
+              keyed by test ID. Each test has its module, class, test
+              method name, idempotent ID, attributes and persona, the
+              first credentials of its class. Its duration is None until
+              set by add_durations().
+    """
+    classes = {}
+    for dirpath, dirnames, filenames in os.walk(test_dir):
+        # Like discovery, only descend into packages.
+        dirnames[:] = [name for name in dirnames
+                       if os.path.exists(os.path.join(dirpath, name,
+                                                      '__init__.py'))]
+        for filename in filenames:
+            if not filename.endswith('.py'):
+                continue
+            path = os.path.join(dirpath, filename)
+            module = os.path.splitext(
+                os.path.relpath(path, base_path))[0].replace(os.sep, '.')
+            for name, cls in _parse_module(path, module).items():
+                # Modules not matching the discovery pattern, such as the
+                # base modules, only hold classes the tests inherit from.
+                cls['discovered'] = filename.startswith('test')
+                classes[name] = cls
+
+    tests = {}
+    for name, cls in sorted(classes.items()):
+        if not cls['discovered']:
+            continue
+        lineage, external = _lineage(classes, name)
+        if not external:
+            continue
+        methods = {}
+        credentials = None
+        for ancestor in lineage:
+            for method, info in classes[ancestor]['methods'].items():
+                methods.setdefault(method, info)
+            credentials = credentials or classes[ancestor]['credentials']
+        for method, info in sorted(methods.items()):
+            if info['abstract']:
+                continue
+            test = {'module': cls['module'], 'class': cls['class'],
+                    'test': method,
+                    'idempotent_id': info['idempotent_id'],
+                    'attrs': sorted(info['attrs']),
+                    'persona': credentials[0] if credentials else None,
+                    'duration': None}
+            tests[test_id(test)] = test
+    return {'tests': tests}
+
+
+def load(path):
+    """Read a manifest written by write()."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def write(manifest, path):
+    """Write a manifest as JSON."""
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def by_idempotent_id(manifest):
+    """Return the IDs of the tests of a manifest by idempotent ID.
+
+    A test inherited by several classes has the same idempotent ID in all
+    of them, so each idempotent ID maps to a list of test IDs.
+    """
+    ids = {}
+    for name, test in sorted(manifest['tests'].items()):
+        if test['idempotent_id']:
+            ids.setdefault(test['idempotent_id'], []).append(name)
+    return ids
+
+
+def select(manifest, regexes=None):
+    """Return the manifest of the tests matching any of the regexes.
+
+    Like stestr, the regexes are searched for in the test IDs.
+    """
+    if not regexes:
+        return manifest
+    patterns = [re.compile(regex) for regex in regexes]
+    return dict(manifest, tests=dict(
+        (name, test) for name, test in manifest['tests'].items()
+        if any(pattern.search(name) for pattern in patterns)))
+
+
+def read_durations(stream):
+    """Read the durations of the tests of a subunit v2 stream.
+
+    :param stream: A binary file object, such as the output of
+                   ``stestr last --subunit``.
+    :returns: The durations in seconds, keyed by test ID.
+    """
+    # Only needed to schedule tests, so not loaded to list them.
+    import subunit
+    import testtools
+
+    durations = {}
+
+    def on_test(test):
+        start, stop = test['timestamps']
+        if test['status'] in ('success', 'fail') and start and stop:
+            durations[test['id']] = (stop - start).total_seconds()
+
+    result = testtools.StreamToDict(on_test)
+    result.startTestRun()
+    subunit.ByteStreamToStreamResult(
+        stream, non_subunit_name='stdout').run(result)
+    result.stopTestRun()
+    return durations
+
+
+def _name(test_id):
+    return test_id.split('[')[0]
+
+
+def add_durations(manifest, durations):
+    """Set the duration of the tests of a manifest.
+
+    The durations are matched to the tests by test ID, ignoring the
+    attributes, which change as tests are tagged.
+    """
+    durations = dict((_name(name), duration)
+                     for name, duration in durations.items())
+    for name, test in manifest['tests'].items():
+        if _name(name) in durations:
+            test['duration'] = durations[_name(name)]
+    return manifest
+
+
+def schedule(manifest, workers, by_class=False):
+    """Split the tests of a manifest between workers.
+
+    The tests are given out longest first, each to the worker with the
+    least work so far. Tests without a duration are assumed to take the
+    mean duration of the others.
+
+    :param manifest: A manifest, with durations.
+    :param workers: The number of workers.
+    :param by_class: Keep the tests of a class on the same worker, so its
+                     class fixtures are only set up once.
+    :returns: A list with the test IDs and total duration of each worker.
+    """
+    known = [test['duration'] for test in manifest['tests'].values()
+             if test['duration'] is not None]
+    default = sum(known) / len(known) if known else 1.0
+
+    groups = {}
+    for name, test in manifest['tests'].items():
+        key = (test['module'], test['class']) if by_class else name
+        group = groups.setdefault(key, {'tests': [], 'duration': 0.0})
+        group['tests'].append(name)
+        if test['duration'] is None:
+            group['duration'] += default
+        else:
+            group['duration'] += test['duration']
+
+    plan = [{'tests': [], 'duration': 0.0} for _ in range(workers)]
+    loads = [(0.0, index) for index in range(workers)]
+    for key, group in sorted(groups.items(),
+                             key=lambda item: (-item[1]['duration'],
+                                               item[0])):
+        duration, index = heapq.heappop(loads)
+        plan[index]['tests'] += sorted(group['tests'])
+        plan[index]['duration'] += group['duration']
+        heapq.heappush(loads, (duration + group['duration'], index))
+    return plan
+
+
+def write_worker_file(plan, path):
+    """Write a plan as a worker file for stestr and tempest run."""
+    with open(path, 'w') as f:
+        for worker in plan:
+            f.write('- worker:\n')
+            for name in worker['tests']:
+                f.write("  - '^%s$'\n" % re.escape(name).replace("'",
+                                                                 "''"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='List the tests of the plugin without importing them.')
+    parser.add_argument('regex', nargs='*',
+                        help='Only include the tests whose ID matches one '
+                             'of these regular expressions.')
+    parser.add_argument('--manifest',
+                        help='Read the tests from this manifest instead of '
+                             'parsing the test modules.')
+    parser.add_argument('--write', metavar='PATH',
+                        help='Write the manifest of the tests to PATH '
+                             'instead of listing their IDs.')
+    parser.add_argument('--durations', metavar='SUBUNIT',
+                        help='Read the durations of the tests from this '
+                             'subunit v2 stream.')
+    parser.add_argument('--workers', type=int,
+                        help='Split the tests between this many workers '
+                             'and print how long each worker takes.')
+    parser.add_argument('--by-class', action='store_true',
+                        help='Keep the tests of a class on one worker.')
+    parser.add_argument('--worker', type=int,
+                        help='Only list the tests of this worker, from 0.')
+    parser.add_argument('--worker-file', metavar='PATH',
+                        help='Write the split as a worker file for '
+                             'tempest run --worker-file.')
+    args = parser.parse_args(argv)
+
+    manifest = load(args.manifest) if args.manifest else build()
+    manifest = select(manifest, args.regex)
+    if args.durations:
+        with open(args.durations, 'rb') as f:
+            add_durations(manifest, read_durations(f))
+    if args.write:
+        write(manifest, args.write)
+    elif args.workers:
+        plan = schedule(manifest, args.workers, args.by_class)
+        if args.worker_file:
+            write_worker_file(plan, args.worker_file)
+        if args.worker is not None:
+            for name in plan[args.worker]['tests']:
+                sys.stdout.write(name + '\n')
+        else:
+            for index, worker in enumerate(plan):
+                sys.stdout.write('worker %d: %d tests, %.1fs\n'
+                                 % (index, len(worker['tests']),
+                                    worker['duration']))
+    else:
+        for name in sorted(manifest['tests']):
+            sys.stdout.write(name + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -16,8 +16,11 @@
 
 import os
 
+from tempest import config
 from tempest.test_discover import plugins
 
+from glance_tempest_plugin import config as project_config
+
 
 class GlanceTempestPlugin(plugins.TempestPlugin):
     def load_tests(self):
@@ -28,7 +31,9 @@ class GlanceTempestPlugin(plugins.TempestPlugin):
         return full_test_dir, base_path
 
     def register_opts(self, conf):
-        pass
+        config.register_opt_group(conf, project_config.glance_perf_group,
+                                  project_config.GlancePerfGroup)
 
     def get_opt_lists(self):
-        pass
+        return [(project_config.glance_perf_group.name,
+                 project_config.GlancePerfGroup)]
@@ -0,0 +1,119 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import json
+import math
+import os
+
+from testtools import content
+
+MB = 1000 * 1000
+MiB = 1024 * 1024
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of a list of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(math.ceil(percent / 100.0 * len(ordered))), 1)
+    return ordered[rank - 1]
+
+
+def summarize(latencies):
+    """Summarize a list of latencies, in seconds."""
+    if not latencies:
+        return {'count': 0}
+    return {
+        'count': len(latencies),
+        'min': min(latencies),
+        'max': max(latencies),
+        'mean': sum(latencies) / len(latencies),
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+    }
+
+
+def throughput(size, seconds):
+    """Return the throughput of transferring size bytes, in MB/s."""
+    if not seconds:
+        return None
+    return size / seconds / MB
+
+
+def publish(test, name, report, output_dir=None):
+    """Publish the report of a benchmark.
+
+    The report is attached to the result of the test as JSON and, if
+    output_dir is set, written to <output_dir>/<name>.json.
+
+    :param test: The test case the benchmark ran in.
+    :param name: The name of the benchmark.
+    :param report: A JSON serializable dict.
+    :param output_dir: The directory to write the report to.
+    """
+    test.addDetail(name, content.json_content(report))
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, '%s.json' % name)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+class Histogram(object):
+    """Latencies counted in buckets of doubling width.
+
+    The first bucket holds latencies up to 1ms, the next one up to 2ms,
+    and so on up to the last one, which holds everything slower.
+    """
+
+    bounds = [0.001 * 2 ** i for i in range(16)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.values = []
+
+    def add(self, seconds):
+        self.values.append(seconds)
+        for i, bound in enumerate(self.bounds):
+            if seconds <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def to_dict(self):
+        labels = ['le_%gms' % (bound * 1000) for bound in self.bounds]
+        labels.append('inf')
+        return {
+            'buckets': dict((label, count)
+                            for label, count in zip(labels, self.counts)
+                            if count),
+            'latency': summarize(self.values),
+        }
+
+
+def slo_violations(name, latency, slo):
+    """Compare a latency summary against latency thresholds.
+
+    :param name: What the latencies are of, used in the messages.
+    :param latency: A summary returned by summarize().
+    :param slo: The thresholds, in seconds, keyed by the names of the
+                summary values, such as p95.
+    :returns: A message for every threshold exceeded.
+    """
+    violations = []
+    for key, threshold in sorted(slo.items()):
+        value = latency.get(key)
+        if value is not None and value > threshold:
+            violations.append('%s: %s latency of %.3fs exceeds %.3fs'
+                              % (name, key, value, threshold))
+    return violations
@@ -0,0 +1,80 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from concurrent import futures
+import threading
+
+from tempest.lib.common.utils import test_utils
+
+# Resources are deleted one tier after the other, so a resource is only
+# deleted once everything depending on it is gone. Resources within a tier
+# are deleted in parallel. Users leased from the pool are only returned to it
+# once everything created against their project is gone.
+TIERS = [
+    ['image_member'],
+    ['image', 'namespace'],
+    ['user'],
+    ['project'],
+    ['leased_user'],
+]
+
+
+class CleanupManager(object):
+    """Delete the resources created by a test in batches.
+
+    Registering a cleanup for each resource deletes them one after the
+    other, so teardown takes one round-trip per resource. The manager
+    collects the resources by type instead and deletes them tier by tier,
+    which takes one round-trip per tier.
+    """
+
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._resources = {}
+
+    def add(self, kind, delete, *args, **kwargs):
+        """Register a resource to delete.
+
+        :param kind: The type of the resource, one of the types in TIERS.
+        :param delete: The callable deleting, or releasing, the resource.
+                       NotFound errors it raises are ignored.
+        """
+        if not any(kind in tier for tier in TIERS):
+            raise ValueError('Unknown resource type %s' % kind)
+        with self._lock:
+            self._resources.setdefault(kind, []).append(
+                (delete, args, kwargs))
+
+    def cleanup(self):
+        """Delete every registered resource.
+
+        :raises: The first error raised while deleting a resource, after an
+                 attempt has been made to delete all of them.
+        """
+        with self._lock:
+            resources, self._resources = self._resources, {}
+        errors = []
+        for tier in TIERS:
+            calls = [call for kind in tier
+                     for call in resources.get(kind, [])]
+            if not calls:
+                continue
+            workers = min(self.max_workers, len(calls))
+            with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = [
+                    executor.submit(test_utils.call_and_ignore_notfound_exc,
+                                    delete, *args, **kwargs)
+                    for delete, args, kwargs in calls]
+            errors.extend(future.exception() for future in pending
+                          if future.exception() is not None)
+        if errors:
+            raise errors[0]
@@ -0,0 +1,131 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Keep-alive HTTP connections shared by the service clients.
+
+tempest's RestClient sends every request with "Connection: close" and
+drops its connection pool afterwards, so each request opens a connection,
+and a TLS session, of its own. The PooledHttp here keeps connections open
+between requests and is shared by every client with the same TLS and
+timeout settings, whichever credentials they use.
+"""
+import threading
+
+from tempest.lib.common import http
+from tempest.lib.common import rest_client
+import urllib3
+
+# Methods which may be sent again on a new connection if the one they
+# were sent on turns out to have been closed by the server.
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'])
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class Response(dict):
+    """The response headers, in the form RestClient expects."""
+
+    def __init__(self, info, url):
+        for key, value in info.getheaders().items():
+            self[str(key).lower()] = value
+        self.status = info.status
+        self['status'] = str(self.status)
+        self.reason = info.reason
+        self.version = info.version
+        self['content-location'] = url
+
+
+class PooledHttp(urllib3.PoolManager):
+    """A drop-in replacement for tempest's ClosingHttp keeping connections.
+
+    Up to maxsize connections to each host are kept open once their
+    response has been read, or released for streamed ones. More are opened
+    when they are all in use, but not kept.
+
+    Requests are sent one at a time on a connection: urllib3 doesn't
+    pipeline. A request which fails because the server closed its
+    connection while it sat in the pool is sent again on a new one, if its
+    method is idempotent and its body can be sent again.
+
+    :param follow_redirects: Whether to follow up to 5 redirects.
+    :param num_pools: The number of hosts connections are kept to.
+    :param maxsize: The number of connections kept to each host.
+    :param connection_pool_kw: The TLS and timeout settings of the
+                               connections.
+    """
+
+    def __init__(self, follow_redirects=True, num_pools=10, maxsize=10,
+                 **connection_pool_kw):
+        self.follow_redirects = follow_redirects
+        super().__init__(num_pools=num_pools, maxsize=maxsize, block=False,
+                         **connection_pool_kw)
+
+    def _retries(self, method, body):
+        replayable = body is None or isinstance(body, (bytes, str))
+        resend = int(method.upper() in IDEMPOTENT_METHODS and replayable)
+        if self.follow_redirects:
+            return urllib3.util.Retry(total=None, connect=1, read=resend,
+                                      status=0, other=0, redirect=5,
+                                      raise_on_redirect=False)
+        return urllib3.util.Retry(total=None, connect=1, read=resend,
+                                  status=0, other=0, redirect=False)
+
+    def request(self, url, method, *args, **kwargs):
+        retries = self._retries(method, kwargs.get('body'))
+        r = super().request(method, url, retries=retries, *args, **kwargs)
+        if not kwargs.get('preload_content', True):
+            # A streamed response, which keeps its connection until the
+            # caller releases it.
+            return r, b''
+        return Response(r, url), r.data
+
+
+def get_pool(follow_redirects=True, num_pools=10, maxsize=10,
+             **connection_pool_kw):
+    """Return the PooledHttp shared by clients with these settings."""
+    key = (follow_redirects, num_pools, maxsize,
+           tuple(sorted(connection_pool_kw.items())))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = PooledHttp(follow_redirects, num_pools, maxsize,
+                                     **connection_pool_kw)
+        return _pools[key]
+
+
+def share(client, num_pools=10, maxsize=10):
+    """Make a RestClient send its requests on shared connections.
+
+    Clients going through a proxy are left alone.
+
+    :returns: Whether the client now uses a shared PooledHttp.
+    """
+    http_obj = getattr(client, 'http_obj', None)
+    if isinstance(http_obj, PooledHttp):
+        return True
+    if type(http_obj) is not http.ClosingHttp:
+        return False
+    client.http_obj = get_pool(http_obj.follow_redirects, num_pools, maxsize,
+                               **http_obj.connection_pool_kw)
+    return True
+
+
+def share_all(manager, num_pools=10, maxsize=10):
+    """Make every RestClient of a client manager use shared connections.
+
+    :returns: The number of clients sharing connections.
+    """
+    clients = list(vars(manager).values())
+    auth_client = getattr(manager.auth_provider, 'auth_client', None)
+    if auth_client is not None:
+        clients.append(auth_client)
+    return sum(share(client, num_pools, maxsize) for client in clients
+               if isinstance(client, rest_client.RestClient))
@@ -0,0 +1,34 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from tempest import clients
+from tempest import config
+
+from glance_tempest_plugin.services.clients import connection
+
+CONF = config.CONF
+
+
+class Manager(clients.Manager):
+    """A client manager whose clients share keep-alive connections.
+
+    Test classes use it by setting their client_manager to it. Unless the
+    [glance_perf] keep_alive option is disabled, the REST clients of every
+    manager, whichever credentials they are for, send their requests on
+    the connections of the same pool.
+    """
+
+    def __init__(self, credentials, scope='project'):
+        super().__init__(credentials, scope=scope)
+        if CONF.glance_perf.keep_alive:
+            connection.share_all(
+                self, num_pools=CONF.glance_perf.connection_pools,
+                maxsize=CONF.glance_perf.connection_pool_size)
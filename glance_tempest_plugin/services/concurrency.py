@@ -0,0 +1,63 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from concurrent import futures
+
+
+class FixtureBuilder(object):
+    """Create independent test fixtures in parallel.
+
+    Creates are queued with :meth:`add` and issued together by
+    :meth:`build`, so setting up a batch of fixtures takes as long as the
+    slowest create rather than the sum of all of them.
+
+    Cleanups, for builders given an add_cleanup, are only registered once
+    every create has finished, and in the order the creates were added,
+    so teardown runs in the same order no matter which create completed
+    first.
+    """
+
+    def __init__(self, add_cleanup=None, max_workers=8):
+        self.add_cleanup = add_cleanup
+        self.max_workers = max_workers
+        self._calls = []
+
+    def add(self, create, *args, cleanup=None, **kwargs):
+        """Queue a create.
+
+        :param create: The callable creating the fixture.
+        :param cleanup: An optional callable registered through add_cleanup
+                        if the create succeeds. It is called with the
+                        result of the create.
+        """
+        if cleanup is not None and self.add_cleanup is None:
+            raise ValueError('A cleanup needs a builder with add_cleanup')
+        self._calls.append((create, args, kwargs, cleanup))
+
+    def build(self):
+        """Issue every queued create and wait for them to finish.
+
+        :returns: The results of the creates, in the order they were added.
+        :raises: The first exception raised by a create, after the cleanups
+                 of all the creates that succeeded have been registered.
+        """
+        calls, self._calls = self._calls, []
+        if not calls:
+            return []
+        workers = min(self.max_workers, len(calls))
+        with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = [executor.submit(create, *args, **kwargs)
+                       for create, args, kwargs, _ in calls]
+
+        for (_, _, _, cleanup), future in zip(calls, pending):
+            if cleanup is not None and future.exception() is None:
+                self.add_cleanup(cleanup, future.result())
+        return [future.result() for future in pending]
@@ -0,0 +1,232 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import atexit
+import collections
+import datetime
+import threading
+
+from tempest.common import credentials_factory
+from tempest import config
+from tempest.lib import auth
+from tempest.lib.common.utils import data_utils
+from tempest.lib.common.utils import test_utils
+from tempest.lib import exceptions
+
+from glance_tempest_plugin.services.clients import manager
+
+CONF = config.CONF
+
+_pool = None
+_pool_lock = threading.Lock()
+_role_ids = {}
+_role_ids_lock = threading.Lock()
+
+
+class TokenCache(object):
+    """Process-wide cache of auth data keyed by credentials.
+
+    Every auth provider built for the same credentials would otherwise
+    fetch a token of its own. Providers primed through the cache share the
+    first one instead, until it is about to expire.
+    """
+
+    # Entries are refreshed this long before their token expires, so a
+    # primed provider never starts out with a token about to be rejected.
+    expiry_margin = datetime.timedelta(seconds=120)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key_locks = collections.defaultdict(threading.Lock)
+        self._auth_data = {}
+
+    @staticmethod
+    def _key(auth_provider):
+        creds = auth_provider.credentials
+        return (auth_provider.auth_url, auth_provider.scope,
+                tuple(sorted((attr, getattr(creds, attr))
+                             for attr in creds.get_init_attributes())))
+
+    def prime(self, auth_provider):
+        """Give auth_provider a cached token, fetching one if needed."""
+        key = self._key(auth_provider)
+        auth_provider.token_expiry_threshold = self.expiry_margin
+        with self._lock:
+            key_lock = self._key_locks[key]
+        # Only one thread fetches a token for a given key, the others wait
+        # for it and use it.
+        with key_lock:
+            auth_data = self._auth_data.get(key)
+            if auth_data is None or auth_provider.is_expired(auth_data):
+                auth_provider.set_auth()
+                self._auth_data[key] = auth_provider.cache
+            else:
+                auth_provider.cache = auth_data
+                auth_provider.fill_credentials()
+        return auth_provider
+
+
+_token_cache = TokenCache()
+
+
+def get_role_id(roles_client, name):
+    """Return the ID of a role, looking it up once per process."""
+    with _role_ids_lock:
+        if name not in _role_ids:
+            _role_ids[name] = roles_client.list_roles(
+                name=name)['roles'][0]['id']
+        return _role_ids[name]
+
+
+def get_manager(creds, scope='project'):
+    """Return a client manager for creds holding a cached token."""
+    client_manager = manager.Manager(credentials=creds, scope=scope)
+    _token_cache.prime(client_manager.auth_provider)
+    return client_manager
+
+
+class PooledUser(object):
+    """A member user leased from a :class:`UserPool`."""
+
+    def __init__(self, user_id, project_id, client, key):
+        self.user_id = user_id
+        self.project_id = project_id
+        self.client = client
+        # The pool slot this user goes back to: the project ID it was
+        # requested for, or None if it owns a project of its own.
+        self.key = key
+
+
+class UserPool(object):
+    """Pool of member users leased to tests.
+
+    Creating a user, a project and a role assignment, and then fetching a
+    token for them, costs several identity round-trips. The pool does that
+    once per user and hands the same user out again after the test holding
+    it has finished.
+
+    Users leased without a project ID each own a project of their own, so a
+    test never sees resources created by another test holding a lease at
+    the same time. Users leased for a project ID are members of that
+    project. The pool grows on demand and only keeps as many users as were
+    leased at once. Everything it created is deleted when the worker
+    process exits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._free = collections.defaultdict(list)
+        self._user_ids = []
+        self._project_ids = []
+        self._admin = None
+
+    @property
+    def admin(self):
+        # The pool outlives every test class, so it can not use the admin
+        # credentials dynamically created for a class. Use the configured
+        # admin, the same way the dynamic credential provider does.
+        if self._admin is None:
+            creds = credentials_factory.get_configured_admin_credentials()
+            if creds.system:
+                scope = 'system'
+            elif (CONF.identity.admin_domain_scope and
+                  (creds.domain_id or creds.domain_name)):
+                scope = 'domain'
+            else:
+                scope = 'project'
+            self._admin = get_manager(creds, scope=scope)
+        return self._admin
+
+    def lease(self, project_id=None):
+        """Lease a member user.
+
+        :param project_id: The project the user should be a member of. If
+                           not set, the user is a member of a project of its
+                           own.
+        :returns: A :class:`PooledUser`.
+        """
+        with self._lock:
+            free = self._free[project_id]
+            if free:
+                return free.pop()
+        return self._provision(project_id)
+
+    def release(self, user):
+        """Return a leased user to the pool."""
+        with self._lock:
+            self._free[user.key].append(user)
+
+    def _provision(self, project_id):
+        admin = self.admin
+        key = project_id
+        password = data_utils.rand_password()
+        user_id = admin.users_v3_client.create_user(
+            name=data_utils.rand_name('user'),
+            password=password)['user']['id']
+        with self._lock:
+            self._user_ids.append(user_id)
+
+        if not project_id:
+            project_id = admin.projects_client.create_project(
+                data_utils.rand_name())['project']['id']
+            with self._lock:
+                self._project_ids.append(project_id)
+
+        member_role_id = get_role_id(admin.roles_v3_client, 'member')
+        admin.roles_v3_client.create_user_role_on_project(
+            project_id, user_id, member_role_id)
+        creds = auth.KeystoneV3Credentials(
+            user_id=user_id,
+            password=password,
+            project_id=project_id)
+        client = get_manager(creds)
+        return PooledUser(user_id, project_id, client, key)
+
+    def cleanup(self):
+        """Delete every user and project created by the pool."""
+        if self._admin is None:
+            return
+        with self._lock:
+            user_ids, self._user_ids = self._user_ids, []
+            project_ids, self._project_ids = self._project_ids, []
+            self._free.clear()
+        for user_id in user_ids:
+            test_utils.call_and_ignore_notfound_exc(
+                self._admin.users_v3_client.delete_user, user_id)
+        for project_id in project_ids:
+            test_utils.call_and_ignore_notfound_exc(
+                self._admin.projects_client.delete_project, project_id)
+
+
+def pool_available():
+    """Return whether users can be leased from the user pool.
+
+    The pool provisions its users with the configured admin, so it needs
+    dynamic credentials to be enabled and the [auth] admin credentials to be
+    set. Deployments with pre-provisioned accounts can not use it.
+    """
+    if not CONF.auth.use_dynamic_credentials:
+        return False
+    try:
+        credentials_factory.get_configured_admin_credentials(fill_in=False)
+    except exceptions.InvalidConfiguration:
+        return False
+    return True
+
+
+def get_user_pool():
+    """Return the user pool of this worker process."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = UserPool()
+            atexit.register(_pool.cleanup)
+        return _pool
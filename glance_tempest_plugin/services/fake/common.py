@@ -0,0 +1,88 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Requests, responses and routing shared by the fake services."""
+import datetime
+import json
+import re
+
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def timestamp():
+    return datetime.datetime.utcnow().strftime(TIME_FORMAT)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=''):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request(object):
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        # The credentials of the token the request was made with, set by
+        # the router for authenticated routes.
+        self.creds = None
+
+    def json(self):
+        try:
+            return json.loads(self.body or b'{}')
+        except ValueError:
+            raise HTTPError(400, 'Malformed JSON')
+
+
+class Response(object):
+    def __init__(self, status, body=None, headers=None,
+                 content_type='application/json'):
+        self.status = status
+        self.headers = dict(headers or {})
+        if body is None:
+            self.body = b''
+        elif isinstance(body, bytes):
+            self.body = body
+        else:
+            self.body = json.dumps(body).encode('utf-8')
+        if self.body:
+            self.headers.setdefault('Content-Type', content_type)
+
+
+class Router(object):
+    def __init__(self, identity_api):
+        self.identity = identity_api
+        self._routes = []
+
+    def add(self, method, pattern, handler, authenticated=True):
+        self._routes.append((method, re.compile('^%s$' % pattern), handler,
+                             authenticated))
+
+    def dispatch(self, request):
+        path_matched = False
+        for method, pattern, handler, authenticated in self._routes:
+            match = pattern.match(request.path)
+            if not match:
+                continue
+            path_matched = True
+            if method != request.method:
+                continue
+            if authenticated:
+                request.creds = self.identity.validate(
+                    request.headers.get('X-Auth-Token'))
+            return handler(request, **match.groupdict())
+        if path_matched:
+            raise HTTPError(405, 'Method not allowed')
+        raise HTTPError(404, 'No route for %s' % request.path)
@@ -0,0 +1,434 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""The Keystone v3 calls used by tempest's credential providers."""
+import datetime
+import threading
+import uuid
+
+from glance_tempest_plugin.services.fake import common
+
+DEFAULT_DOMAIN_ID = 'default'
+TOKEN_LIFETIME = datetime.timedelta(hours=1)
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+# Roles implied by another role, the way keystone bootstraps them.
+IMPLIED_ROLES = {
+    'admin': ['member'],
+    'member': ['reader'],
+}
+
+
+def _now():
+    return datetime.datetime.utcnow()
+
+
+def _new_id():
+    return uuid.uuid4().hex
+
+
+class IdentityAPI(object):
+    """In-memory users, projects, domains, roles and tokens."""
+
+    def __init__(self, cloud):
+        self.cloud = cloud
+        self._lock = threading.RLock()
+        self.domains = {}
+        self.projects = {}
+        self.users = {}
+        self.roles = {}
+        self.assignments = set()
+        self.tokens = {}
+
+        self.domains[DEFAULT_DOMAIN_ID] = {
+            'id': DEFAULT_DOMAIN_ID, 'name': 'Default', 'enabled': True,
+            'description': 'The default domain'}
+        for name in ['admin', 'member', 'reader']:
+            self._create_role(name)
+        admin_project = self._create_project(
+            {'name': cloud.admin_project_name})
+        admin_user = self._create_user({'name': cloud.admin_username,
+                                        'password': cloud.admin_password})
+        admin_role_id = self._role_by_name('admin')['id']
+        self.assignments.add((admin_user['id'], 'project',
+                              admin_project['id'], admin_role_id))
+        self.assignments.add((admin_user['id'], 'system', 'all',
+                              admin_role_id))
+
+    def add_routes(self, router):
+        prefix = '/identity/v3'
+        router.add('POST', prefix + '/auth/tokens', self.issue_token,
+                   authenticated=False)
+        router.add('GET', prefix + '/auth/tokens', self.show_token)
+        router.add('DELETE', prefix + '/auth/tokens', self.revoke_token)
+        router.add('GET', prefix + '/domains', self.list_domains)
+        router.add('POST', prefix + '/domains', self.create_domain)
+        router.add('PATCH', prefix + '/domains/(?P<domain_id>[^/]+)',
+                   self.update_domain)
+        router.add('DELETE', prefix + '/domains/(?P<domain_id>[^/]+)',
+                   self.delete_domain)
+        router.add('GET', prefix + '/projects', self.list_projects)
+        router.add('POST', prefix + '/projects', self.create_project)
+        router.add('GET', prefix + '/projects/(?P<project_id>[^/]+)',
+                   self.show_project)
+        router.add('DELETE', prefix + '/projects/(?P<project_id>[^/]+)',
+                   self.delete_project)
+        router.add('GET', prefix + '/users', self.list_users)
+        router.add('POST', prefix + '/users', self.create_user)
+        router.add('GET', prefix + '/users/(?P<user_id>[^/]+)',
+                   self.show_user)
+        router.add('DELETE', prefix + '/users/(?P<user_id>[^/]+)',
+                   self.delete_user)
+        router.add('GET', prefix + '/roles', self.list_roles)
+        router.add('POST', prefix + '/roles', self.create_role)
+        for target in ['projects', 'domains']:
+            router.add('PUT', prefix + '/%s/(?P<target_id>[^/]+)/users/'
+                       '(?P<user_id>[^/]+)/roles/(?P<role_id>[^/]+)' % target,
+                       self._assign_role_route(target[:-1]))
+        router.add('PUT', prefix + '/system/users/(?P<user_id>[^/]+)/roles/'
+                   '(?P<role_id>[^/]+)', self.assign_system_role)
+
+    # Tokens
+
+    def validate(self, token_id):
+        """Return the credentials of a token.
+
+        :raises: HTTPError 401 if the token is unknown or expired.
+        """
+        with self._lock:
+            token = self.tokens.get(token_id)
+        if token is None or token['expires_at'] <= _now():
+            raise common.HTTPError(401, 'The request you have made requires '
+                                        'authentication.')
+        return token['creds']
+
+    def _require_admin(self, request):
+        if 'admin' not in request.creds['roles']:
+            raise common.HTTPError(403, 'You are not authorized to perform '
+                                        'the requested action.')
+
+    def _find_user(self, user):
+        with self._lock:
+            if user.get('id'):
+                return self.users.get(user['id'])
+            domain = self._find_domain(user.get('domain', {}))
+            for candidate in self.users.values():
+                if (candidate['name'] == user.get('name') and
+                        domain is not None and
+                        candidate['domain_id'] == domain['id']):
+                    return candidate
+
+    def _find_domain(self, domain):
+        with self._lock:
+            if domain.get('id'):
+                return self.domains.get(domain['id'])
+            for candidate in self.domains.values():
+                if candidate['name'] == domain.get('name'):
+                    return candidate
+
+    def _find_project(self, project):
+        with self._lock:
+            if project.get('id'):
+                return self.projects.get(project['id'])
+            domain = self._find_domain(project.get('domain', {}))
+            for candidate in self.projects.values():
+                if (candidate['name'] == project.get('name') and
+                        domain is not None and
+                        candidate['domain_id'] == domain['id']):
+                    return candidate
+
+    def _roles_on(self, user_id, target_type, target_id):
+        with self._lock:
+            names = set(self.roles[role_id]['name']
+                        for (actor, t_type, t_id, role_id)
+                        in self.assignments
+                        if (actor, t_type, t_id) ==
+                        (user_id, target_type, target_id))
+        pending = list(names)
+        while pending:
+            for implied in IMPLIED_ROLES.get(pending.pop(), []):
+                if implied not in names:
+                    names.add(implied)
+                    pending.append(implied)
+        return names
+
+    def _domain_ref(self, domain_id):
+        return {'id': domain_id, 'name': self.domains[domain_id]['name']}
+
+    def _catalog(self):
+        catalog = []
+        for service_type, url in [('identity', self.cloud.identity_url),
+                                  ('image', self.cloud.image_url)]:
+            endpoints = [{'id': _new_id(), 'interface': interface,
+                          'region': self.cloud.region,
+                          'region_id': self.cloud.region, 'url': url}
+                         for interface in ['public', 'internal', 'admin']]
+            catalog.append({'id': _new_id(), 'type': service_type,
+                            'name': service_type, 'endpoints': endpoints})
+        return catalog
+
+    def issue_token(self, request):
+        auth = request.json().get('auth', {})
+        password = auth.get('identity', {}).get('password', {})
+        user = self._find_user(password.get('user', {}))
+        if (user is None or not user['enabled'] or
+                user['password'] != password.get('user', {}).get(
+                    'password')):
+            raise common.HTTPError(401, 'The request you have made requires '
+                                        'authentication.')
+
+        now = _now()
+        body = {
+            'methods': ['password'],
+            'user': {'id': user['id'], 'name': user['name'],
+                     'domain': self._domain_ref(user['domain_id']),
+                     'password_expires_at': None},
+            'audit_ids': [_new_id()],
+            'issued_at': now.strftime(TIME_FORMAT),
+            'expires_at': (now + TOKEN_LIFETIME).strftime(TIME_FORMAT),
+        }
+        creds = {'user_id': user['id'], 'project_id': None,
+                 'domain_id': None, 'system': None, 'roles': set()}
+
+        scope = auth.get('scope') or {}
+        if 'project' in scope:
+            project = self._find_project(scope['project'])
+            if project is None:
+                raise common.HTTPError(401, 'Could not find project.')
+            creds['project_id'] = project['id']
+            creds['roles'] = self._roles_on(user['id'], 'project',
+                                            project['id'])
+            body['project'] = {
+                'id': project['id'], 'name': project['name'],
+                'domain': self._domain_ref(project['domain_id'])}
+            body['is_domain'] = False
+        elif 'domain' in scope:
+            domain = self._find_domain(scope['domain'])
+            if domain is None:
+                raise common.HTTPError(401, 'Could not find domain.')
+            creds['domain_id'] = domain['id']
+            creds['roles'] = self._roles_on(user['id'], 'domain',
+                                            domain['id'])
+            body['domain'] = self._domain_ref(domain['id'])
+        elif 'system' in scope:
+            creds['system'] = 'all'
+            creds['roles'] = self._roles_on(user['id'], 'system', 'all')
+            body['system'] = {'all': True}
+        if scope:
+            if not creds['roles']:
+                raise common.HTTPError(401, 'User has no access to the '
+                                            'requested scope.')
+            with self._lock:
+                body['roles'] = [self._role_by_name(name)
+                                 for name in sorted(creds['roles'])]
+            body['catalog'] = self._catalog()
+
+        token_id = _new_id()
+        with self._lock:
+            self.tokens[token_id] = {'creds': creds,
+                                     'expires_at': now + TOKEN_LIFETIME,
+                                     'body': body}
+        return common.Response(201, {'token': body},
+                               headers={'X-Subject-Token': token_id})
+
+    def show_token(self, request):
+        token_id = request.headers.get('X-Subject-Token')
+        self.validate(token_id)
+        with self._lock:
+            body = self.tokens[token_id]['body']
+        return common.Response(200, {'token': body},
+                               headers={'X-Subject-Token': token_id})
+
+    def revoke_token(self, request):
+        with self._lock:
+            self.tokens.pop(request.headers.get('X-Subject-Token'), None)
+        return common.Response(204)
+
+    # Domains
+
+    def list_domains(self, request):
+        with self._lock:
+            domains = [d for d in self.domains.values()
+                       if request.query.get('name') in (None, d['name'])]
+        return common.Response(200, {'domains': domains})
+
+    def create_domain(self, request):
+        self._require_admin(request)
+        domain = request.json().get('domain', {})
+        domain = {'id': _new_id(), 'name': domain.get('name'),
+                  'description': domain.get('description', ''),
+                  'enabled': domain.get('enabled', True)}
+        with self._lock:
+            if self._find_domain({'name': domain['name']}):
+                raise common.HTTPError(409, 'Duplicate domain name.')
+            self.domains[domain['id']] = domain
+        return common.Response(201, {'domain': domain})
+
+    def update_domain(self, request, domain_id):
+        self._require_admin(request)
+        with self._lock:
+            domain = self._get(self.domains, domain_id)
+            domain.update(request.json().get('domain', {}))
+        return common.Response(200, {'domain': domain})
+
+    def delete_domain(self, request, domain_id):
+        self._require_admin(request)
+        with self._lock:
+            if self._get(self.domains, domain_id)['enabled']:
+                raise common.HTTPError(403, 'Cannot delete an enabled '
+                                            'domain.')
+            del self.domains[domain_id]
+        return common.Response(204)
+
+    # Projects
+
+    def _create_project(self, project):
+        project = {'id': _new_id(), 'name': project.get('name'),
+                   'domain_id': project.get('domain_id', DEFAULT_DOMAIN_ID),
+                   'description': project.get('description', ''),
+                   'enabled': project.get('enabled', True),
+                   'is_domain': False, 'parent_id': None, 'tags': []}
+        project['parent_id'] = project['domain_id']
+        with self._lock:
+            if self._find_project({'name': project['name'],
+                                   'domain': {'id': project['domain_id']}}):
+                raise common.HTTPError(409, 'Duplicate project name.')
+            self.projects[project['id']] = project
+        return project
+
+    def list_projects(self, request):
+        with self._lock:
+            projects = [p for p in self.projects.values()
+                        if request.query.get('name') in (None, p['name'])]
+        return common.Response(200, {'projects': projects})
+
+    def create_project(self, request):
+        self._require_admin(request)
+        project = self._create_project(request.json().get('project', {}))
+        return common.Response(201, {'project': project})
+
+    def show_project(self, request, project_id):
+        with self._lock:
+            project = self._get(self.projects, project_id)
+        return common.Response(200, {'project': project})
+
+    def delete_project(self, request, project_id):
+        self._require_admin(request)
+        with self._lock:
+            self._get(self.projects, project_id)
+            del self.projects[project_id]
+            self.assignments = set(
+                a for a in self.assignments
+                if (a[1], a[2]) != ('project', project_id))
+        return common.Response(204)
+
+    # Users
+
+    def _create_user(self, user):
+        user = {'id': _new_id(), 'name': user.get('name'),
+                'domain_id': user.get('domain_id', DEFAULT_DOMAIN_ID),
+                'password': user.get('password'),
+                'email': user.get('email'),
+                'default_project_id': user.get('project_id'),
+                'enabled': user.get('enabled', True)}
+        with self._lock:
+            if self._find_user({'name': user['name'],
+                                'domain': {'id': user['domain_id']}}):
+                raise common.HTTPError(409, 'Duplicate user name.')
+            self.users[user['id']] = user
+        return user
+
+    @staticmethod
+    def _user_ref(user):
+        return dict((k, v) for k, v in user.items() if k != 'password')
+
+    def list_users(self, request):
+        with self._lock:
+            users = [self._user_ref(u) for u in self.users.values()
+                     if request.query.get('name') in (None, u['name'])]
+        return common.Response(200, {'users': users})
+
+    def create_user(self, request):
+        self._require_admin(request)
+        user = self._create_user(request.json().get('user', {}))
+        return common.Response(201, {'user': self._user_ref(user)})
+
+    def show_user(self, request, user_id):
+        with self._lock:
+            user = self._get(self.users, user_id)
+        return common.Response(200, {'user': self._user_ref(user)})
+
+    def delete_user(self, request, user_id):
+        self._require_admin(request)
+        with self._lock:
+            self._get(self.users, user_id)
+            del self.users[user_id]
+            self.assignments = set(a for a in self.assignments
+                                   if a[0] != user_id)
+            self.tokens = dict(
+                (token_id, token) for token_id, token in self.tokens.items()
+                if token['creds']['user_id'] != user_id)
+        return common.Response(204)
+
+    # Roles
+
+    def _create_role(self, name):
+        role = {'id': _new_id(), 'name': name, 'domain_id': None}
+        with self._lock:
+            if self._role_by_name(name):
+                raise common.HTTPError(409, 'Duplicate role name.')
+            self.roles[role['id']] = role
+        return role
+
+    def _role_by_name(self, name):
+        with self._lock:
+            for role in self.roles.values():
+                if role['name'] == name:
+                    return role
+
+    def list_roles(self, request):
+        with self._lock:
+            roles = [r for r in self.roles.values()
+                     if request.query.get('name') in (None, r['name'])]
+        return common.Response(200, {'roles': roles})
+
+    def create_role(self, request):
+        self._require_admin(request)
+        role = self._create_role(request.json().get('role', {}).get('name'))
+        return common.Response(201, {'role': role})
+
+    def _assign_role(self, request, user_id, target_type, target_id,
+                     role_id):
+        self._require_admin(request)
+        with self._lock:
+            self._get(self.users, user_id)
+            self._get(self.roles, role_id)
+            self.assignments.add((user_id, target_type, target_id, role_id))
+        return common.Response(204)
+
+    def _assign_role_route(self, target_type):
+        def assign_role(request, target_id, user_id, role_id):
+            targets = {'project': self.projects, 'domain': self.domains}
+            with self._lock:
+                self._get(targets[target_type], target_id)
+            return self._assign_role(request, user_id, target_type,
+                                     target_id, role_id)
+        return assign_role
+
+    def assign_system_role(self, request, user_id, role_id):
+        return self._assign_role(request, user_id, 'system', 'all', role_id)
+
+    @staticmethod
+    def _get(collection, resource_id):
+        try:
+            return collection[resource_id]
+        except KeyError:
+            raise common.HTTPError(404, 'Could not find %s.' % resource_id)
@@ -0,0 +1,704 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""The Glance v2 image and image member calls."""
+import hashlib
+import threading
+import time
+from urllib import request as urllib_request
+import uuid
+
+from glance_tempest_plugin.services.fake import common
+
+LIMIT_DEFAULT = 25
+LIMIT_MAX = 1000
+# The minor versions of the v2 API, the last one being the current one.
+MINOR_VERSIONS = 16
+
+VISIBILITIES = ['public', 'private', 'shared', 'community']
+MEMBER_STATUSES = ['pending', 'accepted', 'rejected']
+# Glance's default image_member_quota.
+MEMBER_QUOTA = 128
+IMPORT_METHODS = ['glance-direct', 'web-download', 'copy-image']
+# How long, in seconds, import tasks wait for a worker to pick them up.
+IMPORT_PICKUP_DELAY = 0.1
+# The stores of the image service, the first one being the default one.
+STORES = [
+    {'id': 'file1', 'description': 'Local file store'},
+    {'id': 'file2', 'description': 'Local file store'},
+    {'id': 'file3', 'description': 'Local file store'},
+    {'id': 'file4', 'description': 'Local file store'},
+    {'id': 'http', 'description': 'HTTP store', 'read-only': 'true'},
+]
+
+# Properties which are set by the service and can't be changed by users.
+READ_ONLY = ['status', 'checksum', 'os_hash_algo', 'os_hash_value', 'size',
+             'virtual_size', 'created_at', 'updated_at', 'file', 'self',
+             'schema', 'direct_url', 'locations', 'stores']
+BASE_PROPERTIES = ['id', 'name', 'visibility', 'protected', 'os_hidden',
+                   'owner', 'tags', 'container_format', 'disk_format',
+                   'min_disk', 'min_ram']
+
+
+class ImageAPI(object):
+    """In-memory images, their data and their members.
+
+    Access follows glance: images a project can't see at the database level
+    are reported as not found, and so are forbidden operations on images
+    the project is not allowed to get.
+
+    Imports run in a thread of their own, picked up IMPORT_PICKUP_DELAY
+    after the import call as with glance's import workers, so the polls
+    made right after the call race the worker. Until it picks the task up,
+    the task is pending and, like glance, the image only holds the import
+    lock: its status and os_glance_importing_to_stores are set by the
+    worker. An import to several stores writes to them one at a time, the
+    image becoming active once the first one holds the data.
+    """
+
+    def __init__(self, cloud):
+        self.cloud = cloud
+        self._lock = threading.RLock()
+        self.images = {}
+        self.data = {}
+        self.staging = {}
+        self.members = {}
+        self.tasks = {}
+        # The IDs of the tasks importing to each image.
+        self.import_locks = {}
+
+    def add_routes(self, router):
+        prefix = '/image/v2/images'
+        image = prefix + '/(?P<image_id>[^/]+)'
+        member = image + '/members/(?P<member_id>[^/]+)'
+        router.add('GET', '/image/?', self.versions, authenticated=False)
+        router.add('GET', '/image/v2/info/import', self.info_import)
+        router.add('GET', '/image/v2/info/stores', self.info_stores)
+        router.add('GET', prefix, self.list_images)
+        router.add('POST', prefix, self.create_image)
+        router.add('GET', image, self.show_image)
+        router.add('PATCH', image, self.update_image)
+        router.add('DELETE', image, self.delete_image)
+        router.add('PUT', image + '/file', self.upload)
+        router.add('GET', image + '/file', self.download)
+        router.add('PUT', image + '/stage', self.stage)
+        router.add('POST', image + '/import', self.import_image)
+        router.add('GET', image + '/tasks', self.list_tasks)
+        router.add('POST', image + '/actions/deactivate', self.deactivate)
+        router.add('POST', image + '/actions/reactivate', self.reactivate)
+        router.add('PUT', image + '/tags/(?P<tag>[^/]+)', self.add_tag)
+        router.add('DELETE', image + '/tags/(?P<tag>[^/]+)',
+                   self.delete_tag)
+        router.add('GET', image + '/members', self.list_members)
+        router.add('POST', image + '/members', self.create_member)
+        router.add('GET', member, self.show_member)
+        router.add('PUT', member, self.update_member)
+        router.add('DELETE', member, self.delete_member)
+
+    def versions(self, request):
+        link = {'rel': 'self', 'href': self.cloud.image_url + '/v2/'}
+        return common.Response(300, {'versions': [{
+            'id': 'v2.%d' % minor,
+            'status': 'CURRENT' if minor == MINOR_VERSIONS else 'SUPPORTED',
+            'links': [link],
+        } for minor in range(MINOR_VERSIONS, -1, -1)]})
+
+    # Access checks
+
+    def _is_admin(self, creds):
+        return (creds['project_id'] is not None and
+                self.cloud.enforcer.is_admin(creds))
+
+    def _visible(self, creds, image):
+        """Whether the image exists for the project, regardless of policy."""
+        if self._is_admin(creds):
+            return True
+        if image['visibility'] in ('public', 'community'):
+            return True
+        project_id = creds['project_id']
+        if project_id is None:
+            return False
+        return (image['owner'] == project_id or
+                (image['visibility'] == 'shared' and
+                 project_id in self.members.get(image['id'], {})))
+
+    def _target(self, creds, image):
+        target = {'project_id': image['owner'], 'owner': image['owner'],
+                  'visibility': image['visibility']}
+        if creds['project_id'] in self.members.get(image['id'], {}):
+            target['member_id'] = creds['project_id']
+        return target
+
+    def _get(self, creds, image_id):
+        image = self.images.get(image_id)
+        if image is None or not self._visible(creds, image):
+            raise common.HTTPError(404, 'No image found with ID %s'
+                                        % image_id)
+        return image
+
+    def _enforce(self, name, creds, image):
+        """Check a policy, hiding images the project may not get."""
+        enforcer = self.cloud.enforcer
+        target = self._target(creds, image)
+        if enforcer.check(name, creds, target):
+            return
+        if name != 'get_image' and enforcer.check('get_image', creds,
+                                                  target):
+            raise common.HTTPError(403, 'You are not authorized to '
+                                        'complete %s action.' % name)
+        raise common.HTTPError(404, 'No image found with ID %s'
+                                    % image['id'])
+
+    def _check_visibility(self, creds, image):
+        rule = {'public': 'publicize_image',
+                'community': 'communitize_image'}.get(image['visibility'])
+        if rule and not self.cloud.enforcer.check(
+                rule, creds, self._target(creds, image)):
+            raise common.HTTPError(403, 'You are not authorized to '
+                                        'complete %s action.' % rule)
+
+    def _view(self, image):
+        image = dict(image)
+        image['self'] = '/v2/images/%s' % image['id']
+        image['file'] = '/v2/images/%s/file' % image['id']
+        image['schema'] = '/v2/schemas/image'
+        image['tags'] = list(image['tags'])
+        return image
+
+    # Images
+
+    def create_image(self, request):
+        creds = request.creds
+        body = request.json()
+        for key in READ_ONLY:
+            if key in body:
+                raise common.HTTPError(403, "Attribute '%s' is read-only."
+                                            % key)
+        now = common.timestamp()
+        image = {
+            'id': body.pop('id', None) or str(uuid.uuid4()),
+            'name': body.pop('name', None),
+            'status': 'queued',
+            'visibility': body.pop('visibility', 'shared'),
+            'protected': body.pop('protected', False),
+            'os_hidden': body.pop('os_hidden', False),
+            'owner': body.pop('owner', None) or creds['project_id'],
+            'tags': list(body.pop('tags', [])),
+            'container_format': body.pop('container_format', None),
+            'disk_format': body.pop('disk_format', None),
+            'min_disk': body.pop('min_disk', 0),
+            'min_ram': body.pop('min_ram', 0),
+            'size': None,
+            'virtual_size': None,
+            'checksum': None,
+            'os_hash_algo': None,
+            'os_hash_value': None,
+            'created_at': now,
+            'updated_at': now,
+        }
+        if image['visibility'] not in VISIBILITIES:
+            raise common.HTTPError(400, 'Invalid visibility %s'
+                                        % image['visibility'])
+        image.update(body)
+        if not self.cloud.enforcer.check('add_image', creds,
+                                         self._target(creds, image)):
+            raise common.HTTPError(403, 'You are not authorized to '
+                                        'complete add_image action.')
+        self._check_visibility(creds, image)
+        with self._lock:
+            if image['id'] in self.images:
+                raise common.HTTPError(409, 'Image with identifier %s '
+                                            'already exists!' % image['id'])
+            self.images[image['id']] = image
+        return common.Response(201, self._view(image))
+
+    def show_image(self, request, image_id):
+        with self._lock:
+            image = self._get(request.creds, image_id)
+            self._enforce('get_image', request.creds, image)
+            return common.Response(200, self._view(image))
+
+    def _filter(self, creds, query):
+        visibility = query.get('visibility')
+        member_status = query.get('member_status', 'accepted')
+        images = []
+        for image in self.images.values():
+            if not self._visible(creds, image):
+                continue
+            if visibility not in (None, 'all'):
+                if image['visibility'] != visibility:
+                    continue
+            elif visibility is None and image['visibility'] == 'community':
+                if image['owner'] != creds['project_id']:
+                    continue
+            if (image['visibility'] == 'shared' and
+                    image['owner'] != creds['project_id'] and
+                    not self._is_admin(creds)):
+                status = self.members[image['id']][creds['project_id']][
+                    'status']
+                if member_status not in ('all', status):
+                    continue
+            if query.get('os_hidden', 'false').lower() != str(
+                    image['os_hidden']).lower():
+                continue
+            if 'id' in query:
+                ids = query['id']
+                ids = ids[3:].split(',') if ids.startswith('in:') else [ids]
+                if image['id'] not in ids:
+                    continue
+            if 'tag' in query and query['tag'] not in image['tags']:
+                continue
+            if any(key in query and str(image.get(key)) != query[key]
+                   for key in ['name', 'status', 'owner', 'container_format',
+                               'disk_format', 'protected']):
+                continue
+            images.append(image)
+        return images
+
+    def list_images(self, request):
+        creds = request.creds
+        query = request.query
+        if not self.cloud.enforcer.check('get_images', creds,
+                                         {'project_id': creds['project_id']}):
+            raise common.HTTPError(403, 'You are not authorized to '
+                                        'complete get_images action.')
+        try:
+            limit = min(int(query.get('limit', LIMIT_DEFAULT)), LIMIT_MAX)
+        except ValueError:
+            raise common.HTTPError(400, 'limit param must be an integer')
+        sort_key = query.get('sort_key', 'created_at')
+        reverse = query.get('sort_dir', 'desc') == 'desc'
+        with self._lock:
+            images = self._filter(creds, query)
+            images.sort(key=lambda i: (str(i.get(sort_key) or ''), i['id']),
+                        reverse=reverse)
+            if 'marker' in query:
+                ids = [image['id'] for image in images]
+                if query['marker'] not in ids:
+                    raise common.HTTPError(400, 'marker not found')
+                images = images[ids.index(query['marker']) + 1:]
+            page = [self._view(image) for image in images[:limit]]
+        body = {'images': page, 'first': '/v2/images',
+                'schema': '/v2/schemas/images'}
+        if len(images) > limit:
+            params = dict(query, marker=page[-1]['id'], limit=limit)
+            body['next'] = '/v2/images?%s' % '&'.join(
+                '%s=%s' % item for item in sorted(params.items()))
+        return common.Response(200, body)
+
+    def _patch(self, creds, image, changes):
+        for change in changes:
+            op = change.get('op')
+            path = change.get('path')
+            if op is None:
+                # The draft format, {"replace": "/name", "value": ...}
+                for op in ['add', 'replace', 'remove']:
+                    if op in change:
+                        path = change[op]
+                        break
+                else:
+                    raise common.HTTPError(400, 'Unable to find op')
+            key = (path or '/').lstrip('/')
+            if key in READ_ONLY or key == 'id':
+                raise common.HTTPError(403, "Attribute '%s' is read-only."
+                                            % key)
+            if key == 'owner' and not self._is_admin(creds):
+                raise common.HTTPError(403, "Attribute 'owner' is "
+                                            "read-only.")
+            if op == 'remove':
+                if key in BASE_PROPERTIES:
+                    raise common.HTTPError(403, 'Properties %s cannot be '
+                                                'removed.' % key)
+                if key not in image:
+                    raise common.HTTPError(409, 'Property %s does not '
+                                                'exist.' % key)
+                del image[key]
+            elif op in ('add', 'replace'):
+                if key == 'visibility':
+                    if change['value'] not in VISIBILITIES:
+                        raise common.HTTPError(400, 'Invalid visibility')
+                    if change['value'] != 'shared':
+                        self.members.pop(image['id'], None)
+                image[key] = change['value']
+            else:
+                raise common.HTTPError(400, 'Invalid operation %s' % op)
+
+    def update_image(self, request, image_id):
+        creds = request.creds
+        changes = request.json()
+        if not isinstance(changes, list):
+            raise common.HTTPError(400, 'Request body must be a JSON array '
+                                        'of operation objects.')
+        with self._lock:
+            image = self._get(creds, image_id)
+            self._enforce('modify_image', creds, image)
+            updated = dict(image)
+            self._patch(creds, updated, changes)
+            if updated['visibility'] != image['visibility']:
+                self._check_visibility(creds, updated)
+            updated['updated_at'] = common.timestamp()
+            image.clear()
+            image.update(updated)
+            return common.Response(200, self._view(image))
+
+    def delete_image(self, request, image_id):
+        with self._lock:
+            image = self._get(request.creds, image_id)
+            self._enforce('delete_image', request.creds, image)
+            if image['protected']:
+                raise common.HTTPError(403, 'Image %s is protected and '
+                                            'cannot be deleted.' % image_id)
+            del self.images[image_id]
+            self.data.pop(image_id, None)
+            self.staging.pop(image_id, None)
+            self.members.pop(image_id, None)
+            self.tasks.pop(image_id, None)
+        return common.Response(204)
+
+    # Image data
+
+    def upload(self, request, image_id):
+        with self._lock:
+            image = self._get(request.creds, image_id)
+            self._enforce('upload_image', request.creds, image)
+            if image['status'] != 'queued':
+                raise common.HTTPError(409, 'Image status transition from '
+                                            '%s to saving is not allowed'
+                                            % image['status'])
+            self._store(image, request.body, STORES[0]['id'])
+        return common.Response(204)
+
+    def _store(self, image, data, store):
+        self.data[image['id']] = data
+        image.update({
+            'status': 'active',
+            'stores': store,
+            'size': len(data),
+            'checksum': hashlib.md5(data).hexdigest(),
+            'os_hash_algo': 'sha512',
+            'os_hash_value': hashlib.sha512(data).hexdigest(),
+            'updated_at': common.timestamp(),
+        })
+
+    def download(self, request, image_id):
+        creds = request.creds
+        with self._lock:
+            image = self._get(creds, image_id)
+            self._enforce('download_image', creds, image)
+            if (image['status'] == 'deactivated' and
+                    not self._is_admin(creds)):
+                raise common.HTTPError(403, 'The requested image has been '
+                                            'deactivated. Image data '
+                                            'download is forbidden.')
+            data = self.data.get(image_id)
+        if data is None:
+            return common.Response(204)
+        return common.Response(200, data,
+                               headers={'Content-MD5': image['checksum']},
+                               content_type='application/octet-stream')
+
+    # Interoperable import
+
+    def info_import(self, request):
+        return common.Response(200, {'import-methods': {
+            'description': 'Import methods available.',
+            'type': 'array',
+            'value': IMPORT_METHODS,
+        }})
+
+    def info_stores(self, request):
+        stores = [dict(store) for store in STORES]
+        stores[0]['default'] = 'true'
+        return common.Response(200, {'stores': stores})
+
+    def _import_stores(self, body):
+        """Return the stores an import request targets."""
+        writable = [store['id'] for store in STORES
+                    if not store.get('read-only')]
+        if 'stores' in body:
+            for store in body['stores']:
+                if store not in writable:
+                    raise common.HTTPError(409, 'Store for identifier %s '
+                                                'not found' % store)
+            return list(body['stores'])
+        if body.get('all_stores'):
+            return writable
+        return writable[:1]
+
+    def stage(self, request, image_id):
+        with self._lock:
+            image = self._get(request.creds, image_id)
+            self._enforce('modify_image', request.creds, image)
+            if image['status'] != 'queued':
+                raise common.HTTPError(409, 'Image status transition from '
+                                            '%s to uploading is not allowed'
+                                            % image['status'])
+            self.staging[image_id] = request.body
+            image['status'] = 'uploading'
+            image['updated_at'] = common.timestamp()
+        return common.Response(204)
+
+    def import_image(self, request, image_id):
+        creds = request.creds
+        body = request.json()
+        method = body.get('method', {})
+        name = method.get('name')
+        if name not in IMPORT_METHODS:
+            raise common.HTTPError(400, 'Import method %s is not valid'
+                                        % name)
+        if name == 'web-download' and not method.get('uri'):
+            raise common.HTTPError(400, 'URI for web-download does not '
+                                        'pass filtering')
+        # glance-direct imports the staged data, web-download the data of
+        # an image which hasn't been staged and copy-image copies the data
+        # of an active image to more stores.
+        expected = {'glance-direct': 'uploading',
+                    'copy-image': 'active'}.get(name, 'queued')
+        stores = self._import_stores(body)
+        request_id = 'req-%s' % uuid.uuid4()
+        with self._lock:
+            image = self._get(creds, image_id)
+            self._enforce('copy_image' if name == 'copy-image'
+                          else 'modify_image', creds, image)
+            if image['status'] != expected:
+                raise common.HTTPError(409, 'Image %s is in status %s, '
+                                            'not %s' % (image_id,
+                                                        image['status'],
+                                                        expected))
+            if image_id in self.import_locks:
+                raise common.HTTPError(409, 'Image %s is being imported'
+                                            % image_id)
+            if name == 'copy-image':
+                present = set(stores) & set(image['stores'].split(','))
+                if present:
+                    raise common.HTTPError(409, 'Image is already present '
+                                                'at stores %s'
+                                                % ','.join(sorted(present)))
+            now = common.timestamp()
+            task = {
+                'id': str(uuid.uuid4()),
+                'type': 'api_image_import',
+                'status': 'pending',
+                'owner': creds['project_id'],
+                'image_id': image_id,
+                'request_id': request_id,
+                'user_id': creds['user_id'],
+                'input': {'image_id': image_id, 'import_req': body},
+                'result': None,
+                'message': '',
+                'created_at': now,
+                'updated_at': now,
+            }
+            self.tasks.setdefault(image_id, []).append(task)
+            self.import_locks[image_id] = task['id']
+        threading.Thread(
+            target=self._import,
+            args=(image_id, task, method, stores),
+            daemon=True).start()
+        return common.Response(202,
+                               headers={'x-openstack-request-id': request_id})
+
+    def _set_task(self, task, status, message=''):
+        task.update({'status': status, 'message': message,
+                     'updated_at': common.timestamp()})
+
+    def _import(self, image_id, task, method, stores):
+        try:
+            self._run_import(image_id, task, method, stores)
+        finally:
+            with self._lock:
+                if self.import_locks.get(image_id) == task['id']:
+                    del self.import_locks[image_id]
+
+    def _run_import(self, image_id, task, method, stores):
+        time.sleep(IMPORT_PICKUP_DELAY)
+        with self._lock:
+            self._set_task(task, 'processing')
+            image = self.images.get(image_id)
+            if image is None:
+                self._set_task(task, 'failure', 'Image %s was deleted'
+                                                % image_id)
+                return
+            if method['name'] != 'copy-image':
+                image['status'] = 'importing'
+            image.update({
+                'os_glance_importing_to_stores': ','.join(stores),
+                'os_glance_failed_import': '',
+                'updated_at': common.timestamp(),
+            })
+        try:
+            if method['name'] == 'glance-direct':
+                with self._lock:
+                    data = self.staging.pop(image_id)
+            elif method['name'] == 'copy-image':
+                with self._lock:
+                    data = self.data[image_id]
+            else:
+                with urllib_request.urlopen(method['uri']) as response:
+                    data = response.read()
+        except Exception as e:
+            # Like glance, a failed import leaves the image queued, and a
+            # failed copy leaves it active.
+            with self._lock:
+                self._set_task(task, 'failure', str(e))
+                image = self.images.get(image_id)
+                if image is not None:
+                    if method['name'] != 'copy-image':
+                        image['status'] = 'queued'
+                    image.update({
+                        'os_glance_importing_to_stores': '',
+                        'os_glance_failed_import': ','.join(stores),
+                    })
+            return
+        for index, store in enumerate(stores):
+            with self._lock:
+                image = self.images.get(image_id)
+                if image is None:
+                    self._set_task(task, 'failure', 'Image %s was deleted'
+                                                    % image_id)
+                    return
+                if image['status'] == 'importing':
+                    self._store(image, data, store)
+                else:
+                    image['stores'] += ',' + store
+                image['os_glance_importing_to_stores'] = ','.join(
+                    stores[index + 1:])
+        with self._lock:
+            self._set_task(task, 'success')
+            task['result'] = {'image_id': image_id}
+
+    def list_tasks(self, request, image_id):
+        with self._lock:
+            image = self._get(request.creds, image_id)
+            self._enforce('get_image', request.creds, image)
+            tasks = [dict(task) for task in self.tasks.get(image_id, [])]
+        tasks.sort(key=lambda task: task['created_at'], reverse=True)
+        return common.Response(200, {'tasks': tasks})
+
+    def _set_active(self, request, image_id, action, status):
+        with self._lock:
+            image = self._get(request.creds, image_id)
+            self._enforce(action, request.creds, image)
+            if image['status'] not in ('active', 'deactivated'):
+                raise common.HTTPError(403, 'Not allowed to %s image in '
+                                            'status %s'
+                                            % (action, image['status']))
+            image['status'] = status
+            image['updated_at'] = common.timestamp()
+        return common.Response(204)
+
+    def deactivate(self, request, image_id):
+        return self._set_active(request, image_id, 'deactivate',
+                                'deactivated')
+
+    def reactivate(self, request, image_id):
+        return self._set_active(request, image_id, 'reactivate', 'active')
+
+    def add_tag(self, request, image_id, tag):
+        with self._lock:
+            image = self._get(request.creds, image_id)
+            self._enforce('modify_image', request.creds, image)
+            if tag not in image['tags']:
+                image['tags'].append(tag)
+        return common.Response(204)
+
+    def delete_tag(self, request, image_id, tag):
+        with self._lock:
+            image = self._get(request.creds, image_id)
+            self._enforce('modify_image', request.creds, image)
+            if tag not in image['tags']:
+                raise common.HTTPError(404, 'Tag %s not found' % tag)
+            image['tags'].remove(tag)
+        return common.Response(204)
+
+    # Members
+
+    def _get_member(self, creds, image, member_id):
+        member = self.members.get(image['id'], {}).get(member_id)
+        if member is None or not (self._is_admin(creds) or
+                                  image['owner'] == creds['project_id'] or
+                                  member_id == creds['project_id']):
+            raise common.HTTPError(404, 'Member %s not found' % member_id)
+        return member
+
+    def _member_view(self, member):
+        return dict(member, schema='/v2/schemas/member')
+
+    def list_members(self, request, image_id):
+        creds = request.creds
+        with self._lock:
+            image = self._get(creds, image_id)
+            self._enforce('get_members', creds, image)
+            if image['visibility'] != 'shared':
+                raise common.HTTPError(403, 'Only shared images have '
+                                            'members.')
+            members = [self._member_view(member) for member_id, member
+                       in self.members.get(image_id, {}).items()
+                       if self._is_admin(creds) or
+                       creds['project_id'] in (image['owner'], member_id)]
+        return common.Response(200, {'members': members,
+                                     'schema': '/v2/schemas/members'})
+
+    def create_member(self, request, image_id):
+        creds = request.creds
+        member_id = request.json().get('member')
+        with self._lock:
+            image = self._get(creds, image_id)
+            self._enforce('add_member', creds, image)
+            if image['visibility'] != 'shared':
+                raise common.HTTPError(403, 'Only shared images have '
+                                            'members.')
+            members = self.members.setdefault(image_id, {})
+            if member_id in members:
+                raise common.HTTPError(409, 'Member %s already exists'
+                                            % member_id)
+            if len(members) >= MEMBER_QUOTA:
+                raise common.HTTPError(
+                    413, 'Image member limit exceeded for image %s: '
+                         'Attempted: %d, Maximum: %d'
+                         % (image_id, len(members) + 1, MEMBER_QUOTA))
+            now = common.timestamp()
+            members[member_id] = {'image_id': image_id,
+                                  'member_id': member_id,
+                                  'status': 'pending',
+                                  'created_at': now, 'updated_at': now}
+            return common.Response(200,
+                                   self._member_view(members[member_id]))
+
+    def show_member(self, request, image_id, member_id):
+        creds = request.creds
+        with self._lock:
+            image = self._get(creds, image_id)
+            self._enforce('get_member', creds, image)
+            member = self._get_member(creds, image, member_id)
+            return common.Response(200, self._member_view(member))
+
+    def update_member(self, request, image_id, member_id):
+        creds = request.creds
+        status = request.json().get('status')
+        with self._lock:
+            image = self._get(creds, image_id)
+            member = self._get_member(creds, image, member_id)
+            self._enforce('modify_member', creds, image)
+            if status not in MEMBER_STATUSES:
+                raise common.HTTPError(400, 'Invalid status %s' % status)
+            member['status'] = status
+            member['updated_at'] = common.timestamp()
+            return common.Response(200, self._member_view(member))
+
+    def delete_member(self, request, image_id, member_id):
+        creds = request.creds
+        with self._lock:
+            image = self._get(creds, image_id)
+            self._enforce('delete_member', creds, image)
+            self._get_member(creds, image, member_id)
+            del self.members[image_id][member_id]
+        return common.Response(204)
@@ -0,0 +1,389 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""The Glance v2 metadata definition catalog calls."""
+import threading
+
+from glance_tempest_plugin.services.fake import common
+from glance_tempest_plugin.services.fake import image
+
+NAMESPACE_PROPERTIES = ['namespace', 'display_name', 'description',
+                        'visibility', 'protected', 'owner']
+
+
+class MetadefAPI(object):
+    """In-memory metadef namespaces and their contents.
+
+    Namespaces a project can't see are reported as not found, whatever the
+    operation; visible namespaces are then checked against the policy.
+    """
+
+    def __init__(self, cloud):
+        self.cloud = cloud
+        self._lock = threading.RLock()
+        self.namespaces = {}
+        self.resource_types = {}
+
+    def add_routes(self, router):
+        prefix = '/image/v2/metadefs'
+        namespace = prefix + '/namespaces/(?P<namespace>[^/]+)'
+        router.add('GET', prefix + '/resource_types',
+                   self.list_resource_types)
+        router.add('GET', prefix + '/namespaces', self.list_namespaces)
+        router.add('POST', prefix + '/namespaces', self.create_namespace)
+        router.add('GET', namespace, self.show_namespace)
+        router.add('PUT', namespace, self.update_namespace)
+        router.add('DELETE', namespace, self.delete_namespace)
+        for kind in ['objects', 'properties', 'tags']:
+            collection = namespace + '/' + kind
+            item = collection + '/(?P<name>[^/]+)'
+            router.add('GET', collection, self._list_route(kind))
+            router.add('GET', item, self._show_route(kind))
+            router.add('PUT', item, self._update_route(kind))
+            router.add('DELETE', item, self._delete_route(kind))
+        router.add('POST', namespace + '/objects',
+                   self._create_route('objects'))
+        router.add('POST', namespace + '/properties',
+                   self._create_route('properties'))
+        router.add('POST', namespace + '/tags/(?P<name>[^/]+)',
+                   self._create_route('tags'))
+        router.add('POST', namespace + '/tags', self.create_tags)
+        router.add('DELETE', namespace + '/tags', self.delete_tags)
+        router.add('GET', namespace + '/resource_types',
+                   self.list_resource_type_associations)
+        router.add('POST', namespace + '/resource_types',
+                   self.create_resource_type_association)
+        router.add('DELETE', namespace + '/resource_types/(?P<name>[^/]+)',
+                   self.delete_resource_type_association)
+
+    # Access checks
+
+    def _visible(self, creds, namespace):
+        return (self.cloud.enforcer.is_admin(creds) or
+                namespace['visibility'] == 'public' or
+                (creds['project_id'] is not None and
+                 namespace['owner'] == creds['project_id']))
+
+    def _target(self, namespace):
+        return {'project_id': namespace['owner'],
+                'owner': namespace['owner'],
+                'visibility': namespace['visibility']}
+
+    def _get(self, creds, name, rule):
+        """Return a namespace the project can see and may act on."""
+        namespace = self.namespaces.get(name)
+        if namespace is None or not self._visible(creds,
+                                                  namespace['namespace']):
+            raise common.HTTPError(404, 'Metadata definition namespace=%s '
+                                        'was not found.' % name)
+        if not self.cloud.enforcer.check(rule, creds,
+                                         self._target(namespace['namespace'])):
+            raise common.HTTPError(403, 'You are not authorized to '
+                                        'complete %s action.' % rule)
+        return namespace
+
+    def _enforce(self, rule, creds):
+        if not self.cloud.enforcer.check(rule, creds,
+                                         {'project_id': creds['project_id']}):
+            raise common.HTTPError(403, 'You are not authorized to '
+                                        'complete %s action.' % rule)
+
+    # Namespaces
+
+    def _namespace_view(self, namespace, detailed=False):
+        view = dict(namespace['namespace'])
+        name = view['namespace']
+        view['self'] = '/v2/metadefs/namespaces/%s' % name
+        view['schema'] = '/v2/schemas/metadefs/namespace'
+        if detailed:
+            if namespace['objects']:
+                view['objects'] = list(namespace['objects'].values())
+            if namespace['properties']:
+                view['properties'] = dict(namespace['properties'])
+            if namespace['tags']:
+                view['tags'] = [{'name': tag}
+                                for tag in namespace['tags']]
+            if namespace['resource_types']:
+                view['resource_type_associations'] = list(
+                    namespace['resource_types'].values())
+        return view
+
+    def list_namespaces(self, request):
+        creds = request.creds
+        query = request.query
+        self._enforce('get_metadef_namespaces', creds)
+        try:
+            limit = min(int(query.get('limit', image.LIMIT_DEFAULT)),
+                        image.LIMIT_MAX)
+        except ValueError:
+            raise common.HTTPError(400, 'limit param must be an integer')
+        visibility = query.get('visibility')
+        resource_types = set(filter(None, query.get('resource_types',
+                                                    '').split(',')))
+        with self._lock:
+            namespaces = [
+                namespace for namespace in self.namespaces.values()
+                if self._visible(creds, namespace['namespace']) and
+                visibility in (None, namespace['namespace']['visibility']) and
+                (not resource_types or
+                 resource_types & set(namespace['resource_types']))]
+            namespaces.sort(key=lambda n: (n['namespace']['created_at'],
+                                           n['namespace']['namespace']),
+                            reverse=query.get('sort_dir', 'desc') == 'desc')
+            if 'marker' in query:
+                names = [n['namespace']['namespace'] for n in namespaces]
+                if query['marker'] not in names:
+                    raise common.HTTPError(400, 'marker not found')
+                namespaces = namespaces[names.index(query['marker']) + 1:]
+            page = [self._namespace_view(namespace)
+                    for namespace in namespaces[:limit]]
+        body = {'namespaces': page,
+                'first': '/v2/metadefs/namespaces',
+                'schema': '/v2/schemas/metadefs/namespaces'}
+        if len(namespaces) > limit:
+            params = dict(query, marker=page[-1]['namespace'], limit=limit)
+            body['next'] = '/v2/metadefs/namespaces?%s' % '&'.join(
+                '%s=%s' % item for item in sorted(params.items()))
+        return common.Response(200, body)
+
+    def create_namespace(self, request):
+        creds = request.creds
+        body = request.json()
+        now = common.timestamp()
+        namespace = {'visibility': 'private', 'protected': False,
+                     'owner': creds['project_id'],
+                     'created_at': now, 'updated_at': now}
+        namespace.update(dict((key, body[key]) for key in NAMESPACE_PROPERTIES
+                              if body.get(key) is not None))
+        if not self.cloud.enforcer.check('add_metadef_namespace', creds,
+                                         self._target(namespace)):
+            raise common.HTTPError(403, 'You are not authorized to '
+                                        'complete add_metadef_namespace '
+                                        'action.')
+        name = namespace.get('namespace')
+        if not name:
+            raise common.HTTPError(400, 'Namespace name is required')
+        with self._lock:
+            if name in self.namespaces:
+                raise common.HTTPError(409, 'Namespace %s already exists'
+                                            % name)
+            self.namespaces[name] = {'namespace': namespace, 'objects': {},
+                                     'properties': {}, 'tags': {},
+                                     'resource_types': {}}
+            return common.Response(201, self._namespace_view(
+                self.namespaces[name]))
+
+    def show_namespace(self, request, namespace):
+        with self._lock:
+            namespace = self._get(request.creds, namespace,
+                                  'get_metadef_namespace')
+            return common.Response(200, self._namespace_view(
+                namespace, detailed=True))
+
+    def update_namespace(self, request, namespace):
+        body = request.json()
+        with self._lock:
+            ns = self._get(request.creds, namespace,
+                           'modify_metadef_namespace')
+            new_name = body.get('namespace', namespace)
+            if new_name != namespace and new_name in self.namespaces:
+                raise common.HTTPError(409, 'Namespace %s already exists'
+                                            % new_name)
+            ns['namespace'].update(dict(
+                (key, body[key]) for key in NAMESPACE_PROPERTIES
+                if key in body))
+            ns['namespace']['updated_at'] = common.timestamp()
+            self.namespaces[new_name] = self.namespaces.pop(namespace)
+            return common.Response(200, self._namespace_view(ns))
+
+    def delete_namespace(self, request, namespace):
+        with self._lock:
+            ns = self._get(request.creds, namespace,
+                           'delete_metadef_namespace')
+            if ns['namespace']['protected']:
+                raise common.HTTPError(403, 'Namespace %s is protected and '
+                                            'cannot be deleted.' % namespace)
+            del self.namespaces[namespace]
+        return common.Response(204)
+
+    # Objects, properties and tags
+
+    rules = {
+        'objects': {'list': 'get_metadef_objects',
+                    'show': 'get_metadef_object',
+                    'create': 'add_metadef_object',
+                    'update': 'modify_metadef_object',
+                    'delete': 'delete_metadef_object'},
+        'properties': {'list': 'get_metadef_properties',
+                       'show': 'get_metadef_property',
+                       'create': 'add_metadef_property',
+                       'update': 'modify_metadef_property',
+                       'delete': 'remove_metadef_property'},
+        'tags': {'list': 'get_metadef_tags',
+                 'show': 'get_metadef_tag',
+                 'create': 'add_metadef_tag',
+                 'update': 'modify_metadef_tag',
+                 'delete': 'delete_metadef_tag'},
+    }
+
+    def _item_view(self, kind, namespace, item):
+        view = dict(item)
+        if kind == 'objects':
+            view['self'] = '/v2/metadefs/namespaces/%s/objects/%s' % (
+                namespace, item['name'])
+            view['schema'] = '/v2/schemas/metadefs/object'
+        return view
+
+    def _list_route(self, kind):
+        def list_items(request, namespace):
+            with self._lock:
+                ns = self._get(request.creds, namespace,
+                               self.rules[kind]['list'])
+                items = [self._item_view(kind, namespace, item)
+                         for item in ns[kind].values()]
+            if kind == 'properties':
+                body = {'properties': dict(
+                    (item.pop('name'), item) for item in items)}
+            else:
+                body = {kind: items}
+            body['schema'] = '/v2/schemas/metadefs/%s' % kind
+            return common.Response(200, body)
+        return list_items
+
+    def _find(self, ns, kind, name):
+        try:
+            return ns[kind][name]
+        except KeyError:
+            raise common.HTTPError(404, 'Could not find %s %s'
+                                        % (kind, name))
+
+    def _show_route(self, kind):
+        def show_item(request, namespace, name):
+            with self._lock:
+                ns = self._get(request.creds, namespace,
+                               self.rules[kind]['show'])
+                item = self._find(ns, kind, name)
+                return common.Response(200, self._item_view(kind, namespace,
+                                                            item))
+        return show_item
+
+    def _add(self, ns, kind, item):
+        if item['name'] in ns[kind]:
+            raise common.HTTPError(409, 'A %s with name %s already exists'
+                                        % (kind, item['name']))
+        now = common.timestamp()
+        item.setdefault('created_at', now)
+        item['updated_at'] = now
+        ns[kind][item['name']] = item
+        return item
+
+    def _create_route(self, kind):
+        def create_item(request, namespace, name=None):
+            item = {'name': name} if kind == 'tags' else request.json()
+            if not item.get('name'):
+                raise common.HTTPError(400, 'The name is required')
+            with self._lock:
+                ns = self._get(request.creds, namespace,
+                               self.rules[kind]['create'])
+                item = self._add(ns, kind, item)
+                return common.Response(201, self._item_view(kind, namespace,
+                                                            item))
+        return create_item
+
+    def _update_route(self, kind):
+        def update_item(request, namespace, name):
+            body = request.json()
+            with self._lock:
+                ns = self._get(request.creds, namespace,
+                               self.rules[kind]['update'])
+                item = dict(self._find(ns, kind, name))
+                item.update(body)
+                new_name = item.get('name') or name
+                if new_name != name and new_name in ns[kind]:
+                    raise common.HTTPError(409, 'A %s with name %s already '
+                                                'exists' % (kind, new_name))
+                del ns[kind][name]
+                item['name'] = new_name
+                item['updated_at'] = common.timestamp()
+                ns[kind][new_name] = item
+                return common.Response(200, self._item_view(kind, namespace,
+                                                            item))
+        return update_item
+
+    def _delete_route(self, kind):
+        def delete_item(request, namespace, name):
+            with self._lock:
+                ns = self._get(request.creds, namespace,
+                               self.rules[kind]['delete'])
+                self._find(ns, kind, name)
+                del ns[kind][name]
+            return common.Response(204)
+        return delete_item
+
+    def create_tags(self, request, namespace):
+        names = [tag.get('name') for tag in request.json().get('tags', [])]
+        if len(set(names)) != len(names) or not all(names):
+            raise common.HTTPError(409, 'Duplicate or missing tag names')
+        append = request.headers.get('X-Openstack-Append',
+                                     '').lower() == 'true'
+        with self._lock:
+            ns = self._get(request.creds, namespace, 'add_metadef_tags')
+            if not append:
+                ns['tags'].clear()
+            tags = [self._add(ns, 'tags', {'name': name}) for name in names]
+        return common.Response(201, {'tags': tags})
+
+    def delete_tags(self, request, namespace):
+        with self._lock:
+            ns = self._get(request.creds, namespace, 'delete_metadef_tags')
+            ns['tags'].clear()
+        return common.Response(204)
+
+    # Resource types
+
+    def list_resource_types(self, request):
+        self._enforce('list_metadef_resource_types', request.creds)
+        with self._lock:
+            resource_types = list(self.resource_types.values())
+        return common.Response(200, {'resource_types': resource_types})
+
+    def list_resource_type_associations(self, request, namespace):
+        with self._lock:
+            ns = self._get(request.creds, namespace,
+                           'get_metadef_resource_type')
+            associations = list(ns['resource_types'].values())
+        return common.Response(200, {
+            'resource_type_associations': associations})
+
+    def create_resource_type_association(self, request, namespace):
+        body = request.json()
+        if not body.get('name'):
+            raise common.HTTPError(400, 'The name is required')
+        with self._lock:
+            ns = self._get(request.creds, namespace,
+                           'add_metadef_resource_type_association')
+            association = self._add(ns, 'resource_types', {
+                'name': body['name'],
+                'prefix': body.get('prefix'),
+                'properties_target': body.get('properties_target')})
+            self.resource_types.setdefault(body['name'], {
+                'name': body['name'],
+                'created_at': association['created_at'],
+                'updated_at': association['updated_at']})
+            return common.Response(201, association)
+
+    def delete_resource_type_association(self, request, namespace, name):
+        with self._lock:
+            ns = self._get(request.creds, namespace,
+                           'remove_metadef_resource_type_association')
+            self._find(ns, 'resource_types', name)
+            del ns['resource_types'][name]
+        return common.Response(204)
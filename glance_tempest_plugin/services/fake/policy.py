@@ -0,0 +1,133 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Policy rules of the fake image service.
+
+A rule is a callable taking the credentials of a request and the target of
+the operation, and returning whether the operation is allowed. The default
+rules follow the secure RBAC defaults of glance, with scope enforcement
+enabled: every rule only allows project-scoped tokens.
+"""
+
+
+def role(name):
+    return lambda creds, target: name in creds['roles']
+
+
+def project(key):
+    """Allow if the project of the token is the target's key."""
+    return lambda creds, target: (creds['project_id'] is not None and
+                                  creds['project_id'] == target.get(key))
+
+
+def visibility(*values):
+    return lambda creds, target: target.get('visibility') in values
+
+
+def any_of(*rules):
+    return lambda creds, target: any(rule(creds, target) for rule in rules)
+
+
+def all_of(*rules):
+    return lambda creds, target: all(rule(creds, target) for rule in rules)
+
+
+ADMIN = role('admin')
+ADMIN_OR_PROJECT_MEMBER = any_of(
+    ADMIN, all_of(role('member'), project('project_id')))
+ADMIN_OR_PROJECT_READER = any_of(
+    ADMIN, all_of(role('reader'), project('project_id')))
+ADMIN_OR_SHARED_MEMBER = any_of(
+    ADMIN, all_of(role('member'), project('member_id')))
+ADMIN_OR_PROJECT_READER_OR_SHARED_MEMBER = any_of(
+    ADMIN, all_of(role('reader'),
+                  any_of(project('project_id'), project('member_id'))))
+ADMIN_OR_PROJECT_READER_GET_IMAGE = any_of(
+    ADMIN, all_of(role('reader'),
+                  any_of(project('project_id'), project('member_id'),
+                         visibility('community', 'public', 'shared'))))
+ADMIN_OR_PROJECT_MEMBER_DOWNLOAD_IMAGE = any_of(
+    ADMIN, all_of(role('member'),
+                  any_of(project('project_id'), project('member_id'),
+                         visibility('community', 'public', 'shared'))))
+ADMIN_OR_PROJECT_READER_GET_NAMESPACE = any_of(
+    ADMIN, all_of(role('reader'),
+                  any_of(project('project_id'), visibility('public'))))
+
+DEFAULT_RULES = {
+    'context_is_admin': ADMIN,
+
+    'add_image': any_of(ADMIN, all_of(role('member'), project('owner'))),
+    'delete_image': ADMIN_OR_PROJECT_MEMBER,
+    'get_image': ADMIN_OR_PROJECT_READER_GET_IMAGE,
+    'get_images': ADMIN_OR_PROJECT_READER,
+    'modify_image': ADMIN_OR_PROJECT_MEMBER,
+    'publicize_image': ADMIN,
+    'communitize_image': ADMIN_OR_PROJECT_MEMBER,
+    'download_image': ADMIN_OR_PROJECT_MEMBER_DOWNLOAD_IMAGE,
+    'upload_image': ADMIN_OR_PROJECT_MEMBER,
+    'copy_image': ADMIN,
+    'deactivate': ADMIN_OR_PROJECT_MEMBER,
+    'reactivate': ADMIN_OR_PROJECT_MEMBER,
+
+    'add_member': ADMIN_OR_PROJECT_MEMBER,
+    'delete_member': ADMIN_OR_PROJECT_MEMBER,
+    'get_member': ADMIN_OR_PROJECT_READER_OR_SHARED_MEMBER,
+    'get_members': ADMIN_OR_PROJECT_READER_OR_SHARED_MEMBER,
+    'modify_member': ADMIN_OR_SHARED_MEMBER,
+
+    'get_metadef_namespace': ADMIN_OR_PROJECT_READER_GET_NAMESPACE,
+    'get_metadef_namespaces': any_of(ADMIN, role('reader')),
+    'modify_metadef_namespace': ADMIN,
+    'add_metadef_namespace': ADMIN,
+    'delete_metadef_namespace': ADMIN,
+    'get_metadef_object': ADMIN_OR_PROJECT_READER_GET_NAMESPACE,
+    'get_metadef_objects': ADMIN_OR_PROJECT_READER_GET_NAMESPACE,
+    'modify_metadef_object': ADMIN,
+    'add_metadef_object': ADMIN,
+    'delete_metadef_object': ADMIN,
+    'list_metadef_resource_types': any_of(ADMIN, role('reader')),
+    'get_metadef_resource_type': ADMIN_OR_PROJECT_READER_GET_NAMESPACE,
+    'add_metadef_resource_type_association': ADMIN,
+    'remove_metadef_resource_type_association': ADMIN,
+    'get_metadef_property': ADMIN_OR_PROJECT_READER_GET_NAMESPACE,
+    'get_metadef_properties': ADMIN_OR_PROJECT_READER_GET_NAMESPACE,
+    'modify_metadef_property': ADMIN,
+    'add_metadef_property': ADMIN,
+    'remove_metadef_property': ADMIN,
+    'get_metadef_tag': ADMIN_OR_PROJECT_READER_GET_NAMESPACE,
+    'get_metadef_tags': ADMIN_OR_PROJECT_READER_GET_NAMESPACE,
+    'modify_metadef_tag': ADMIN,
+    'add_metadef_tag': ADMIN,
+    'add_metadef_tags': ADMIN,
+    'delete_metadef_tag': ADMIN,
+    'delete_metadef_tags': ADMIN,
+}
+
+
+class Enforcer(object):
+    """Check operations against a set of rules.
+
+    :param rules: Rules overriding or adding to DEFAULT_RULES.
+    """
+
+    def __init__(self, rules=None):
+        self.rules = dict(DEFAULT_RULES)
+        self.rules.update(rules or {})
+
+    def check(self, name, creds, target):
+        # Scope is enforced: glance only accepts project-scoped tokens.
+        if creds['project_id'] is None:
+            return False
+        return self.rules[name](creds, target)
+
+    def is_admin(self, creds):
+        return self.rules['context_is_admin'](creds, {})
@@ -0,0 +1,202 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""In-process stand-in for the image and identity services.
+
+The fake cloud implements the parts of the Glance v2 and Keystone v3 APIs
+used by this plugin, keeping everything in memory, so the test suites can
+run without a deployed cloud::
+
+    $ python -m glance_tempest_plugin.services.fake.server \\
+        --port 8800 --tempest-config etc/tempest.conf
+
+starts it and writes a tempest configuration pointing at it. The policy
+rules of the image service can be replaced, see FakeCloud.
+"""
+import argparse
+import configparser
+from http import server
+import threading
+from urllib import parse
+
+from glance_tempest_plugin.services.fake import common
+from glance_tempest_plugin.services.fake import identity
+from glance_tempest_plugin.services.fake import image
+from glance_tempest_plugin.services.fake import metadefs
+from glance_tempest_plugin.services.fake import policy
+from glance_tempest_plugin.services import webserver
+
+
+class RequestHandler(webserver.KeepAliveHandler):
+    def _read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                if not size:
+                    # Skip the trailers up to the final empty line.
+                    while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                        pass
+                    return b''.join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _handle(self):
+        url = parse.urlsplit(self.path)
+        query = dict(parse.parse_qsl(url.query, keep_blank_values=True))
+        request = common.Request(self.command, url.path, query,
+                                 self.headers, self._read_body())
+        try:
+            response = self.server.router.dispatch(request)
+        except common.HTTPError as e:
+            response = common.Response(
+                e.status, {'error': {'code': e.status, 'message': e.message}})
+        except Exception as e:
+            response = common.Response(
+                500, {'error': {'code': 500, 'message': str(e)}})
+        self.send_response(response.status)
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(response.body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(response.body)
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+
+class FakeCloud(object):
+    """The fake image and identity services, served over HTTP.
+
+    :param host: The address to listen on.
+    :param port: The port to listen on, 0 to pick a free one.
+    :param policy_rules: Image service policy rules overriding the defaults
+                         in :mod:`policy`.
+    """
+
+    admin_username = 'admin'
+    admin_password = 'secretadmin'
+    admin_project_name = 'admin'
+    region = 'RegionOne'
+
+    def __init__(self, host='127.0.0.1', port=0, policy_rules=None):
+        self._server = server.ThreadingHTTPServer((host, port),
+                                                  RequestHandler)
+        self._server.daemon_threads = True
+        self._thread = None
+        self.enforcer = policy.Enforcer(policy_rules)
+        self.identity = identity.IdentityAPI(self)
+        self.image = image.ImageAPI(self)
+        self.metadefs = metadefs.MetadefAPI(self)
+        router = common.Router(self.identity)
+        self.identity.add_routes(router)
+        self.image.add_routes(router)
+        self.metadefs.add_routes(router)
+        self._server.router = router
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://%s:%s' % (host, port)
+
+    @property
+    def identity_url(self):
+        return self.url + '/identity/v3'
+
+    @property
+    def image_url(self):
+        return self.url + '/image'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def tempest_config(self):
+        """Return the tempest configuration for running against the cloud.
+
+        :returns: A dict of configuration sections, each a dict of options.
+        """
+        return {
+            'auth': {
+                'use_dynamic_credentials': 'true',
+                'create_isolated_networks': 'false',
+                'admin_username': self.admin_username,
+                'admin_password': self.admin_password,
+                'admin_project_name': self.admin_project_name,
+                'admin_domain_name': 'Default',
+            },
+            'identity': {
+                'auth_version': 'v3',
+                'uri_v3': self.identity_url,
+                'region': self.region,
+            },
+            'identity-feature-enabled': {
+                'api_v2': 'false',
+            },
+            'service_available': {
+                'glance': 'true',
+                'cinder': 'false',
+                'neutron': 'false',
+                'nova': 'false',
+                'swift': 'false',
+            },
+            'image': {
+                'build_interval': '0',
+            },
+            'enforce_scope': {
+                'glance': 'true',
+            },
+            # The fake fetches web-download imports from any port.
+            'glance_perf': {
+                'import_methods': 'glance-direct,web-download',
+            },
+        }
+
+    def write_tempest_config(self, path):
+        config = configparser.ConfigParser()
+        config.read_dict(self.tempest_config())
+        with open(path, 'w') as f:
+            config.write(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--tempest-config',
+                        help='Write a tempest configuration for the cloud '
+                             'to this path.')
+    args = parser.parse_args()
+    cloud = FakeCloud(host=args.host, port=args.port)
+    if args.tempest_config:
+        cloud.write_tempest_config(args.tempest_config)
+    print('Serving the fake cloud on %s' % cloud.url, flush=True)
+    try:
+        cloud.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
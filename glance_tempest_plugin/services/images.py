@@ -0,0 +1,191 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import time
+
+from tempest.lib import exceptions
+
+from glance_tempest_plugin.services import waiter
+
+
+class ImportFailed(exceptions.TempestException):
+    message = 'Import of image %(image_id)s failed: %(reason)s'
+
+
+def store_list(value):
+    """Split a comma separated list of stores, as glance reports them."""
+    return [store for store in (value or '').split(',') if store]
+
+
+def writable_stores(client):
+    """Return the IDs of the stores images can be imported to.
+
+    :returns: The stores, the default one first, or None if the image
+              service doesn't have multiple stores enabled.
+    """
+    try:
+        stores = client.info_stores()['stores']
+    except exceptions.NotFound:
+        return None
+    stores = [store for store in stores if not store.get('read-only')]
+    stores.sort(key=lambda store: not store.get('default'))
+    return [store['id'] for store in stores]
+
+
+class ImageImport(object):
+    """Import data into an image, recording when each step happens.
+
+    The times are time.monotonic() values, None until the step happened:
+
+    * started: the start of the stage call, or of the import call if the
+      data isn't staged.
+    * staged: the stage call returning.
+    * called, returned: the import call being made and returning.
+    * picked_up: the import task seen leaving pending, if tracked.
+    * active: the image seen active.
+    * stored: when each store was seen holding the data of the image.
+    * done: the image seen active and not importing to any store, with
+      the stores imported to holding the data or failing.
+
+    The image is polled with a waiter.Backoff from poll_interval to
+    max_interval, which starts over whenever a poll sees progress.
+
+    :param client: The images client used to import.
+    :param image_id: The image to import data into, in queued status, or
+                     to copy to other stores, in active status.
+    :param poll_interval: The interval the image is polled at, in seconds.
+    :param max_interval: The longest interval between two polls.
+    :param timeout: How long to wait for the import, in seconds.
+    """
+
+    def __init__(self, client, image_id, poll_interval=0.05,
+                 max_interval=None, timeout=300):
+        self.client = client
+        self.image_id = image_id
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval or poll_interval
+        self.timeout = timeout
+        self.polls = 0
+        self.started = None
+        self.staged = None
+        self.called = None
+        self.returned = None
+        self.picked_up = None
+        self.active = None
+        self.stored = {}
+        self.done = None
+        # The stores glance reported failing to import to.
+        self.failed = []
+        # The status of the import task as last shown, if tracked.
+        self.task = None
+        # Whether the image was seen importing.
+        self.running = False
+        # The stores imported to, if given to the import call.
+        self.stores = None
+
+    def stage(self, data):
+        self.started = time.monotonic()
+        self.client.stage_image_file(self.image_id, data)
+        self.staged = time.monotonic()
+
+    def start(self, method, import_params=None, stores=None,
+              all_stores_must_succeed=None):
+        """Make the import call.
+
+        :param stores: The stores to import to, or None for all of them.
+                       Copies have to give them, as their image is active
+                       before they start.
+        """
+        self.stores = stores
+        self.called = time.monotonic()
+        if self.started is None:
+            self.started = self.called
+        self.client.image_import(
+            self.image_id, method=method, import_params=import_params,
+            stores=stores, all_stores_must_succeed=all_stores_must_succeed)
+        self.returned = time.monotonic()
+
+    def poll_task(self, now):
+        """Show the status of the import task.
+
+        :param now: The time.monotonic() of the poll.
+        """
+        listed = self.client.show_image_tasks(self.image_id)['tasks']
+        if listed:
+            self.task = listed[0]['status']
+            if self.task != 'pending' and self.picked_up is None:
+                self.picked_up = now
+
+    def update(self, image, now):
+        """Record the progress of the import shown by a poll of the image.
+
+        :param image: The image, as shown or listed.
+        :param now: The time.monotonic() of the poll.
+        :returns: Whether the import is done.
+        :raises ImportFailed: If the image goes back to queued, as it does
+                              when the import fails. The image of a
+                              web-download import stays queued until its
+                              task is picked up, so that only counts once
+                              the image was seen importing or the task
+                              failing.
+        """
+        for store in store_list(image.get('stores')):
+            self.stored.setdefault(store, now)
+        self.failed = store_list(image.get('os_glance_failed_import'))
+        if image['status'] == 'importing':
+            self.running = True
+        if image['status'] == 'queued' and (
+                self.running or self.task == 'failure'):
+            raise ImportFailed(image_id=self.image_id,
+                               reason='failed stores %s' % self.failed)
+        if image['status'] != 'active':
+            return False
+        if self.active is None:
+            self.active = now
+        if store_list(image.get('os_glance_importing_to_stores')):
+            return False
+        # Glance only sets os_glance_importing_to_stores once the task is
+        # picked up, and the image of a copy is active all along.
+        if self.stores and self.task not in ('success', 'failure') and (
+                not set(self.stores) <= set(self.stored) | set(self.failed)):
+            return False
+        self.done = now
+        return True
+
+    def wait(self, tasks=False):
+        """Poll the image until the import is done.
+
+        :param tasks: Whether to also poll the image tasks API, available
+                      from version 2.12, for when the task is picked up.
+        :returns: The image as last shown.
+        :raises ImportFailed: If the import fails, see update().
+        :raises TimeoutException: If the import takes longer than timeout.
+        """
+        backoff = waiter.Backoff(self.poll_interval, self.max_interval)
+        while True:
+            now = time.monotonic()
+            self.polls += 1
+            progress = (self.picked_up, len(self.stored))
+            if tasks and (self.picked_up is None or not self.running):
+                self.poll_task(now)
+            image = self.client.show_image(self.image_id)
+            if self.update(image, now):
+                # The task may have been processed between two polls.
+                if tasks and self.picked_up is None:
+                    self.picked_up = self.active
+                return image
+            if now - self.returned > self.timeout:
+                raise exceptions.TimeoutException(
+                    'Image %s was not imported within %ds' %
+                    (self.image_id, self.timeout))
+            if progress != (self.picked_up, len(self.stored)):
+                backoff.reset()
+            time.sleep(backoff.next())
@@ -0,0 +1,126 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import json
+import os
+import threading
+import time
+
+from testtools import content
+from testtools import content_type
+
+JSON_LINES = content_type.ContentType('application', 'jsonl',
+                                      {'charset': 'utf8'})
+
+
+class Hook(object):
+    """Receive a record of the API calls made by tests.
+
+    A record is a dict with the test, method, persona, expected_status,
+    status, wall_time (in seconds) and response_size (in bytes, None when
+    it is unknown) of a call.
+    """
+
+    def record(self, test, record):
+        """Called after every call."""
+
+    def finish(self, test):
+        """Called once the test is over."""
+
+
+class JSONLinesHook(Hook):
+    """Append the records to a file, one JSON document per line."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def record(self, test, record):
+        line = json.dumps(record, sort_keys=True) + '\n'
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line)
+
+
+class AttachmentHook(Hook):
+    """Attach the records of each test to its result as JSON lines."""
+
+    name = 'api-calls'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = {}
+
+    def record(self, test, record):
+        with self._lock:
+            self._records.setdefault(test.id(), []).append(record)
+
+    def finish(self, test):
+        with self._lock:
+            records = self._records.pop(test.id(), [])
+        if records:
+            lines = ''.join(json.dumps(record, sort_keys=True) + '\n'
+                            for record in records).encode('utf8')
+            test.addDetail(self.name,
+                           content.Content(JSON_LINES, lambda: [lines]))
+
+
+def _response_size(response, result=None):
+    for name, value in (response or {}).items():
+        if name.lower() == 'content-length':
+            return int(value)
+    # Chunked responses have no content-length, but the raw bodies of the
+    # download calls are kept whole. The size of the JSON ones is unknown.
+    data = getattr(result, 'data', None)
+    if isinstance(data, bytes):
+        return len(data)
+    return None
+
+
+def instrument(call, hooks, test, method, persona, expected_status):
+    """Wrap a call so every hook records it.
+
+    :param call: The callable making the call, taking no arguments.
+    :param hooks: The hooks to notify.
+    :param test: The test case making the call.
+    :param method: The name of the client method called.
+    :param persona: The name of the credentials making the call.
+    :param expected_status: The expected status code, or the exception
+                            class the call is expected to raise.
+    """
+    if isinstance(expected_status, type(Exception)):
+        expected = expected_status.__name__
+    else:
+        expected = expected_status
+
+    def instrumented():
+        record = {'test': test.id(), 'method': method, 'persona': persona,
+                  'expected_status': expected}
+        response = result = None
+        start = time.monotonic()
+        try:
+            result = call()
+        except Exception as e:
+            response = getattr(e, 'resp', None)
+            raise
+        else:
+            response = getattr(result, 'response', None)
+            return result
+        finally:
+            record['wall_time'] = time.monotonic() - start
+            record['status'] = getattr(response, 'status', None)
+            record['response_size'] = _response_size(response, result)
+            for hook in hooks:
+                hook.record(test, record)
+    return instrumented
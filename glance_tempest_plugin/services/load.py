@@ -0,0 +1,101 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from concurrent import futures
+import threading
+import time
+
+from glance_tempest_plugin.services import benchmark
+
+
+def expected_outcome(expected_status, response=None, error=None):
+    """Whether a call ended the way it was expected to.
+
+    :param expected_status: The expected status code, or the exception
+                            class the call is expected to raise.
+    :param response: What the call returned, if it returned.
+    :param error: What the call raised, if it raised.
+    """
+    if isinstance(expected_status, type(Exception)):
+        return isinstance(error, expected_status)
+    resp = getattr(response, 'response', None)
+    return (error is None and resp is not None and
+            resp.status == expected_status)
+
+
+class LoadGenerator(object):
+    """Fire the same call many times from concurrent workers.
+
+    Latencies and the number of calls which didn't end as expected are
+    collected per API and per persona.
+
+    :param requests: The number of times each call is made.
+    :param workers: The number of calls running at the same time.
+    """
+
+    def __init__(self, requests, workers=1):
+        self.requests = requests
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._results = {}
+
+    def _record(self, api, persona, seconds, ok):
+        with self._lock:
+            result = self._results.setdefault((api, persona), {
+                'requests': 0, 'errors': 0,
+                'histogram': benchmark.Histogram()})
+            result['requests'] += 1
+            result['histogram'].add(seconds)
+            if not ok:
+                result['errors'] += 1
+
+    def _call(self, api, persona, call, expected_status):
+        start = time.monotonic()
+        try:
+            response = call()
+        except Exception as e:
+            ok = expected_outcome(expected_status, error=e)
+        else:
+            ok = expected_outcome(expected_status, response=response)
+        self._record(api, persona, time.monotonic() - start, ok)
+
+    def run(self, api, persona, call, expected_status):
+        """Make a call repeatedly and wait for all of them to finish.
+
+        :param api: The name of the API the call is made to.
+        :param persona: The name of the persona making the call.
+        :param call: A callable taking no arguments making the call.
+        :param expected_status: The expected status code, or the exception
+                                class the call is expected to raise.
+        """
+        start = time.monotonic()
+        with futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for _ in range(self.requests):
+                executor.submit(self._call, api, persona, call,
+                                expected_status)
+        elapsed = time.monotonic() - start
+        with self._lock:
+            result = self._results[(api, persona)]
+            result['elapsed'] = result.get('elapsed', 0) + elapsed
+
+    def report(self):
+        """Return the results, as {api: {persona: result}}."""
+        report = {}
+        with self._lock:
+            for (api, persona), result in sorted(self._results.items()):
+                summary = result['histogram'].to_dict()
+                summary.update(requests=result['requests'],
+                               errors=result['errors'])
+                if result.get('elapsed'):
+                    summary['requests_per_sec'] = (result['requests'] /
+                                                   result['elapsed'])
+                report.setdefault(api, {})[persona] = summary
+        return report
@@ -0,0 +1,114 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import hashlib
+import random
+
+CHUNK_SIZE = 64 * 1024
+# A prime, so consecutive chunks are rotated by different offsets.
+ROTATION_STRIDE = 7919
+
+
+class Payload(object):
+    """A file-like object generating image data as it is read.
+
+    The data is generated one chunk at a time, so uploading an image of
+    any size takes constant memory. It is deterministic: two payloads with
+    the same size, seed and chunk size produce the same bytes, however
+    they are read.
+
+    Generating random data is slower than most networks, so only one
+    random block is generated per payload and every chunk is a different
+    rotation of it.
+
+    Unless disabled, the checksums of the data read so far are kept up to
+    date, and match the checksum and os_hash_value glance computes once
+    everything has been read.
+
+    :param size: The number of bytes to generate.
+    :param seed: The seed of the pseudo-random data, or None for zeros.
+    :param chunk_size: The number of bytes generated at a time.
+    :param checksums: Whether to compute the checksums of the data.
+    """
+
+    def __init__(self, size, seed=None, chunk_size=CHUNK_SIZE,
+                 checksums=True):
+        self.size = size
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.checksums = checksums
+        self.bytes_read = 0
+        if seed is None:
+            self._block = bytes(chunk_size)
+        else:
+            self._block = random.Random(seed).getrandbits(
+                chunk_size * 8).to_bytes(chunk_size, 'little')
+        self._chunks = 0
+        self._generated = 0
+        self._buffer = bytearray()
+        self._md5 = hashlib.md5()
+        self._sha512 = hashlib.sha512()
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def _generate(self):
+        size = min(self.chunk_size, self.size - self._generated)
+        offset = self._chunks * ROTATION_STRIDE % self.chunk_size
+        self._chunks += 1
+        self._generated += size
+        return (self._block[offset:] + self._block[:offset])[:size]
+
+    def read(self, size=-1):
+        remaining = self.size - self.bytes_read
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        while len(self._buffer) < size:
+            self._buffer.extend(self._generate())
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self.bytes_read += size
+        if self.checksums:
+            self._md5.update(data)
+            self._sha512.update(data)
+        return data
+
+    @property
+    def checksum(self):
+        """The MD5 of the data read so far."""
+        return self._md5.hexdigest()
+
+    @property
+    def os_hash_value(self):
+        """The SHA-512 of the data read so far."""
+        return self._sha512.hexdigest()
+
+    def matches(self, chunks):
+        """Whether a stream of chunks is the data of the payload.
+
+        The chunks are compared as they come, against data generated again
+        from the seed, so neither side is held in memory.
+
+        :param chunks: An iterable of bytes, of any size.
+        """
+        expected = Payload(self.size, seed=self.seed,
+                           chunk_size=self.chunk_size, checksums=False)
+        for chunk in chunks:
+            if expected.read(len(chunk)) != chunk:
+                return False
+        return expected.bytes_read == expected.size
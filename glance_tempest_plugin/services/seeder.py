@@ -0,0 +1,305 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from concurrent import futures
+import threading
+import time
+import uuid
+
+from tempest import config
+from tempest.lib.common.utils import data_utils
+from tempest.lib.common.utils import test_utils
+from tempest.lib import exceptions
+from urllib3 import exceptions as urllib3_exceptions
+
+CONF = config.CONF
+
+# Errors a call is retried on. Anything else is raised right away.
+RETRIABLE = (
+    exceptions.ServerFault,
+    exceptions.UnexpectedResponseCode,
+    exceptions.RateLimitExceeded,
+    exceptions.TimeoutException,
+    urllib3_exceptions.HTTPError,
+    ConnectionError,
+)
+
+
+def _resolve(value, index):
+    return value(index) if callable(value) else value
+
+
+class Seeder(object):
+    """Create and delete resources in bulk.
+
+    Calls are made from a bounded pool of workers. Calls failing with a
+    transient error are retried with exponential backoff.
+
+    :param workers: The number of calls running at the same time.
+    :param retries: The number of times a failing call is retried.
+    :param backoff: The delay before the first retry, in seconds. It is
+                    doubled for every retry after that.
+    """
+
+    def __init__(self, workers=16, retries=3, backoff=0.5):
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self._lock = threading.Lock()
+
+    def _call(self, func, *args, **kwargs):
+        for attempt in range(self.retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except RETRIABLE:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def _create(self, func, *args, **kwargs):
+        """Make a create call, which may have reached the server before."""
+        try:
+            return self._call(func, *args, **kwargs)
+        except exceptions.Conflict:
+            # Created by an attempt which failed after reaching the server.
+            return None
+
+    def _run(self, func, args_list):
+        """Call func with every set of args, raising the first error."""
+        with futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = [executor.submit(func, *args) for args in args_list]
+        results = []
+        errors = []
+        for future in pending:
+            if future.exception() is None:
+                results.append(future.result())
+            else:
+                errors.append(future.exception())
+        if errors:
+            raise errors[0]
+        return results
+
+
+class ImageSeeder(Seeder):
+    """Create and delete image records in bulk.
+
+    Every image is created with an ID picked by the seeder, so a create
+    retried after it reached the server is detected as a conflict rather
+    than creating a duplicate.
+
+    :param client: The images client to create the images with.
+    :param member_client: The image members client, needed to share images
+                          with other projects.
+    :param workers: The number of calls running at the same time.
+    :param retries: The number of times a failing call is retried.
+    :param backoff: The delay before the first retry, in seconds. It is
+                    doubled for every retry after that.
+    """
+
+    def __init__(self, client, member_client=None, workers=16, retries=3,
+                 backoff=0.5):
+        super().__init__(workers, retries, backoff)
+        self.client = client
+        self.member_client = member_client
+        self.images = []
+
+    def _create_image(self, index, visibility, properties, tags, members,
+                      name_prefix):
+        image_id = str(uuid.uuid4())
+        kwargs = dict(_resolve(properties, index) or {})
+        kwargs.update(id=image_id,
+                      name=data_utils.rand_name('%s-%d' % (name_prefix,
+                                                           index)),
+                      visibility=visibility,
+                      tags=list(_resolve(tags, index) or []))
+        kwargs.setdefault('container_format', CONF.image.container_formats[0])
+        kwargs.setdefault('disk_format', CONF.image.disk_formats[0])
+        image = (self._create(self.client.create_image, **kwargs) or
+                 self._call(self.client.show_image, image_id))
+        with self._lock:
+            self.images.append(image)
+
+        if visibility == 'shared':
+            for member in _resolve(members, index) or []:
+                self._add_member(image_id, member)
+        return image
+
+    def _add_member(self, image_id, member):
+        self._create(self.member_client.create_image_member, image_id,
+                     member=member)
+
+    def seed(self, count, visibilities=None, properties=None, tags=None,
+             members=None, name_prefix='seed'):
+        """Create image records.
+
+        The properties, tags and members can be callables taking the index
+        of the image, counting every image created by the seeder, and
+        returning the value for that image.
+
+        :param count: The number of images to create.
+        :param visibilities: The mix of visibilities, as a dict mapping each
+                             visibility to its share of the images. The
+                             images are all private by default.
+        :param properties: The extra properties of the images, as a dict.
+        :param tags: The tags of the images, as a list.
+        :param members: The projects shared images are shared with, as a
+                        list of project IDs.
+        :param name_prefix: The prefix of the names of the images.
+        :returns: The created images.
+        :raises: The first error raised creating an image, once every image
+                 has been attempted. The images which were created are still
+                 deleted by cleanup().
+        """
+        if members and self.member_client is None:
+            raise ValueError('A member client is needed to share images')
+        cycle = [visibility
+                 for visibility, share in (visibilities or
+                                           {'private': 1}).items()
+                 for _ in range(share)]
+        with self._lock:
+            first = len(self.images)
+        args_list = [(index, cycle[index % len(cycle)], properties, tags,
+                      members, name_prefix)
+                     for index in range(first, first + count)]
+        return self._run(self._create_image, args_list)
+
+    def share(self, image_id, members):
+        """Share an image with many projects.
+
+        The members are deleted along with the image, so they are not
+        tracked for cleanup().
+
+        :param image_id: The ID of a shared image.
+        :param members: The IDs of the projects to share the image with.
+        :raises: The first error raised adding a member, once every member
+                 has been attempted.
+        """
+        if self.member_client is None:
+            raise ValueError('A member client is needed to share images')
+        self._run(self._add_member, [(image_id, member)
+                                     for member in members])
+
+    def _delete(self, image):
+        test_utils.call_and_ignore_notfound_exc(
+            self._call, self.client.delete_image, image['id'])
+
+    def cleanup(self):
+        """Delete every image created by the seeder."""
+        with self._lock:
+            images, self.images = self.images, []
+        self._run(self._delete, [(image,) for image in images])
+
+
+class MetadefSeeder(Seeder):
+    """Create and delete metadef namespaces and their contents in bulk.
+
+    The namespaces are created first, then their objects, properties, tags
+    and resource type associations, all from the same pool of workers. The
+    tags of a namespace are created by a single bulk call.
+
+    :param namespaces_client: The namespaces client.
+    :param objects_client: The namespace objects client.
+    :param properties_client: The namespace properties client.
+    :param tags_client: The namespace tags client.
+    :param resource_types_client: The resource types client, needed to
+                                  associate namespaces with resource types.
+    :param workers: The number of calls running at the same time.
+    :param retries: The number of times a failing call is retried.
+    :param backoff: The delay before the first retry, in seconds. It is
+                    doubled for every retry after that.
+    """
+
+    def __init__(self, namespaces_client, objects_client, properties_client,
+                 tags_client, resource_types_client=None, workers=16,
+                 retries=3, backoff=0.5):
+        super().__init__(workers, retries, backoff)
+        self.namespaces_client = namespaces_client
+        self.objects_client = objects_client
+        self.properties_client = properties_client
+        self.tags_client = tags_client
+        self.resource_types_client = resource_types_client
+        self.namespaces = []
+
+    def _create_namespace(self, name, visibility):
+        self._create(self.namespaces_client.create_namespace,
+                     namespace=name, visibility=visibility)
+        with self._lock:
+            self.namespaces.append(name)
+        return name
+
+    def seed(self, count, objects=0, properties=0, tags=0, visibilities=None,
+             resource_types=None, name_prefix='seed'):
+        """Create namespaces and fill them.
+
+        :param count: The number of namespaces to create.
+        :param objects: The number of objects in each namespace.
+        :param properties: The number of properties in each namespace.
+        :param tags: The number of tags in each namespace.
+        :param visibilities: The mix of visibilities, as a dict mapping each
+                             visibility to its share of the namespaces. The
+                             namespaces are all private by default.
+        :param resource_types: The resource types the namespaces are
+                               associated with, one per namespace in turn.
+        :param name_prefix: The prefix of the names of the namespaces.
+        :returns: The names of the created namespaces.
+        :raises: The first error raised by a create, once every create of
+                 the same step has been attempted. The namespaces which were
+                 created are still deleted by cleanup().
+        """
+        if resource_types and self.resource_types_client is None:
+            raise ValueError('A resource types client is needed to '
+                             'associate namespaces with resource types')
+        cycle = [visibility
+                 for visibility, share in (visibilities or
+                                           {'private': 1}).items()
+                 for _ in range(share)]
+        with self._lock:
+            first = len(self.namespaces)
+        names = self._run(self._create_namespace, [
+            (data_utils.rand_name('%s-%d' % (name_prefix, index)),
+             cycle[index % len(cycle)])
+            for index in range(first, first + count)])
+
+        calls = []
+        if resource_types:
+            associate = (
+                self.resource_types_client.create_resource_type_association)
+        for index, name in enumerate(names):
+            calls += [(self.objects_client.create_namespace_object, name,
+                       {'name': 'object-%d' % i})
+                      for i in range(objects)]
+            calls += [(self.properties_client.create_namespace_property,
+                       name, {'name': 'property-%d' % i,
+                              'title': 'property-%d' % i,
+                              'type': 'string'})
+                      for i in range(properties)]
+            if tags:
+                calls.append((self.tags_client.create_namespace_tags, name,
+                              {'tags': [{'name': 'tag-%d' % i}
+                                        for i in range(tags)]}))
+            if resource_types:
+                calls.append((associate, name, {
+                    'name': resource_types[index % len(resource_types)]}))
+        self._run(self._create_item, calls)
+        return names
+
+    def _create_item(self, create, namespace, kwargs):
+        self._create(create, namespace, **kwargs)
+
+    def _delete(self, name):
+        test_utils.call_and_ignore_notfound_exc(
+            self._call, self.namespaces_client.delete_namespace, name)
+
+    def cleanup(self):
+        """Delete every namespace created by the seeder."""
+        with self._lock:
+            namespaces, self.namespaces = self.namespaces, []
+        self._run(self._delete, [(name,) for name in namespaces])
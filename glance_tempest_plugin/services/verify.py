@@ -0,0 +1,101 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import hashlib
+import time
+
+from glance_tempest_plugin.services import payload
+
+
+class DownloadVerifier(object):
+    """Check the data of an image download against the image's checksums.
+
+    The body is consumed in chunks and every hash is updated as they come,
+    so the download is never held in memory.
+
+    :param image: The image being downloaded, as returned by show_image.
+    :param chunk_size: The size of the chunks the body is read in.
+    """
+
+    algorithms = ['md5', 'sha256', 'sha512']
+
+    def __init__(self, image, chunk_size=payload.CHUNK_SIZE):
+        self.image = image
+        self.chunk_size = chunk_size
+        self.hashes = dict((name, hashlib.new(name))
+                           for name in self.algorithms)
+        hash_algo = image.get('os_hash_algo')
+        if hash_algo and hash_algo not in self.hashes:
+            self.hashes[hash_algo] = hashlib.new(hash_algo)
+        self.bytes_read = 0
+        self.time_to_first_byte = None
+        self.elapsed = None
+
+    def update(self, chunk):
+        self.bytes_read += len(chunk)
+        for digest in self.hashes.values():
+            digest.update(chunk)
+
+    def stream(self, response, start=None):
+        """Read a whole download, yielding its chunks once hashed.
+
+        :param response: The raw response returned by
+                         show_image_file(chunked=True). Its connection is
+                         released once the body has been read.
+        :param start: The time.monotonic() the download was requested at,
+                      so the timings include the request. Defaults to when
+                      the response starts being read.
+        """
+        if start is None:
+            start = time.monotonic()
+        try:
+            for chunk in response.stream(self.chunk_size):
+                if self.time_to_first_byte is None:
+                    self.time_to_first_byte = time.monotonic() - start
+                self.update(chunk)
+                yield chunk
+        finally:
+            response.release_conn()
+        self.elapsed = time.monotonic() - start
+
+    def consume(self, response, start=None):
+        """Read a whole download, see stream()."""
+        for _ in self.stream(response, start=start):
+            pass
+
+    def hexdigest(self, name):
+        return self.hashes[name].hexdigest()
+
+    @property
+    def bytes_per_sec(self):
+        if not self.elapsed:
+            return None
+        return self.bytes_read / self.elapsed
+
+    def mismatches(self):
+        """Return the differences between the download and the image.
+
+        :returns: A list of messages, empty if the size, checksum and
+                  os_hash_value of the image all match the data read.
+        """
+        errors = []
+        expected = [('size', self.image.get('size'), self.bytes_read),
+                    ('checksum', self.image.get('checksum'),
+                     self.hexdigest('md5'))]
+        hash_algo = self.image.get('os_hash_algo')
+        if hash_algo:
+            expected.append(('os_hash_value', self.image.get('os_hash_value'),
+                             self.hexdigest(hash_algo)))
+        for name, value, actual in expected:
+            if value is not None and value != actual:
+                errors.append('%s of image %s is %s but the download has %s'
+                              % (name, self.image['id'], value, actual))
+        return errors
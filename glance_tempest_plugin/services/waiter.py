@@ -0,0 +1,193 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import copy
+import random
+import time
+
+from tempest.lib import exceptions
+
+from glance_tempest_plugin.services import benchmark
+
+
+class Backoff(object):
+    """Intervals growing exponentially up to a cap, with jitter.
+
+    Every interval is the previous one times factor, up to maximum, then
+    spread by up to jitter times itself either way, so many waiters started
+    together don't poll in lockstep.
+
+    :param initial: The first interval, in seconds.
+    :param maximum: The longest interval, in seconds, jitter aside.
+    :param factor: What each interval is multiplied by to get the next one.
+    :param jitter: The fraction of each interval it is randomly spread by.
+    """
+
+    def __init__(self, initial=0.05, maximum=2.0, factor=2.0, jitter=0.1):
+        self.initial = initial
+        self.maximum = max(maximum, initial)
+        self.factor = factor
+        self.jitter = jitter
+        self._interval = initial
+
+    def reset(self):
+        """Start over from the initial interval."""
+        self._interval = self.initial
+
+    def next(self):
+        """Return the interval to sleep for and grow the next one."""
+        interval = self._interval
+        self._interval = min(interval * self.factor, self.maximum)
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class Wait(object):
+    """The outcome and timings of a wait.
+
+    :ivar images: The images waited for, as last listed, by ID.
+    :ivar started: The time.monotonic() the wait started at.
+    :ivar reached: The time each image was first seen ready, in seconds
+                   since the start of the wait, by ID.
+    :ivar polls: The number of rounds of list calls made.
+    :ivar requests: The number of list calls made.
+    :ivar slept: The time spent sleeping between polls, in seconds.
+    :ivar elapsed: The time the wait took, in seconds.
+    """
+
+    def __init__(self):
+        self.images = {}
+        self.started = time.monotonic()
+        self.reached = {}
+        self.polls = 0
+        self.requests = 0
+        self.slept = 0.0
+        self.elapsed = None
+
+    def summary(self):
+        """Return the metrics of the wait as a JSON serializable dict."""
+        return {
+            'images': len(self.images),
+            'polls': self.polls,
+            'requests': self.requests,
+            'slept': self.slept,
+            'elapsed': self.elapsed,
+            'reached': benchmark.summarize(list(self.reached.values())),
+        }
+
+
+class ImageWaiter(object):
+    """Wait for many images to reach a status.
+
+    Rather than a show_image call per image, the images still being waited
+    for are listed batch_size at a time with list_images(id='in:...'), so
+    polling hundreds of images takes a handful of calls a round. Rounds
+    are spaced by a Backoff, which starts over whenever an image changes
+    status or becomes ready.
+
+    The images must be listed by the client: owned by its project, public,
+    community or shared with it and accepted, and not hidden.
+
+    :param client: The images client to list the images with.
+    :param backoff: The Backoff spacing the polls, one with the defaults if
+                    None. Each wait uses a copy of it, so waits can run
+                    concurrently.
+    :param timeout: How long to wait for, in seconds.
+    :param batch_size: The most images listed by a call. Each adds about 40
+                       characters to the URL.
+    """
+
+    def __init__(self, client, backoff=None, timeout=300, batch_size=100):
+        self.client = client
+        self.backoff = backoff or Backoff()
+        self.timeout = timeout
+        self.batch_size = batch_size
+
+    def _list(self, image_ids, wait):
+        images = {}
+        for first in range(0, len(image_ids), self.batch_size):
+            batch = image_ids[first:first + self.batch_size]
+            listed = self.client.list_images(params={
+                'id': 'in:%s' % ','.join(batch),
+                'limit': len(batch),
+            })['images']
+            wait.requests += 1
+            images.update((image['id'], image) for image in listed)
+        return images
+
+    def wait(self, image_ids, status='active', failed_statuses=('killed',),
+             on_change=None, ready=None):
+        """Poll images until they all reach a status.
+
+        :param image_ids: The IDs of the images to wait for.
+        :param status: The status to wait for.
+        :param failed_statuses: Statuses which mean the image will never
+                                reach status. Imports which fail leave the
+                                image queued, for instance.
+        :param on_change: A callable called with each image and the time
+                          since the start of the wait, in seconds, when the
+                          image is first listed and every time its status
+                          changes.
+        :param ready: A callable called with each image listed which is not
+                      ready yet, returning whether it is, to wait for
+                      something other than status. Copies to other stores,
+                      for instance, happen while the image stays active.
+        :returns: A Wait.
+        :raises NotFound: If an image is no longer listed.
+        :raises TimeoutException: If the images aren't all ready within
+                                  timeout.
+        """
+        if ready is None:
+            def ready(image):
+                return image['status'] == status
+
+        wait = Wait()
+        start = wait.started
+        pending = list(dict.fromkeys(image_ids))
+        backoff = copy.copy(self.backoff)
+        backoff.reset()
+        while True:
+            wait.polls += 1
+            images = self._list(pending, wait)
+            now = time.monotonic() - start
+            missing = [image_id for image_id in pending
+                       if image_id not in images]
+            if missing:
+                raise exceptions.NotFound('Images %s are no longer listed'
+                                          % ', '.join(missing))
+            changed = False
+            for image_id, image in images.items():
+                previous = wait.images.get(image_id)
+                wait.images[image_id] = image
+                if previous is None or previous['status'] != image['status']:
+                    changed = True
+                    if on_change is not None:
+                        on_change(image, now)
+                if image['status'] in failed_statuses:
+                    raise exceptions.TempestException(
+                        'Image %s went %s while waiting for it to become %s'
+                        % (image_id, image['status'], status))
+                if ready(image):
+                    changed = True
+                    wait.reached[image_id] = now
+            pending = [image_id for image_id in pending
+                       if image_id not in wait.reached]
+            if not pending:
+                wait.elapsed = time.monotonic() - start
+                return wait
+            if now > self.timeout:
+                raise exceptions.TimeoutException(
+                    '%d images were not ready within %ds: %s' %
+                    (len(pending), self.timeout, ', '.join(pending)))
+            if changed:
+                backoff.reset()
+            interval = backoff.next()
+            time.sleep(interval)
+            wait.slept += interval
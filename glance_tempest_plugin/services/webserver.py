@@ -0,0 +1,90 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""A local HTTP server for web-download imports to fetch image data from.
+
+GET /<size>/<seed> returns the data of payload.Payload(size, seed), which is
+generated as it is sent, so the server holds no images and serves any size.
+"""
+from http import server
+import re
+import threading
+
+from glance_tempest_plugin.services import payload
+
+PATH = re.compile(r'^/(?P<size>\d+)/(?P<seed>[^/?]+)$')
+
+
+class KeepAliveHandler(server.BaseHTTPRequestHandler):
+    """A request handler keeping connections alive, without logging."""
+
+    protocol_version = 'HTTP/1.1'
+    # The headers and the body are written separately, which would
+    # otherwise stall kept-alive connections until the client's delayed
+    # ACK.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PayloadHandler(KeepAliveHandler):
+    def do_GET(self):
+        match = PATH.match(self.path)
+        if match is None:
+            self.send_error(404)
+            return
+        data = payload.Payload(int(match.group('size')),
+                               seed=match.group('seed'), checksums=False)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(data.size))
+        self.end_headers()
+        for chunk in data:
+            self.wfile.write(chunk)
+
+
+class PayloadServer(object):
+    """Serve generated image data over HTTP from a thread.
+
+    The URLs point at host, which must be an address of the test node the
+    image service can reach.
+
+    :param host: The address to listen on and to put in the URLs.
+    :param port: The port to listen on, 0 to pick a free one.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.host = host
+        self._server = server.ThreadingHTTPServer((host, port),
+                                                  PayloadHandler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def url(self, size, seed):
+        """Return the URL of the data of Payload(size, seed)."""
+        return 'http://%s:%d/%d/%s' % (self.host, self.port, size, seed)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
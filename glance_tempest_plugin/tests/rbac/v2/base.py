@@ -10,15 +10,23 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 import abc
+import functools
 
 from tempest.api.image import base
-from tempest import clients
 from tempest import config
 from tempest.lib import auth
 from tempest.lib.common.utils import data_utils
 from tempest.lib.common.utils import test_utils
 from tempest.lib import exceptions
 
+from glance_tempest_plugin.services import benchmark
+from glance_tempest_plugin.services import cleanup
+from glance_tempest_plugin.services.clients import manager
+from glance_tempest_plugin.services import concurrency
+from glance_tempest_plugin.services import credentials
+from glance_tempest_plugin.services import instrumentation
+from glance_tempest_plugin.services import load
+
 CONF = config.CONF
 
 
@@ -26,6 +34,13 @@ class RbacBaseTests(base.BaseV2ImageTest):
 
     identity_version = 'v3'
 
+    client_manager = manager.Manager
+
+    # Lease the users returned by setup_user_client from a pool shared by
+    # every test in the worker process instead of creating new ones, if the
+    # pool is available.
+    pool_user_clients = True
+
     @classmethod
     def skip_checks(cls):
         super().skip_checks()
@@ -33,17 +48,81 @@ class RbacBaseTests(base.BaseV2ImageTest):
             raise cls.skipException("enforce_scope is not enabled for "
                                     "glance, skipping RBAC tests")
 
+    def setUp(self):
+        super().setUp()
+        # Resources registered here are deleted in batches once every other
+        # cleanup of the test has run.
+        self.cleanups = cleanup.CleanupManager()
+        self.addCleanup(self.cleanups.cleanup)
+        # With [glance_perf] load_requests set, the calls made through
+        # do_request are repeated that many times from load_workers
+        # concurrent workers, once the call has been checked. Only reads and
+        # calls expected to fail are repeated, so the load has no side
+        # effects. The latencies and errors are published as the rbac_load
+        # report of each test.
+        self.load = None
+        if CONF.glance_perf.load_requests:
+            self.load = load.LoadGenerator(CONF.glance_perf.load_requests,
+                                           CONF.glance_perf.load_workers)
+            self.addCleanup(self._publish_load)
+        # Hooks from glance_tempest_plugin.services.instrumentation notified
+        # of every call made through do_request, with its persona, statuses,
+        # wall time and response size, as set by [glance_perf]
+        # api_calls_file and attach_api_calls.
+        self.instrumentation_hooks = []
+        if CONF.glance_perf.api_calls_file:
+            self.instrumentation_hooks.append(instrumentation.JSONLinesHook(
+                CONF.glance_perf.api_calls_file))
+        if CONF.glance_perf.attach_api_calls:
+            self.instrumentation_hooks.append(
+                instrumentation.AttachmentHook())
+        for hook in self.instrumentation_hooks:
+            self.addCleanup(hook.finish, self)
+
+    def _publish_load(self):
+        report = self.load.report()
+        if not report:
+            return
+        benchmark.publish(self, 'rbac_load-%s' % self.id(), report,
+                          CONF.glance_perf.output_dir)
+        violations = []
+        for api, personas in sorted(report.items()):
+            for persona, result in sorted(personas.items()):
+                violations += benchmark.slo_violations(
+                    '%s as %s' % (api, persona), result['latency'],
+                    CONF.glance_perf.latency_slo)
+        self.assertEqual([], violations)
+
+    def persona_name(self, client):
+        """Return the name of the credentials a client belongs to."""
+        for name in self.credentials:
+            manager = getattr(self, 'os_%s' % name, None)
+            if manager is not None and any(
+                    client is value for value in vars(manager).values()):
+                return name
+        return 'user'
+
     def do_request(self, method, expected_status=200, client=None, **payload):
         if not client:
             client = self.client
+        call = functools.partial(getattr(client, method), **payload)
+        checked_call = call
+        if self.instrumentation_hooks:
+            checked_call = instrumentation.instrument(
+                call, self.instrumentation_hooks, self, method,
+                self.persona_name(client), expected_status)
+        response = None
         if isinstance(expected_status, type(Exception)):
-            self.assertRaises(expected_status,
-                              getattr(client, method),
-                              **payload)
+            self.assertRaises(expected_status, checked_call)
         else:
-            response = getattr(client, method)(**payload)
+            response = checked_call()
             self.assertEqual(response.response.status, expected_status)
-            return response
+        if self.load is not None and (
+                isinstance(expected_status, type(Exception)) or
+                method.startswith(('show_', 'list_'))):
+            self.load.run(method, self.persona_name(client), call,
+                          expected_status)
+        return response
 
     def setup_user_client(self, project_id=None):
         """Set up project user with its own client.
@@ -53,33 +132,39 @@ class RbacBaseTests(base.BaseV2ImageTest):
 
         Returns a client object and the user's ID.
         """
+        if self.pool_user_clients and credentials.pool_available():
+            pool = credentials.get_user_pool()
+            user = pool.lease(project_id=project_id)
+            self.cleanups.add('leased_user', pool.release, user)
+            return user.client
+
         user_dict = {
             'name': data_utils.rand_name('user'),
             'password': data_utils.rand_password(),
         }
         user_id = self.os_system_admin.users_v3_client.create_user(
             **user_dict)['user']['id']
-        self.addCleanup(self.os_system_admin.users_v3_client.delete_user,
-                        user_id)
+        self.cleanups.add('user',
+                          self.os_system_admin.users_v3_client.delete_user,
+                          user_id)
 
         if not project_id:
             project_id = self.os_system_admin.projects_client.create_project(
                 data_utils.rand_name())['project']['id']
-            self.addCleanup(
+            self.cleanups.add(
+                'project',
                 self.os_system_admin.projects_client.delete_project,
                 project_id)
 
-        member_role_id = self.os_system_admin.roles_v3_client.list_roles(
-            name='member')['roles'][0]['id']
+        member_role_id = credentials.get_role_id(
+            self.os_system_admin.roles_v3_client, 'member')
         self.os_system_admin.roles_v3_client.create_user_role_on_project(
             project_id, user_id, member_role_id)
         creds = auth.KeystoneV3Credentials(
             user_id=user_id,
             password=user_dict['password'],
             project_id=project_id)
-        auth_provider = clients.get_auth_provider(creds)
-        creds = auth_provider.fill_credentials()
-        client = clients.Manager(credentials=creds)
+        client = credentials.get_manager(creds)
         return client
 
 
@@ -92,8 +177,13 @@ def namespace(name, owner, visibility='private', protected=False):
 class RbacMetadefBase(RbacBaseTests):
     def create_namespaces(self):
         """Create private and public namespaces for different projects."""
-        project_namespaces = []
-        alt_namespaces = []
+        client = self.os_project_admin.namespaces_client
+        builder = concurrency.FixtureBuilder(
+            functools.partial(self.cleanups.add, 'namespace'))
+
+        def delete_namespace(ns):
+            client.delete_namespace(ns['namespace'])
+
         for visibility in ['public', 'private']:
             project_ns = "%s_%s_%s" % (
                 self.project_id,
@@ -103,31 +193,39 @@ class RbacMetadefBase(RbacBaseTests):
             alt_ns = "%s_%s_%s" % (self.alt_project_id, visibility,
                                    self.__class__.__name__)
 
-            project_namespace = \
-                self.os_project_admin.namespaces_client.create_namespace(
-                    **namespace(project_ns, self.project_id,
-                                visibility=visibility))
-            project_namespaces.append(project_namespace)
-            self.addCleanup(
-                test_utils.call_and_ignore_notfound_exc,
-                self.os_project_admin.namespaces_client.delete_namespace,
-                project_ns)
-
-            alt_namespace = \
-                self.os_project_admin.namespaces_client.create_namespace(
-                    **namespace(alt_ns, self.alt_project_id,
-                                visibility=visibility))
-            alt_namespaces.append(alt_namespace)
-            self.addCleanup(
-                test_utils.call_and_ignore_notfound_exc,
-                self.os_project_admin.namespaces_client.delete_namespace,
-                alt_ns)
-
+            builder.add(
+                client.create_namespace,
+                cleanup=delete_namespace,
+                **namespace(project_ns, self.project_id,
+                            visibility=visibility))
+
+            builder.add(
+                client.create_namespace,
+                cleanup=delete_namespace,
+                **namespace(alt_ns, self.alt_project_id,
+                            visibility=visibility))
+
+        namespaces = builder.build()
+        project_namespaces = namespaces[0::2]
+        alt_namespaces = namespaces[1::2]
         return project_namespaces + alt_namespaces
 
 
 class ImageV2RbacImageTest(RbacBaseTests):
 
+    # Set to True to create the images of shared_image_matrix once per class
+    # in resource_setup and hand them out to every test through
+    # shared_image(), instead of creating them in each test.
+    shared_image_fixtures = False
+
+    # The visibilities of the shared images, per owner. Only administrators
+    # can create public images.
+    shared_image_matrix = {
+        'project': ['private', 'shared', 'community'],
+        'other': ['private', 'shared', 'community'],
+        'admin': ['private', 'shared', 'community', 'public'],
+    }
+
     @classmethod
     def setup_clients(cls):
         super().setup_clients()
@@ -143,7 +241,99 @@ class ImageV2RbacImageTest(RbacBaseTests):
         super().setup_credentials()
         cls.os_primary = getattr(cls, f'os_{cls.credentials[0]}')
 
-    def image(self, visibility=None):
+    @classmethod
+    def resource_setup(cls):
+        super().resource_setup()
+        cls.image_owners = {}
+        cls.shared_images = {}
+        # The owners of the shared images are leased from the user pool, as
+        # setup_user_client only sets up users for a test. Without it, the
+        # images are created in each test.
+        if cls.shared_image_fixtures and credentials.pool_available():
+            cls._create_shared_images()
+
+    @classmethod
+    def _create_shared_images(cls):
+        pool = credentials.get_user_pool()
+        for owner, project_id in [
+                ('project', cls.persona.credentials.project_id),
+                ('other', None)]:
+            user = pool.lease(project_id=project_id)
+            cls.addClassResourceCleanup(pool.release, user)
+            cls.image_owners[owner] = user.client
+        cls.image_owners['admin'] = cls.admin_client
+
+        def delete_image(image):
+            test_utils.call_and_ignore_notfound_exc(
+                cls.admin_images_client.delete_image, image['id'])
+
+        builder = concurrency.FixtureBuilder(cls.addClassResourceCleanup)
+        keys = []
+        for owner, visibilities in cls.shared_image_matrix.items():
+            client = cls.image_owners[owner].image_client_v2
+            for visibility in visibilities:
+                keys.append((owner, visibility))
+                builder.add(client.create_image, cleanup=delete_image,
+                            **cls.image(visibility=visibility))
+        cls.shared_images = dict(zip(keys, builder.build()))
+
+    def setUp(self):
+        super().setUp()
+        self._image_owners = dict(self.image_owners)
+
+    def image_owner(self, owner):
+        """Return the client manager of an image owner.
+
+        :param owner: 'project' for a member of the persona's project,
+                      'other' for a member of another project or 'admin' for
+                      the project administrator.
+        """
+        if owner not in self._image_owners:
+            if owner == 'project':
+                client = self.setup_user_client(
+                    project_id=self.persona.credentials.project_id)
+            elif owner == 'other':
+                client = self.setup_user_client()
+            else:
+                client = self.admin_client
+            self._image_owners[owner] = client
+        return self._image_owners[owner]
+
+    def shared_image(self, owner, visibility):
+        """Return an image that tests must not modify.
+
+        With shared_image_fixtures the image was created once for the class,
+        otherwise it is created for the test.
+
+        :param owner: The owner of the image, see image_owner().
+        :param visibility: The visibility of the image.
+        """
+        if (owner, visibility) in self.shared_images:
+            return self.shared_images[(owner, visibility)]
+        image = self.image_owner(owner).image_client_v2.create_image(
+            **self.image(visibility=visibility))
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
+        return image
+
+    def list_image_ids(self, images, **kwargs):
+        """List images by ID through do_request.
+
+        Only the given images are listed, as images created by tests running
+        at the same time can push them off the first page of every image.
+
+        :param images: The images to list.
+        :param kwargs: Passed on to do_request.
+        :returns: The set of the IDs of the images listed.
+        """
+        resp = self.do_request(
+            'list_images',
+            params={'id': 'in:%s' % ','.join(image['id'] for image in images)},
+            **kwargs)
+        return set(image['id'] for image in resp['images'])
+
+    @classmethod
+    def image(cls, visibility=None):
         image = {}
         image['name'] = data_utils.rand_name('image')
         image['container_format'] = CONF.image.container_formats[0]
@@ -347,7 +537,7 @@ class MetadefV2RbacResourceTypeTest(RbacMetadefBase):
         # Create namespace for two different projects
         namespaces = self.create_namespaces()
 
-        namespace_resource_types = []
+        builder = concurrency.FixtureBuilder()
         for ns in namespaces:
             alt_client = None
             if ns['namespace'].startswith(self.alt_project_id):
@@ -356,8 +546,11 @@ class MetadefV2RbacResourceTypeTest(RbacMetadefBase):
             if alt_client is None:
                 client = self.os_project_admin.resource_types_client
             resource_name = "rs_type_of_%s" % (ns['namespace'])
-            resource_type = client.create_resource_type_association(
-                ns['namespace'], name=resource_name)
+            builder.add(client.create_resource_type_association,
+                        ns['namespace'], name=resource_name)
+
+        namespace_resource_types = []
+        for ns, resource_type in zip(namespaces, builder.build()):
             resource_types = {'namespace': ns,
                               'resource_type': resource_type}
             namespace_resource_types.append(resource_types)
@@ -420,15 +613,17 @@ class MetadefV2RbacObjectsTest(RbacMetadefBase):
         namespaces = self.create_namespaces()
 
         client = self.os_project_admin.namespace_objects_client
-        namespace_objects = []
+        builder = concurrency.FixtureBuilder()
         for ns in namespaces:
             if ns['namespace'].startswith(self.project_id):
                 client = self.os_project_alt_admin.namespace_objects_client
             object_name = "object_of_%s" % (ns['namespace'])
-            namespace_object = client.create_namespace_object(
-                ns['namespace'], name=object_name,
-                description=data_utils.arbitrary_string())
+            builder.add(client.create_namespace_object,
+                        ns['namespace'], name=object_name,
+                        description=data_utils.arbitrary_string())
 
+        namespace_objects = []
+        for ns, namespace_object in zip(namespaces, builder.build()):
             obj = {'namespace': ns, 'object': namespace_object}
             namespace_objects.append(obj)
 
@@ -510,7 +705,7 @@ class MetadefV2RbacPropertiesTest(RbacMetadefBase):
         # Create namespace for two different projects
         namespaces = self.create_namespaces()
 
-        namespace_properties = []
+        builder = concurrency.FixtureBuilder()
         for ns in namespaces:
             alt_client = None
             if ns['namespace'].startswith(self.alt_project_id):
@@ -521,10 +716,12 @@ class MetadefV2RbacPropertiesTest(RbacMetadefBase):
                 client = self.os_project_admin.namespace_properties_client
 
             property_name = "prop_of_%s" % (ns['namespace'])
-            namespace_property = client.create_namespace_property(
-                ns['namespace'], name=property_name, title='property',
-                type='integer')
+            builder.add(client.create_namespace_property,
+                        ns['namespace'], name=property_name,
+                        title='property', type='integer')
 
+        namespace_properties = []
+        for ns, namespace_property in zip(namespaces, builder.build()):
             prop = {'namespace': ns, 'property': namespace_property}
             namespace_properties.append(prop)
 
@@ -603,6 +800,7 @@ class MetadefV2RbacTagsTest(RbacMetadefBase):
 
     def create_tags(self, namespaces, multiple_tags=False):
         namespace_tags = []
+        builder = concurrency.FixtureBuilder()
 
         if multiple_tags:
             tags = [{"name": "tag1"}, {"name": "tag2"}, {"name": "tag3"}]
@@ -614,9 +812,10 @@ class MetadefV2RbacTagsTest(RbacMetadefBase):
                     client = alt_client
                 if alt_client is None:
                     client = self.os_project_admin.namespace_tags_client
-                multiple_tags = client.create_namespace_tags(
-                    ns['namespace'], tags=tags)
+                builder.add(client.create_namespace_tags,
+                            ns['namespace'], tags=tags)
 
+            for ns, multiple_tags in zip(namespaces, builder.build()):
                 namespace_multiple_tags = {'namespace': ns,
                                            'tags': multiple_tags}
                 namespace_tags.append(namespace_multiple_tags)
@@ -630,9 +829,10 @@ class MetadefV2RbacTagsTest(RbacMetadefBase):
                 if alt_client is None:
                     client = self.os_project_admin.namespace_tags_client
                 tag_name = "tag_of_%s" % (ns['namespace'])
-                namespace_tag = client.create_namespace_tag(
-                    ns['namespace'], tag_name=tag_name)
+                builder.add(client.create_namespace_tag,
+                            ns['namespace'], tag_name=tag_name)
 
+            for ns, namespace_tag in zip(namespaces, builder.build()):
                 tag = {'namespace': ns, 'tag': namespace_tag}
                 namespace_tags.append(tag)
 
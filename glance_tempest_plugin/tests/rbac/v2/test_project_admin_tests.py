@@ -10,7 +10,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import six
+import io
 
 from tempest import config
 from tempest.lib.common.utils import data_utils
@@ -27,23 +27,29 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
 
     credentials = ['project_admin', 'system_admin', 'project_alt_admin']
 
+    shared_image_fixtures = True
+
     @decorators.idempotent_id('025eea27-fa86-44a9-85a2-91295842f808')
     def test_create_image(self):
         image = self.do_request('create_image', expected_status=201,
                                 **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
 
         image = self.do_request('create_image', expected_status=201,
                                 **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
 
         image = self.do_request('create_image', expected_status=201,
                                 **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
 
         image = self.do_request('create_image', expected_status=201,
                                 **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         # Check that system user is not permitted to create image.
         self.do_request('create_image', expected_status=exceptions.Forbidden,
                         client=self.os_system_admin.image_client_v2,
@@ -52,36 +58,29 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
     @decorators.idempotent_id('61fd8b5e-8a0b-46ca-91c4-6c2c2d35039d')
     def test_get_image(self):
         # Ensure users can get private images owned by their project.
-        project_id = self.persona.credentials.project_id
-        project_member = self.setup_user_client(project_id=project_id)
-        image = project_member.image_client_v2.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('project', 'private')
         self.do_request('show_image', image_id=image['id'])
 
-        image = project_member.image_client_v2.create_image(
-            **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('project', 'shared')
         self.do_request('show_image', image_id=image['id'])
 
-        project_client = self.setup_user_client()
-        image = project_client.image_client_v2.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('other', 'private')
         self.do_request('show_image', image_id=image['id'])
         # Check that system user is not permitted to get image.
         self.do_request('show_image', expected_status=exceptions.NotFound,
                         client=self.os_system_admin.image_client_v2,
                         image_id=image['id'])
 
-        image = self.admin_images_client.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('admin', 'private')
         self.do_request('show_image', image_id=image['id'])
 
+        # This image gets shared with the user's project below, so it can't
+        # be one of the shared fixtures.
+        project_client = self.image_owner('other')
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('show_image', image_id=image['id'])
         # Check that system user is not permitted to get image.
         self.do_request('show_image', expected_status=exceptions.NotFound,
@@ -90,20 +89,17 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         project_id = self.persona.credentials.project_id
         self.admin_client.image_member_client_v2.create_image_member(
             image['id'], member=project_id)
-        self.addCleanup(
+        self.cleanups.add(
+            'image_member',
             self.admin_client.image_member_client_v2.delete_image_member,
             image['id'], project_id)
 
         self.do_request('show_image', image_id=image['id'])
 
-        image = self.admin_images_client.create_image(
-            **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('admin', 'community')
         self.do_request('show_image', image_id=image['id'])
 
-        image = self.admin_images_client.create_image(
-            **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('admin', 'public')
         self.do_request('show_image', image_id=image['id'])
 
         self.do_request('show_image', expected_status=exceptions.NotFound,
@@ -111,89 +107,76 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
 
     @decorators.idempotent_id('d0c18f80-6168-4d98-a86e-c09d28d83bb0')
     def test_list_images(self):
-        project_id = self.persona.credentials.project_id
-        project_member = self.setup_user_client(project_id=project_id)
-        project_client = self.setup_user_client()
+        project_member = self.image_owner('project')
+        project_client = self.image_owner('other')
 
-        # Create a private image in the project
-        private_image_in_project = project_member.image_client_v2.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        private_image_in_project['id'])
+        # Get a private image in the project
+        private_image_in_project = self.shared_image('project', 'private')
 
-        # Create a private image without an owner
-        private_image_no_owner = self.admin_images_client.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        private_image_no_owner['id'])
+        # Get a private image without an owner
+        private_image_no_owner = self.shared_image('admin', 'private')
 
-        # Create a private image in another project
-        private_image = project_client.image_client_v2.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        private_image['id'])
+        # Get a private image in another project
+        private_image = self.shared_image('other', 'private')
 
-        # Create a public image
-        public_image = self.admin_images_client.create_image(
-            **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        public_image['id'])
+        # Get a public image
+        public_image = self.shared_image('admin', 'public')
 
-        resp = self.do_request('list_images', expected_status=200)
+        image_ids = self.list_image_ids(
+            [private_image_no_owner, private_image, public_image,
+             private_image_in_project])
         # Check that system user is not permitted to list images.
         self.do_request('list_images', expected_status=exceptions.Forbidden,
                         client=self.os_system_admin.image_client_v2)
-        image_ids = set(image['id'] for image in resp['images'])
 
         self.assertIn(private_image_no_owner['id'], image_ids)
         self.assertIn(private_image['id'], image_ids)
         self.assertIn(public_image['id'], image_ids)
         self.assertIn(private_image_in_project['id'], image_ids)
 
-        # Create a shared image in another project
+        # Create a shared image in another project, which gets shared with
+        # the user's project below, and get one that doesn't.
         shared_image_1 = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        shared_image_2 = project_client.image_client_v2.create_image(
-            **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        shared_image_1['id'])
-        self.addCleanup(self.admin_images_client.delete_image,
-                        shared_image_2['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          shared_image_1['id'])
+        shared_image_2 = self.shared_image('other', 'shared')
 
         # Share the image from the other project with the user's project
         project_id = self.persona.credentials.project_id
         self.admin_client.image_member_client_v2.create_image_member(
             shared_image_1['id'], member=project_id)
-        self.addCleanup(
+        self.cleanups.add(
+            'image_member',
             self.admin_client.image_member_client_v2.delete_image_member,
             shared_image_1['id'], project_id)
 
         # List images and assert the shared image is not in the list of images
         # because it hasn't been accepted, yet.
-        resp = self.do_request('list_images', expected_status=200)
-        image_ids = set(image['id'] for image in resp['images'])
+        image_ids = self.list_image_ids([shared_image_1, shared_image_2])
         self.assertIn(shared_image_1['id'], image_ids)
         self.assertIn(shared_image_2['id'], image_ids)
 
         # Accept the image and ensure it's returned in the list of images
         project_member.image_member_client_v2.update_image_member(
             shared_image_1['id'], project_id, status='accepted')
-        resp = self.do_request('list_images', expected_status=200)
-        image_ids = set(image['id'] for image in resp['images'])
+        image_ids = self.list_image_ids([shared_image_1, shared_image_2])
         self.assertIn(shared_image_1['id'], image_ids)
         self.assertIn(shared_image_2['id'], image_ids)
 
     @decorators.idempotent_id('9e9f7fd6-e93c-402c-9f3c-177fede8f645')
     def test_update_image(self):
         image = self.client.create_image(**self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=200,
                         image_id=image['id'], patch=patch_body)
 
         image = self.client.create_image(**self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=200,
@@ -201,7 +184,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=200,
@@ -213,14 +197,16 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         project_client = self.setup_user_client()
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=200,
                         image_id=image['id'], patch=patch_body)
 
         image = self.client.create_image(**self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=200,
@@ -228,7 +214,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=200,
@@ -239,7 +226,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
                         image_id=image['id'], patch=patch_body)
         image = self.admin_images_client.create_image(
             **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=200,
@@ -250,7 +238,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
                         image_id=image['id'], patch=patch_body)
         image = self.admin_images_client.create_image(
             **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=200,
@@ -263,7 +252,7 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
     @decorators.idempotent_id('947f1ae1-c5b6-4552-89e3-1078ca722be4')
     def test_upload_image(self):
         file_contents = data_utils.random_bytes()
-        image_data = six.BytesIO(file_contents)
+        image_data = io.BytesIO(file_contents)
 
         project_id = self.persona.credentials.project_id
         project_client = self.setup_user_client(project_id=project_id)
@@ -271,23 +260,23 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         # upload file for private image - pass
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file', expected_status=204,
                         image_id=image['id'], data=image_data)
 
         # upload file for shared image - pass
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file', expected_status=204,
                         image_id=image['id'], data=image_data)
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file', image_id=image['id'],
                         expected_status=204, data=image_data)
         # Check that system user is not permitted to store image file.
@@ -299,8 +288,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         project_client = self.setup_user_client()
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file', expected_status=204,
                         image_id=image['id'], data=image_data)
         # Check that system user is not permitted to store image file.
@@ -310,8 +299,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
                         image_id=image['id'], data=image_data)
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file', expected_status=204,
                         image_id=image['id'], data=image_data)
         # Check that system user is not permitted to store image file.
@@ -321,8 +310,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
                         image_id=image['id'], data=image_data)
         image = self.admin_images_client.create_image(
             **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file', expected_status=204,
                         image_id=image['id'], data=image_data)
         # Check that system user is not permitted to store image file.
@@ -332,8 +321,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
                         image_id=image['id'], data=image_data)
         image = self.admin_images_client.create_image(
             **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file', expected_status=204,
                         image_id=image['id'], data=image_data)
         # Check that system user is not permitted to store image file.
@@ -344,29 +333,15 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
 
     @decorators.idempotent_id('24891c04-28ca-41f9-92d1-c06d8ba4b83d')
     def test_download_image(self):
-        project_id = self.persona.credentials.project_id
-        project_client = self.setup_user_client(project_id=project_id)
-
-        image = project_client.image_client_v2.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        image = self.shared_image('project', 'private')
         self.do_request('show_image_file', expected_status=204,
                         image_id=image['id'])
 
-        image = project_client.image_client_v2.create_image(
-            **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        image = self.shared_image('project', 'shared')
         self.do_request('show_image_file', expected_status=204,
                         image_id=image['id'])
 
-        project_client = self.setup_user_client()
-
-        image = project_client.image_client_v2.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        image = self.shared_image('other', 'private')
         self.do_request('show_image_file', expected_status=204,
                         image_id=image['id'])
         # Check that system user is not permitted to show image file.
@@ -375,16 +350,11 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
                         client=self.os_system_admin.image_client_v2,
                         image_id=image['id'])
 
-        image = self.admin_images_client.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        image = self.shared_image('admin', 'private')
         self.do_request('show_image_file', expected_status=204,
                         image_id=image['id'])
 
-        image = project_client.image_client_v2.create_image(
-            **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('other', 'shared')
         self.do_request('show_image_file', expected_status=204,
                         image_id=image['id'])
         # Check that system user is not permitted to show image file.
@@ -393,15 +363,11 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
                         client=self.os_system_admin.image_client_v2,
                         image_id=image['id'])
 
-        image = self.admin_images_client.create_image(
-            **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('admin', 'community')
         self.do_request('show_image_file', expected_status=204,
                         image_id=image['id'])
 
-        image = self.admin_images_client.create_image(
-            **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('admin', 'public')
         self.do_request('show_image_file', expected_status=204,
                         image_id=image['id'])
 
@@ -480,7 +446,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         project_client = self.setup_user_client(project_id=project_id)
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
 
         # Make sure the persona user can add image members to images they
         # create.
@@ -500,7 +467,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         project_client = self.setup_user_client(project_id=project_id)
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_member_client_v2.create_image_member(
             image['id'], member=project_one_id)
         self.do_request('show_image_member',
@@ -513,7 +481,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         project_two_client = self.setup_user_client()
         image = project_two_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_two_client.image_member_client_v2.create_image_member(
             image['id'], member=project_one_id)
         self.do_request('show_image_member',
@@ -539,7 +508,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         project_client = self.setup_user_client()
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         for p_id in [project_id, other_member_project_id]:
             project_client.image_member_client_v2.create_image_member(
                 image['id'], member=p_id)
@@ -562,7 +532,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         # persona project.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_member_client_v2.create_image_member(
             image['id'], member=self.persona.credentials.project_id)
 
@@ -586,7 +557,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         member_project_id = member_client.credentials.project_id
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
 
         # Share the image with another project.
         project_client.image_member_client_v2.create_image_member(
@@ -621,7 +593,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         # Create an image in the persona project and share it with the member.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_member_client_v2.create_image_member(
             image['id'], member=member_project_id)
 
@@ -638,7 +611,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         # Create an image in that project and share it with the member project.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_member_client_v2.create_image_member(
             image['id'], member=member_project_id)
 
@@ -657,11 +631,12 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         project_id = self.persona.credentials.project_id
         project_client = self.setup_user_client(project_id=project_id)
         file_contents = data_utils.random_bytes()
-        image_data = six.BytesIO(file_contents)
+        image_data = io.BytesIO(file_contents)
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         self.do_request('deactivate_image', expected_status=204,
@@ -669,7 +644,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         self.do_request('deactivate_image', expected_status=204,
@@ -678,7 +654,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         project_client = self.setup_user_client()
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         self.do_request('deactivate_image', expected_status=204,
@@ -691,7 +668,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         self.do_request('deactivate_image', expected_status=204,
@@ -704,7 +682,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.admin_images_client.store_image_file(image['id'], image_data)
         self.do_request('deactivate_image', expected_status=204,
                         image_id=image['id'])
@@ -716,7 +695,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.admin_images_client.store_image_file(image['id'], image_data)
         self.do_request('deactivate_image', expected_status=204,
                         image_id=image['id'])
@@ -731,11 +711,12 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         project_id = self.persona.credentials.project_id
         project_client = self.setup_user_client(project_id=project_id)
         file_contents = data_utils.random_bytes()
-        image_data = six.BytesIO(file_contents)
+        image_data = io.BytesIO(file_contents)
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         project_client.image_client_v2.deactivate_image(image['id'])
@@ -744,7 +725,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         project_client.image_client_v2.deactivate_image(image['id'])
@@ -754,7 +736,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
         project_client = self.setup_user_client()
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         project_client.image_client_v2.deactivate_image(image['id'])
@@ -768,7 +751,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         project_client.image_client_v2.deactivate_image(image['id'])
@@ -782,7 +766,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.admin_images_client.store_image_file(image['id'], image_data)
         self.admin_images_client.deactivate_image(image['id'])
         self.do_request('reactivate_image', expected_status=204,
@@ -795,7 +780,8 @@ class ImageProjectAdminTests(rbac_base.ImageV2RbacImageTest,
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.admin_images_client.store_image_file(image['id'], image_data)
         self.admin_images_client.deactivate_image(image['id'])
         self.do_request('reactivate_image', expected_status=204,
@@ -10,7 +10,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import six
+import io
 
 from tempest import config
 from tempest.lib.common.utils import data_utils
@@ -28,19 +28,24 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
     credentials = ['project_member', 'project_admin', 'system_admin',
                    'project_alt_admin']
 
+    shared_image_fixtures = True
+
     @decorators.idempotent_id('a71e7caf-2403-4fed-a4bf-9717949ecde2')
     def test_create_image(self):
         image = self.do_request('create_image', expected_status=201,
                                 **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
 
         image = self.do_request('create_image', expected_status=201,
                                 **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
 
         image = self.do_request('create_image', expected_status=201,
                                 **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
 
         self.do_request('create_image', expected_status=exceptions.Forbidden,
                         **self.image(visibility='public'))
@@ -48,54 +53,44 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
     @decorators.idempotent_id('2adf7202-7fc9-4a6e-b6dd-fb3d40365ccb')
     def test_get_image(self):
         # Ensure users can get private images owned by their project.
-        project_id = self.persona.credentials.project_id
-        project_member = self.setup_user_client(project_id=project_id)
-        image = project_member.image_client_v2.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('project', 'private')
         self.do_request('show_image', image_id=image['id'])
 
-        image = project_member.image_client_v2.create_image(
-            **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('project', 'shared')
         self.do_request('show_image', image_id=image['id'])
 
-        project_client = self.setup_user_client()
-        image = project_client.image_client_v2.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('other', 'private')
         self.do_request('show_image', expected_status=exceptions.NotFound,
                         image_id=image['id'])
 
-        image = self.admin_images_client.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('admin', 'private')
         self.do_request('show_image', expected_status=exceptions.NotFound,
                         image_id=image['id'])
 
+        # This image gets shared with the user's project below, so it can't
+        # be one of the shared fixtures.
+        project_client = self.image_owner('other')
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('show_image', expected_status=exceptions.NotFound,
                         image_id=image['id'])
 
         project_id = self.persona.credentials.project_id
         self.admin_client.image_member_client_v2.create_image_member(
             image['id'], member=project_id)
-        self.addCleanup(
+        self.cleanups.add(
+            'image_member',
             self.admin_client.image_member_client_v2.delete_image_member,
             image['id'], project_id)
 
         self.do_request('show_image', image_id=image['id'])
 
-        image = self.admin_images_client.create_image(
-            **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('admin', 'community')
         self.do_request('show_image', image_id=image['id'])
 
-        image = self.admin_images_client.create_image(
-            **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('admin', 'public')
         self.do_request('show_image', image_id=image['id'])
 
         self.do_request('show_image', expected_status=exceptions.NotFound,
@@ -103,86 +98,73 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
 
     @decorators.idempotent_id('259d5578-410e-4b0f-bb2d-cb5b057bc696')
     def test_list_images(self):
-        project_id = self.persona.credentials.project_id
-        project_member = self.setup_user_client(project_id=project_id)
-        project_client = self.setup_user_client()
+        project_member = self.image_owner('project')
+        project_client = self.image_owner('other')
 
-        # Create a private image in the project
-        private_image_in_project = project_member.image_client_v2.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        private_image_in_project['id'])
+        # Get a private image in the project
+        private_image_in_project = self.shared_image('project', 'private')
 
-        # Create a private image without an owner
-        private_image_no_owner = self.admin_images_client.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        private_image_no_owner['id'])
+        # Get a private image without an owner
+        private_image_no_owner = self.shared_image('admin', 'private')
 
-        # Create a private image in another project
-        private_image = project_client.image_client_v2.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        private_image['id'])
+        # Get a private image in another project
+        private_image = self.shared_image('other', 'private')
 
-        # Create a public image
-        public_image = self.admin_images_client.create_image(
-            **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        public_image['id'])
+        # Get a public image
+        public_image = self.shared_image('admin', 'public')
 
-        resp = self.do_request('list_images', expected_status=200)
-        image_ids = set(image['id'] for image in resp['images'])
+        image_ids = self.list_image_ids(
+            [private_image_no_owner, private_image, public_image,
+             private_image_in_project])
 
         self.assertNotIn(private_image_no_owner['id'], image_ids)
         self.assertNotIn(private_image['id'], image_ids)
         self.assertIn(public_image['id'], image_ids)
         self.assertIn(private_image_in_project['id'], image_ids)
 
-        # Create a shared image in another project
+        # Create a shared image in another project, which gets shared with
+        # the user's project below, and get one that doesn't.
         shared_image_1 = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        shared_image_2 = project_client.image_client_v2.create_image(
-            **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        shared_image_1['id'])
-        self.addCleanup(self.admin_images_client.delete_image,
-                        shared_image_2['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          shared_image_1['id'])
+        shared_image_2 = self.shared_image('other', 'shared')
 
         # Share the image from the other project with the user's project
         project_id = self.persona.credentials.project_id
         self.admin_client.image_member_client_v2.create_image_member(
             shared_image_1['id'], member=project_id)
-        self.addCleanup(
+        self.cleanups.add(
+            'image_member',
             self.admin_client.image_member_client_v2.delete_image_member,
             shared_image_1['id'], project_id)
 
         # List images and assert the shared image is not in the list of images
         # because it hasn't been accepted, yet.
-        resp = self.do_request('list_images', expected_status=200)
-        image_ids = set(image['id'] for image in resp['images'])
+        image_ids = self.list_image_ids([shared_image_1, shared_image_2])
         self.assertNotIn(shared_image_1['id'], image_ids)
         self.assertNotIn(shared_image_2['id'], image_ids)
 
         # Accept the image and ensure it's returned in the list of images
         project_member.image_member_client_v2.update_image_member(
             shared_image_1['id'], project_id, status='accepted')
-        resp = self.do_request('list_images', expected_status=200)
-        image_ids = set(image['id'] for image in resp['images'])
+        image_ids = self.list_image_ids([shared_image_1, shared_image_2])
         self.assertIn(shared_image_1['id'], image_ids)
         self.assertNotIn(shared_image_2['id'], image_ids)
 
     @decorators.idempotent_id('13f8949b-3419-4a4a-bd0b-71fa711206fd')
     def test_update_image(self):
         image = self.client.create_image(**self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=200,
                         image_id=image['id'], patch=patch_body)
 
         image = self.client.create_image(**self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=200,
@@ -190,7 +172,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=exceptions.NotFound,
@@ -199,14 +182,16 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         project_client = self.setup_user_client()
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=exceptions.NotFound,
                         image_id=image['id'], patch=patch_body)
 
         image = self.client.create_image(**self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=200,
@@ -214,7 +199,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=exceptions.NotFound,
@@ -222,7 +208,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=exceptions.Forbidden,
@@ -230,7 +217,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=exceptions.Forbidden,
@@ -239,7 +227,7 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
     @decorators.idempotent_id('bd5845dc-d96b-4d83-a8da-7978bd91ddc1')
     def test_upload_image(self):
         file_contents = data_utils.random_bytes()
-        image_data = six.BytesIO(file_contents)
+        image_data = io.BytesIO(file_contents)
 
         project_id = self.persona.credentials.project_id
         project_client = self.setup_user_client(project_id=project_id)
@@ -247,23 +235,23 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         # upload file for private image - pass
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file', expected_status=204,
                         image_id=image['id'], data=image_data)
 
         # upload file for shared image - pass
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file', expected_status=204,
                         image_id=image['id'], data=image_data)
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file',
                         expected_status=exceptions.NotFound,
                         image_id=image['id'], data=image_data)
@@ -271,85 +259,63 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         project_client = self.setup_user_client()
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file',
                         expected_status=exceptions.NotFound,
                         image_id=image['id'], data=image_data)
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file',
                         expected_status=exceptions.NotFound,
                         image_id=image['id'], data=image_data)
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file',
                         expected_status=exceptions.Forbidden,
                         image_id=image['id'], data=image_data)
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file',
                         expected_status=exceptions.Forbidden,
                         image_id=image['id'], data=image_data)
 
     @decorators.idempotent_id('3dfa6f70-f6fe-4ed5-96eb-5f4634064aa3')
     def test_download_image(self):
-        project_id = self.persona.credentials.project_id
-        project_client = self.setup_user_client(project_id=project_id)
-
-        image = project_client.image_client_v2.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        image = self.shared_image('project', 'private')
         self.do_request('show_image_file', expected_status=204,
                         image_id=image['id'])
 
-        image = project_client.image_client_v2.create_image(
-            **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        image = self.shared_image('project', 'shared')
         self.do_request('show_image_file', expected_status=204,
                         image_id=image['id'])
 
-        project_client = self.setup_user_client()
-        image = project_client.image_client_v2.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        image = self.shared_image('other', 'private')
         self.do_request('show_image_file', expected_status=exceptions.NotFound,
                         image_id=image['id'])
 
-        image = self.admin_images_client.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        image = self.shared_image('admin', 'private')
         self.do_request('show_image_file', expected_status=exceptions.NotFound,
                         image_id=image['id'])
 
-        image = project_client.image_client_v2.create_image(
-            **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('other', 'shared')
         self.do_request('show_image_file', expected_status=exceptions.NotFound,
                         image_id=image['id'])
 
-        image = self.admin_images_client.create_image(
-            **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('admin', 'community')
         self.do_request('show_image_file', expected_status=204,
                         image_id=image['id'])
 
-        image = self.admin_images_client.create_image(
-            **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('admin', 'public')
         self.do_request('show_image_file', expected_status=204,
                         image_id=image['id'])
 
@@ -360,14 +326,16 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
             **self.image(visibility='private'))
         self.do_request('delete_image', expected_status=exceptions.NotFound,
                         image_id=image['id'])
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
 
         project_client = self.setup_user_client()
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
         self.do_request('delete_image', expected_status=exceptions.NotFound,
                         image_id=image['id'])
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
 
         image = self.client.create_image(
             **self.image(visibility='private'))
@@ -378,7 +346,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
             **self.image(visibility='shared'))
         self.do_request('delete_image', expected_status=exceptions.NotFound,
                         image_id=image['id'])
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
 
         project_id = self.persona.credentials.project_id
         project_member = self.setup_user_client(project_id=project_id)
@@ -391,7 +360,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
             **self.image(visibility='community'))
         self.do_request('delete_image', expected_status=exceptions.Forbidden,
                         image_id=image['id'])
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
 
         image = self.client.create_image(
             **self.image(visibility='community'))
@@ -402,7 +372,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
             **self.image(visibility='public'))
         self.do_request('delete_image', expected_status=exceptions.Forbidden,
                         image_id=image['id'])
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
 
     @decorators.idempotent_id('395579c9-92bb-40a9-a8b6-9daaa20ae610')
     def test_add_image_member(self):
@@ -412,7 +383,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         project_client = self.setup_user_client(project_id=project_id)
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
 
         # As users with authorization on the project that owns the image, we
         # should be able to share that image with other projects.
@@ -429,7 +401,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         project_client = self.setup_user_client(project_id=project_id)
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_member_client_v2.create_image_member(
             image['id'], member=member_project_id)
         self.do_request('show_image_member',
@@ -440,7 +413,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         project_client = self.setup_user_client()
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_member_client_v2.create_image_member(
             image['id'], member=member_project_id)
         # The user can't show the members for this image because they can't get
@@ -464,7 +438,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         project_client = self.setup_user_client()
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         for p_id in [project_id, other_member_project_id]:
             project_client.image_member_client_v2.create_image_member(
                 image['id'], member=p_id)
@@ -486,7 +461,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         # the persona user's project.
         image = other_project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         other_project_client.image_member_client_v2.create_image_member(
             image['id'], member=self.persona.credentials.project_id)
 
@@ -513,7 +489,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         # new member user.
         image = other_project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         other_project_client.image_member_client_v2.create_image_member(
             image['id'], member=member_project_id)
 
@@ -545,7 +522,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         project_client = self.setup_user_client(project_id=project_id)
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_member_client_v2.create_image_member(
             image['id'], member=member_project_id)
 
@@ -559,7 +537,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         project_client = self.setup_user_client()
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_member_client_v2.create_image_member(
             image['id'], member=member_project_id)
 
@@ -576,13 +555,14 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         project_id = self.persona.credentials.project_id
         project_client = self.setup_user_client(project_id=project_id)
         file_contents = data_utils.random_bytes()
-        image_data = six.BytesIO(file_contents)
+        image_data = io.BytesIO(file_contents)
 
         # Create a private image in the persona user's project and make sure
         # the persona user can deactivate it.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         self.do_request('deactivate_image', expected_status=204,
@@ -594,7 +574,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         # persona user can deactivate it.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         self.do_request('deactivate_image', expected_status=204,
@@ -608,7 +589,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         # Create a private image in that new project.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         # The user can't deactivate this image because they can't find it.
@@ -619,7 +601,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         # Create a shared image in the new project.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         # The user can't deactivate this image because they can't find it.
@@ -631,7 +614,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         # should be able to do this.
         image = self.admin_images_client.create_image(
             **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.admin_images_client.store_image_file(image['id'], image_data)
         self.do_request('deactivate_image',
                         expected_status=exceptions.Forbidden,
@@ -641,7 +625,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         # should be able to do this.
         image = self.admin_images_client.create_image(
             **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.admin_images_client.store_image_file(image['id'], image_data)
         self.do_request('deactivate_image',
                         expected_status=exceptions.Forbidden,
@@ -653,13 +638,14 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         project_id = self.persona.credentials.project_id
         project_client = self.setup_user_client(project_id=project_id)
         file_contents = data_utils.random_bytes()
-        image_data = six.BytesIO(file_contents)
+        image_data = io.BytesIO(file_contents)
 
         # Create a private image within the persona user's project and make
         # sure we can reactivate it.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         project_client.image_client_v2.deactivate_image(image['id'])
@@ -674,7 +660,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         # we can reactivate it.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         project_client.image_client_v2.deactivate_image(image['id'])
@@ -691,7 +678,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         # Create a private image in the separate project.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         project_client.image_client_v2.deactivate_image(image['id'])
@@ -702,7 +690,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         project_client.image_client_v2.deactivate_image(image['id'])
@@ -714,7 +703,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         # Only administrators can reactivate community images.
         image = self.admin_images_client.create_image(
             **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.admin_images_client.store_image_file(image['id'], image_data)
         self.admin_images_client.deactivate_image(image['id'])
         self.do_request('reactivate_image',
@@ -724,7 +714,8 @@ class ImagesProjectMemberTests(rbac_base.ImageV2RbacImageTest,
         # Only administrators can reactivate public images.
         image = self.admin_images_client.create_image(
             **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.admin_images_client.store_image_file(image['id'], image_data)
         self.admin_images_client.deactivate_image(image['id'])
         self.do_request('reactivate_image',
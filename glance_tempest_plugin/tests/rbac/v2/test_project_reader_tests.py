@@ -10,7 +10,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import six
+import io
 
 from tempest import config
 from tempest.lib.common.utils import data_utils
@@ -58,7 +58,8 @@ class ImagesProjectReaderTests(
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=exceptions.Forbidden,
@@ -66,7 +67,8 @@ class ImagesProjectReaderTests(
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=exceptions.Forbidden,
@@ -74,7 +76,8 @@ class ImagesProjectReaderTests(
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         # This fails because getting an image outside the user's project
@@ -85,7 +88,8 @@ class ImagesProjectReaderTests(
         project_client = self.setup_user_client()
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         # FIXME(lbragstad): This is different from the status code for
@@ -98,7 +102,8 @@ class ImagesProjectReaderTests(
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         # Same comment as above with updating private images for other
@@ -108,7 +113,8 @@ class ImagesProjectReaderTests(
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=exceptions.Forbidden,
@@ -116,7 +122,8 @@ class ImagesProjectReaderTests(
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         name = data_utils.rand_name('new-image-name')
         patch_body = [dict(replace='/name', value=name)]
         self.do_request('update_image', expected_status=exceptions.Forbidden,
@@ -125,31 +132,31 @@ class ImagesProjectReaderTests(
     @decorators.idempotent_id('b7ac2883-f569-4032-a35b-a79ef1277582')
     def test_upload_image(self):
         file_contents = data_utils.random_bytes()
-        image_data = six.BytesIO(file_contents)
+        image_data = io.BytesIO(file_contents)
 
         project_id = self.persona.credentials.project_id
         project_client = self.setup_user_client(project_id=project_id)
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file',
                         expected_status=exceptions.Forbidden,
                         image_id=image['id'], data=image_data)
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file',
                         expected_status=exceptions.Forbidden,
                         image_id=image['id'], data=image_data)
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file',
                         expected_status=exceptions.NotFound,
                         image_id=image['id'], data=image_data)
@@ -157,8 +164,8 @@ class ImagesProjectReaderTests(
         project_client = self.setup_user_client()
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file',
                         expected_status=exceptions.NotFound,
                         image_id=image['id'], data=image_data)
@@ -167,90 +174,67 @@ class ImagesProjectReaderTests(
         # not shared with them.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file',
                         expected_status=exceptions.NotFound,
                         image_id=image['id'], data=image_data)
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file',
                         expected_status=exceptions.Forbidden,
                         image_id=image['id'], data=image_data)
 
         image = self.admin_images_client.create_image(
             **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('store_image_file',
                         expected_status=exceptions.Forbidden,
                         image_id=image['id'], data=image_data)
 
     @decorators.idempotent_id('9067339d-c64b-4e4d-bc0e-a52cd1365ea3')
     def test_download_image(self):
-        project_id = self.persona.credentials.project_id
-        project_client = self.setup_user_client(project_id=project_id)
-
-        image = project_client.image_client_v2.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        image = self.shared_image('project', 'private')
         self.do_request('show_image_file',
                         expected_status=exceptions.Forbidden,
                         image_id=image['id'])
 
-        image = project_client.image_client_v2.create_image(
-            **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        image = self.shared_image('project', 'shared')
         self.do_request('show_image_file',
                         expected_status=exceptions.Forbidden,
                         image_id=image['id'])
 
-        project_client = self.setup_user_client()
-
         # Fail to download an image for another project because we can't find
         # it.
-        image = project_client.image_client_v2.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        image = self.shared_image('other', 'private')
         self.do_request('show_image_file',
                         expected_status=exceptions.NotFound,
                         image_id=image['id'])
 
         # Fail to download an image for another project because we can't find
         # it.
-        image = self.admin_images_client.create_image(
-            **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image,
-                        image['id'])
+        image = self.shared_image('admin', 'private')
         self.do_request('show_image_file',
                         expected_status=exceptions.NotFound,
                         image_id=image['id'])
 
         # Fail to download an image for another project because we can't find
         # it.
-        image = project_client.image_client_v2.create_image(
-            **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('other', 'shared')
         self.do_request('show_image_file',
                         expected_status=exceptions.NotFound,
                         image_id=image['id'])
 
-        image = self.admin_images_client.create_image(
-            **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('admin', 'community')
         self.do_request('show_image_file',
                         expected_status=exceptions.Forbidden,
                         image_id=image['id'])
 
-        image = self.admin_images_client.create_image(
-            **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        image = self.shared_image('admin', 'public')
         self.do_request('show_image_file',
                         expected_status=exceptions.Forbidden,
                         image_id=image['id'])
@@ -263,19 +247,22 @@ class ImagesProjectReaderTests(
         project_client = self.setup_user_client()
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('delete_image', expected_status=exceptions.NotFound,
                         image_id=image['id'])
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('delete_image', expected_status=exceptions.NotFound,
                         image_id=image['id'])
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('delete_image', expected_status=exceptions.Forbidden,
                         image_id=image['id'])
 
@@ -285,26 +272,30 @@ class ImagesProjectReaderTests(
         project_client = self.setup_user_client(project_id=project_id)
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('delete_image', expected_status=exceptions.Forbidden,
                         image_id=image['id'])
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('delete_image', expected_status=exceptions.Forbidden,
                         image_id=image['id'])
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('delete_image', expected_status=exceptions.Forbidden,
                         image_id=image['id'])
 
         # Project readers can't delete public images.
         image = self.admin_images_client.create_image(
             **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('delete_image', expected_status=exceptions.Forbidden,
                         image_id=image['id'])
 
@@ -322,7 +313,8 @@ class ImagesProjectReaderTests(
         # other projects.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.do_request('create_image_member',
                         client=self.persona.image_member_client_v2,
                         expected_status=exceptions.Forbidden,
@@ -338,7 +330,8 @@ class ImagesProjectReaderTests(
         # project as a member.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_member_client_v2.create_image_member(
             image['id'], member=self.persona.credentials.project_id)
 
@@ -366,7 +359,8 @@ class ImagesProjectReaderTests(
         # it with the new member project.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_member_client_v2.create_image_member(
             image['id'], member=member_project_id)
 
@@ -400,7 +394,8 @@ class ImagesProjectReaderTests(
         # the member project.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_member_client_v2.create_image_member(
             image['id'], member=member_project_id)
 
@@ -417,7 +412,8 @@ class ImagesProjectReaderTests(
         # member project.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_member_client_v2.create_image_member(
             image['id'], member=member_project_id)
 
@@ -434,12 +430,13 @@ class ImagesProjectReaderTests(
         project_id = self.persona.credentials.project_id
         project_client = self.setup_user_client(project_id=project_id)
         file_contents = data_utils.random_bytes()
-        image_data = six.BytesIO(file_contents)
+        image_data = io.BytesIO(file_contents)
 
         # Create a new private image in the persona user's project.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
 
@@ -451,7 +448,8 @@ class ImagesProjectReaderTests(
         # Create a new shared image in the persona user's project.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
 
@@ -466,7 +464,8 @@ class ImagesProjectReaderTests(
         # Create a private image in the new project.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
 
@@ -478,7 +477,8 @@ class ImagesProjectReaderTests(
         # Create a shared image in the new project.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
 
@@ -490,7 +490,8 @@ class ImagesProjectReaderTests(
         # Only administrators can deactivate community images.
         image = self.admin_images_client.create_image(
             **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.admin_images_client.store_image_file(image['id'], image_data)
         self.do_request('deactivate_image',
                         expected_status=exceptions.Forbidden,
@@ -499,7 +500,8 @@ class ImagesProjectReaderTests(
         # Only administrators can deactivate public images.
         image = self.admin_images_client.create_image(
             **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.admin_images_client.store_image_file(image['id'], image_data)
         self.do_request('deactivate_image',
                         expected_status=exceptions.Forbidden,
@@ -511,12 +513,13 @@ class ImagesProjectReaderTests(
         project_id = self.persona.credentials.project_id
         project_client = self.setup_user_client(project_id=project_id)
         file_contents = data_utils.random_bytes()
-        image_data = six.BytesIO(file_contents)
+        image_data = io.BytesIO(file_contents)
 
         # Create a private image in the persona user's project.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         project_client.image_client_v2.deactivate_image(image['id'])
@@ -530,7 +533,8 @@ class ImagesProjectReaderTests(
         # Create a shared image in the persona user's project.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         project_client.image_client_v2.deactivate_image(image['id'])
@@ -547,7 +551,8 @@ class ImagesProjectReaderTests(
         # Create a private image in the new project.
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='private'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         project_client.image_client_v2.deactivate_image(image['id'])
@@ -559,7 +564,8 @@ class ImagesProjectReaderTests(
 
         image = project_client.image_client_v2.create_image(
             **self.image(visibility='shared'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         project_client.image_client_v2.store_image_file(image['id'],
                                                         image_data)
         project_client.image_client_v2.deactivate_image(image['id'])
@@ -572,7 +578,8 @@ class ImagesProjectReaderTests(
         # Create a community image.
         image = self.admin_images_client.create_image(
             **self.image(visibility='community'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.admin_images_client.store_image_file(image['id'], image_data)
         self.admin_images_client.deactivate_image(image['id'])
 
@@ -584,7 +591,8 @@ class ImagesProjectReaderTests(
         # Create a public image.
         image = self.admin_images_client.create_image(
             **self.image(visibility='public'))
-        self.addCleanup(self.admin_images_client.delete_image, image['id'])
+        self.cleanups.add('image', self.admin_images_client.delete_image,
+                          image['id'])
         self.admin_images_client.store_image_file(image['id'], image_data)
         self.admin_images_client.deactivate_image(image['id'])
 
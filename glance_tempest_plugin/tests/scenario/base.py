@@ -0,0 +1,103 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from concurrent import futures
+import time
+
+from tempest import config
+from tempest.lib.common.utils import data_utils
+
+from glance_tempest_plugin.services import benchmark
+from glance_tempest_plugin.services.clients import manager
+
+CONF = config.CONF
+
+
+class PerfTest(object):
+    """Mixin of the performance scenario tests.
+
+    It goes before the tempest image test base class of a test. The tests
+    measure the same way, as set in the [glance_perf] section of the
+    configuration:
+
+    * Their clients share keep-alive connections, so the latencies
+      measured are those of the service rather than of opening a
+      connection for every request.
+    * Every measured call runs warmup_rounds times first, which opens the
+      connections and warms the caches of the service, then iterations
+      times measured. See repeat() and repeat_concurrently().
+    * The latencies are checked against latency_slo once the report is
+      published, so a test failing its thresholds still has a report to
+      look into. See publish().
+    """
+
+    client_manager = manager.Manager
+
+    @classmethod
+    def image_fields(cls, name_prefix, visibility='private'):
+        """Return the fields of a new image for create_image."""
+        return {
+            'name': data_utils.rand_name(name_prefix),
+            'container_format': CONF.image.container_formats[0],
+            'disk_format': CONF.image.disk_formats[0],
+            'visibility': visibility,
+        }
+
+    def repeat(self, call, *args, **kwargs):
+        """Call warmup_rounds times, then iterations times.
+
+        :returns: The results of the calls after the warmup ones.
+        """
+        for _ in range(CONF.glance_perf.warmup_rounds):
+            call(*args, **kwargs)
+        return [call(*args, **kwargs)
+                for _ in range(CONF.glance_perf.iterations)]
+
+    def repeat_concurrently(self, call, concurrency):
+        """Call concurrency times per round, from as many workers.
+
+        The warmup_rounds rounds all finish before the iterations ones
+        start.
+
+        :returns: The results of the calls after the warmup ones, and the
+                  time they took, in seconds.
+        """
+        def run(_):
+            return call()
+
+        warmups = concurrency * CONF.glance_perf.warmup_rounds
+        if warmups:
+            with futures.ThreadPoolExecutor(
+                    max_workers=concurrency) as executor:
+                list(executor.map(run, range(warmups)))
+
+        calls = concurrency * CONF.glance_perf.iterations
+        start = time.monotonic()
+        with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(run, range(calls)))
+        return results, time.monotonic() - start
+
+    def publish(self, name, report, latencies=()):
+        """Publish a report and check latencies against latency_slo.
+
+        The report is published first, so it is there when the test fails.
+
+        :param name: The name of the report.
+        :param report: A JSON serializable dict.
+        :param latencies: Pairs of what the latencies are of and the summary
+                          of them returned by benchmark.summarize().
+        """
+        benchmark.publish(self, name, report, CONF.glance_perf.output_dir)
+        violations = []
+        for what, latency in latencies:
+            violations += benchmark.slo_violations(
+                what, latency, CONF.glance_perf.latency_slo)
+        self.assertEqual([], violations)
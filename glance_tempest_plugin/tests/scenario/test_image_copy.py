@@ -0,0 +1,240 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from concurrent import futures
+import functools
+import time
+
+from tempest.api.image import base
+from tempest import config
+from tempest.lib.common.utils import test_utils
+from tempest.lib import decorators
+from tempest.lib import exceptions
+
+from glance_tempest_plugin.services import benchmark
+from glance_tempest_plugin.services import concurrency
+from glance_tempest_plugin.services import images
+from glance_tempest_plugin.services import payload
+from glance_tempest_plugin.services import waiter
+from glance_tempest_plugin.tests.scenario import base as perf_base
+
+CONF = config.CONF
+
+
+class ImageCopyTest(perf_base.PerfTest, base.BaseV2ImageAdminTest):
+    """Measure copying images between stores with the copy-image method.
+
+    At each image size and concurrency level, [glance_perf] copy_images
+    images are uploaded to the default store, then an admin copies them to
+    the next writable store, in waves of as many images as the concurrency
+    level. The images of a wave are polled together with batched list
+    calls, with a backoff from poll_interval up to max_poll_interval while
+    no copy makes progress. A copy which fails, or conflicts with another
+    import of the image, is retried up to copy_retries times before the
+    next wave.
+
+    The rate the data is copied at in GB per minute, the latency of the
+    copies, the time the import tasks wait for a worker and the number of
+    failures, conflicts, retries, polls and list calls are published as
+    the image_copy report, along with the latency of the copy-image
+    import calls, which is checked against latency_slo.
+    """
+
+    # The shortest interval the images are polled at.
+    poll_interval = 0.05
+
+    @classmethod
+    def skip_checks(cls):
+        super().skip_checks()
+        if not CONF.image_feature_enabled.import_image:
+            raise cls.skipException('Image import is not available')
+
+    @classmethod
+    def resource_setup(cls):
+        super().resource_setup()
+        if 'copy-image' not in cls.client.info_import()[
+                'import-methods']['value']:
+            raise cls.skipException('The copy-image method is not enabled')
+        stores = images.writable_stores(cls.client)
+        if not stores or len(stores) < 2:
+            raise cls.skipException('Fewer than 2 writable stores')
+        cls.source, cls.target = stores[:2]
+        # The image tasks API was added in version 2.12.
+        cls.has_tasks = cls.versions_client.has_version('2.12')
+        # The owner lists the images, as an admin may not see them all.
+        cls.waiter = waiter.ImageWaiter(
+            cls.client,
+            backoff=waiter.Backoff(cls.poll_interval,
+                                   CONF.glance_perf.max_poll_interval),
+            timeout=CONF.image.build_timeout)
+
+    def _create_image(self, size):
+        image = self.client.create_image(**self.image_fields('copy'))
+        self.client.store_image_file(
+            image['id'], payload.Payload(size, seed=image['id'],
+                                         checksums=False))
+        return image['id']
+
+    def _create_images(self, size):
+        builder = concurrency.FixtureBuilder(
+            self.addCleanup, max_workers=CONF.glance_perf.workers)
+        delete = functools.partial(test_utils.call_and_ignore_notfound_exc,
+                                   self.client.delete_image)
+        for _ in range(CONF.glance_perf.copy_images):
+            builder.add(self._create_image, size, cleanup=delete)
+        return builder.build()
+
+    def _start(self, image_id):
+        """Make the copy-image import call of an image.
+
+        :returns: The ImageImport, or None if the call conflicted with
+                  another import of the image.
+        """
+        image_import = images.ImageImport(self.admin_client, image_id)
+        try:
+            image_import.start('copy-image', stores=[self.target])
+        except exceptions.Conflict:
+            return None
+        return image_import
+
+    def _copied(self, imports):
+        """Return whether a listed image is done being copied.
+
+        A copy is done once the target store holds the data or failed, see
+        ImageImport.update(). The tasks of the copies aren't listed with
+        the images, so the tasks of those not picked up yet are still
+        shown one at a time. They are shown after the image was listed,
+        so their status is only checked against the next listing.
+        """
+        def ready(image):
+            image_import = imports[image['id']]
+            now = time.monotonic()
+            if not image_import.update(image, now):
+                if self.has_tasks and image_import.picked_up is None:
+                    image_import.poll_task(now)
+                return False
+            # The task may have been processed between two polls.
+            if self.has_tasks and image_import.picked_up is None:
+                image_import.picked_up = now
+            return True
+        return ready
+
+    def _copy_wave(self, image_ids, results):
+        """Copy images to the target store at once, retrying on failure.
+
+        The copies are waited for together, listing the images rather than
+        showing them one by one.
+
+        :param image_ids: The images to copy.
+        :param results: The outcome and timings of the copy of each image,
+                        by ID, updated with those of these copies.
+        :returns: The waiter.Wait of each attempt.
+        """
+        waits = []
+        pending = image_ids
+        for attempt in range(CONF.glance_perf.copy_retries + 1):
+            if attempt:
+                for image_id in pending:
+                    results[image_id]['retries'] += 1
+                time.sleep(self.poll_interval * 2 ** attempt)
+            with futures.ThreadPoolExecutor(
+                    max_workers=len(pending)) as executor:
+                started = list(executor.map(self._start, pending))
+            imports = {}
+            retry = []
+            for image_id, image_import in zip(pending, started):
+                if image_import is None:
+                    # Another import of the image is in progress.
+                    results[image_id]['conflicts'] += 1
+                    retry.append(image_id)
+                else:
+                    imports[image_id] = image_import
+            if imports:
+                wait = self.waiter.wait(list(imports),
+                                        ready=self._copied(imports))
+                waits.append(wait)
+            for image_id, image_import in imports.items():
+                image = wait.images[image_id]
+                if self.target not in images.store_list(image['stores']):
+                    results[image_id]['failures'] += 1
+                    retry.append(image_id)
+                    continue
+                done = wait.started + wait.reached[image_id]
+                result = results[image_id]
+                result['copied'] = True
+                result['import'] = image_import.returned - image_import.called
+                result['latency'] = done - image_import.called
+                if image_import.picked_up is not None:
+                    result['queue_wait'] = (image_import.picked_up -
+                                            image_import.returned)
+            pending = retry
+            if not pending:
+                break
+        return waits
+
+    def _run_batch(self, size, concurrency_level):
+        image_ids = self._create_images(size)
+        results = dict((image_id, {'copied': False, 'failures': 0,
+                                   'conflicts': 0, 'retries': 0})
+                       for image_id in image_ids)
+        waits = []
+        start = time.monotonic()
+        for first in range(0, len(image_ids), concurrency_level):
+            waits += self._copy_wave(
+                image_ids[first:first + concurrency_level], results)
+        elapsed = time.monotonic() - start
+        for image_id in image_ids:
+            self.client.delete_image(image_id)
+
+        results = list(results.values())
+        copied = [result for result in results if result['copied']]
+        return {
+            'size_bytes': size,
+            'concurrency': concurrency_level,
+            'images': len(image_ids),
+            'copied': len(copied),
+            'elapsed': elapsed,
+            'gb_per_min': benchmark.throughput(
+                size * len(copied), elapsed) * 60 / 1000,
+            'import': {'latency': benchmark.summarize(
+                [result['import'] for result in copied])},
+            'latency': benchmark.summarize(
+                [result['latency'] for result in copied]),
+            'queue_wait': benchmark.summarize(
+                [result['queue_wait'] for result in copied
+                 if 'queue_wait' in result]),
+            'failures': sum(result['failures'] for result in results),
+            'conflicts': sum(result['conflicts'] for result in results),
+            'retries': sum(result['retries'] for result in results),
+            'polls': sum(wait.polls for wait in waits),
+            'list_requests': sum(wait.requests for wait in waits),
+        }
+
+    @decorators.attr(type='slow')
+    @decorators.idempotent_id('77f96bdd-55f2-46af-9f69-02c89a29bb78')
+    def test_image_copy(self):
+        batches = []
+        latencies = []
+        for size in CONF.glance_perf.image_sizes:
+            for concurrency_level in CONF.glance_perf.concurrency_levels:
+                batch = self._run_batch(size * benchmark.MiB,
+                                        concurrency_level)
+                batches.append(batch)
+                latencies.append((
+                    'copy-image import of %d MiB at concurrency %d' %
+                    (size, concurrency_level), batch['import']['latency']))
+        self.publish('image_copy', {
+            'source': self.source,
+            'target': self.target,
+            'batches': batches,
+        }, latencies)
+        for batch in batches:
+            self.assertEqual(batch['images'], batch['copied'])
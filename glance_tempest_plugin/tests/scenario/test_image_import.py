@@ -0,0 +1,146 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import functools
+
+from tempest.api.image import base
+from tempest import config
+from tempest.lib.common.utils import test_utils
+from tempest.lib import decorators
+
+from glance_tempest_plugin.services import benchmark
+from glance_tempest_plugin.services import images
+from glance_tempest_plugin.services import payload
+from glance_tempest_plugin.services import webserver
+from glance_tempest_plugin.tests.scenario import base as perf_base
+
+CONF = config.CONF
+
+# The phases of an import, in order.
+PHASES = ['stage', 'import', 'queued', 'processing', 'total']
+
+
+class ImageImportLatencyTest(perf_base.PerfTest, base.BaseV2ImageTest):
+    """Measure the phases of interoperable image imports.
+
+    Every combination of the [glance_perf] import_methods, image sizes and
+    concurrency levels runs as a batch of imports, each creating an image,
+    importing its data, waiting for it to become active and deleting it.
+    glance-direct imports stage the data first, web-download imports fetch
+    it from a server started on the test node. Each import is timed in
+    phases:
+
+    * stage: the stage call, for glance-direct imports.
+    * import: the import call, until the import task is accepted.
+    * queued: from the import call returning until an import worker picks
+      the task up, as reported by the image tasks API.
+    * processing: from then until the image is active, which includes
+      fetching the data, converting it and writing it to the store.
+    * total: from the start of the stage or import call until the image is
+      active.
+
+    The latencies of each phase and the imports completed per second are
+    published as the image_import report.
+    """
+
+    # The interval the images and their tasks are polled at.
+    poll_interval = 0.05
+
+    @classmethod
+    def skip_checks(cls):
+        super().skip_checks()
+        if not CONF.image_feature_enabled.import_image:
+            raise cls.skipException('Image import is not available')
+
+    @classmethod
+    def resource_setup(cls):
+        super().resource_setup()
+        available = cls.client.info_import()['import-methods']['value']
+        cls.methods = [method for method in CONF.glance_perf.import_methods
+                       if method in available]
+        if not cls.methods:
+            raise cls.skipException('None of the import methods %s is '
+                                    'enabled' %
+                                    CONF.glance_perf.import_methods)
+        # The image tasks API was added in version 2.12.
+        cls.has_tasks = cls.versions_client.has_version('2.12')
+        if 'web-download' in cls.methods:
+            cls.server = webserver.PayloadServer(
+                CONF.glance_perf.web_download_host,
+                CONF.glance_perf.web_download_port).start()
+            cls.addClassResourceCleanup(cls.server.stop)
+
+    def _import(self, method, size):
+        image = self.client.create_image(**self.image_fields('import'))
+        self.addCleanup(test_utils.call_and_ignore_notfound_exc,
+                        self.client.delete_image, image['id'])
+
+        image_import = images.ImageImport(
+            self.client, image['id'], poll_interval=self.poll_interval,
+            timeout=CONF.image.build_timeout)
+        import_params = None
+        if method == 'glance-direct':
+            image_import.stage(payload.Payload(size, seed=image['id'],
+                                               checksums=False))
+        else:
+            import_params = {'uri': self.server.url(size, image['id'])}
+        image_import.start(method, import_params=import_params)
+        image = image_import.wait(tasks=self.has_tasks)
+        self.assertEqual(size, image['size'])
+        # The images are deleted right away rather than when the test ends,
+        # so the batches don't pile up in the store.
+        self.client.delete_image(image['id'])
+
+        phases = dict((phase, None) for phase in PHASES)
+        if image_import.staged is not None:
+            phases['stage'] = image_import.staged - image_import.started
+        phases['import'] = image_import.returned - image_import.called
+        if image_import.picked_up is not None:
+            phases['queued'] = image_import.picked_up - image_import.returned
+            phases['processing'] = (image_import.active -
+                                    image_import.picked_up)
+        phases['total'] = image_import.active - image_import.started
+        return phases
+
+    def _run_batch(self, method, size, concurrency):
+        results, elapsed = self.repeat_concurrently(
+            functools.partial(self._import, method, size), concurrency)
+
+        batch = {
+            'method': method,
+            'size_bytes': size,
+            'concurrency': concurrency,
+            'imports': len(results),
+            'elapsed': elapsed,
+            'imports_per_sec': len(results) / elapsed,
+        }
+        for phase in PHASES:
+            batch[phase] = {'latency': benchmark.summarize(
+                [result[phase] for result in results
+                 if result[phase] is not None])}
+        return batch
+
+    @decorators.attr(type='slow')
+    @decorators.idempotent_id('ac22f473-a2ba-44fb-859c-97d44b8b8fad')
+    def test_image_import(self):
+        batches = []
+        latencies = []
+        for method in self.methods:
+            for size in CONF.glance_perf.image_sizes:
+                for concurrency in CONF.glance_perf.concurrency_levels:
+                    batch = self._run_batch(method, size * benchmark.MiB,
+                                            concurrency)
+                    batches.append(batch)
+                    latencies.append((
+                        '%s import of %d MiB at concurrency %d' %
+                        (method, size, concurrency),
+                        batch['import']['latency']))
+        self.publish('image_import', {'batches': batches}, latencies)
@@ -0,0 +1,148 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from tempest.api.image import base
+from tempest import config
+from tempest.lib.common.utils import test_utils
+from tempest.lib import decorators
+
+from glance_tempest_plugin.services import benchmark
+from glance_tempest_plugin.services import images
+from glance_tempest_plugin.services import payload
+from glance_tempest_plugin.services import webserver
+from glance_tempest_plugin.tests.scenario import base as perf_base
+
+CONF = config.CONF
+
+
+class ImageImportStoresTest(perf_base.PerfTest, base.BaseV2ImageTest):
+    """Measure importing an image to several stores at once.
+
+    For each of the image sizes and [glance_perf] store_counts, images are
+    imported to that many of the writable stores of the image service, the
+    default one first, with all_stores_must_succeed false so a failing
+    store is reported rather than failing the whole import. The data is
+    staged, or fetched from a server started on the test node, depending on
+    the first of the import_methods enabled.
+
+    The time for each store to hold the data, for the image to become
+    active and for every store to hold the data, all from the import call
+    returning, and the rate the data is written to the stores at, are
+    published as the image_import_stores report, along with the latency of
+    the import calls, which is checked against latency_slo.
+    """
+
+    # The interval the images are polled at.
+    poll_interval = 0.05
+
+    @classmethod
+    def skip_checks(cls):
+        super().skip_checks()
+        if not CONF.image_feature_enabled.import_image:
+            raise cls.skipException('Image import is not available')
+
+    @classmethod
+    def resource_setup(cls):
+        super().resource_setup()
+        cls.stores = images.writable_stores(cls.client)
+        if not cls.stores:
+            raise cls.skipException('Multiple stores are not enabled')
+        cls.store_counts = [count for count in CONF.glance_perf.store_counts
+                            if count <= len(cls.stores)]
+        if not cls.store_counts:
+            raise cls.skipException('Fewer than %d writable stores' %
+                                    min(CONF.glance_perf.store_counts))
+        available = cls.client.info_import()['import-methods']['value']
+        methods = [method for method in CONF.glance_perf.import_methods
+                   if method in available]
+        if not methods:
+            raise cls.skipException('None of the import methods %s is '
+                                    'enabled' %
+                                    CONF.glance_perf.import_methods)
+        cls.method = methods[0]
+        if cls.method == 'web-download':
+            cls.server = webserver.PayloadServer(
+                CONF.glance_perf.web_download_host,
+                CONF.glance_perf.web_download_port).start()
+            cls.addClassResourceCleanup(cls.server.stop)
+
+    def _import(self, size, stores):
+        image = self.client.create_image(**self.image_fields('stores'))
+        self.addCleanup(test_utils.call_and_ignore_notfound_exc,
+                        self.client.delete_image, image['id'])
+
+        image_import = images.ImageImport(
+            self.client, image['id'], poll_interval=self.poll_interval,
+            timeout=CONF.image.build_timeout)
+        import_params = None
+        if self.method == 'glance-direct':
+            image_import.stage(payload.Payload(size, seed=image['id'],
+                                               checksums=False))
+        else:
+            import_params = {'uri': self.server.url(size, image['id'])}
+        image_import.start(self.method, import_params=import_params,
+                           stores=stores, all_stores_must_succeed=False)
+        image = image_import.wait()
+        self.assertEqual([], image_import.failed)
+        self.assertEqual(sorted(stores),
+                         sorted(images.store_list(image['stores'])))
+        self.client.delete_image(image['id'])
+        return image_import
+
+    def _run_batch(self, size, count):
+        stores = self.stores[:count]
+        results = self.repeat(self._import, size, stores)
+
+        def since_returned(times):
+            return benchmark.summarize([
+                at - result.returned for at, result in zip(times, results)])
+
+        return {
+            'size_bytes': size,
+            'stores': count,
+            'imports': len(results),
+            'import': {'latency': benchmark.summarize(
+                [result.returned - result.called for result in results])},
+            'store': dict(
+                (store, {'latency': since_returned(
+                    [result.stored[store] for result in results])})
+                for store in stores),
+            'first_store': {'latency': since_returned(
+                [min(result.stored.values()) for result in results])},
+            'active': {'latency': since_returned(
+                [result.active for result in results])},
+            'all_stores': {'latency': since_returned(
+                [result.done for result in results])},
+            # Every store's copy over the whole import, staging included.
+            'mb_per_sec': benchmark.summarize([
+                benchmark.throughput(size * count,
+                                     result.done - result.started)
+                for result in results]),
+        }
+
+    @decorators.attr(type='slow')
+    @decorators.idempotent_id('5f7cd5fb-c1ff-47f7-9925-50295b36b16a')
+    def test_image_import_stores(self):
+        batches = []
+        latencies = []
+        for size in CONF.glance_perf.image_sizes:
+            for count in self.store_counts:
+                batch = self._run_batch(size * benchmark.MiB, count)
+                batches.append(batch)
+                latencies.append((
+                    '%s import of %d MiB to %d stores' %
+                    (self.method, size, count),
+                    batch['import']['latency']))
+        self.publish('image_import_stores', {
+            'method': self.method,
+            'stores': self.stores,
+            'batches': batches,
+        }, latencies)
@@ -0,0 +1,60 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import time
+
+from tempest.api.image import base
+from tempest import config
+from tempest.lib import decorators
+
+from glance_tempest_plugin.services import benchmark
+from glance_tempest_plugin.services import payload
+from glance_tempest_plugin.services import verify
+from glance_tempest_plugin.tests.scenario import base as perf_base
+
+CONF = config.CONF
+
+
+class ImageDownloadIntegrityTest(perf_base.PerfTest, base.BaseV2ImageTest):
+    """Check downloaded image data against the image's checksums.
+
+    An image of every size in the [glance_perf] image_sizes option is
+    checked. The downloaded bytes are also compared to the data uploaded,
+    generated again from its seed as the download comes in.
+    """
+
+    @decorators.idempotent_id('d52461e7-6b31-4565-a095-d617dfd656fd')
+    def test_download_integrity(self):
+        downloads = []
+        for size in CONF.glance_perf.image_sizes:
+            image = self.create_image(**self.image_fields('integrity'))
+            data = payload.Payload(size * benchmark.MiB, seed=image['id'])
+            self.client.store_image_file(image['id'], data)
+
+            image = self.client.show_image(image['id'])
+            self.assertEqual(data.checksum, image['checksum'])
+            if image.get('os_hash_algo') == 'sha512':
+                self.assertEqual(data.os_hash_value, image['os_hash_value'])
+
+            verifier = verify.DownloadVerifier(image)
+            start = time.monotonic()
+            response = self.client.show_image_file(image['id'], chunked=True)
+            self.assertTrue(data.matches(verifier.stream(response, start)))
+            self.assertEqual([], verifier.mismatches())
+            downloads.append({
+                'size_bytes': verifier.bytes_read,
+                'elapsed': verifier.elapsed,
+                'time_to_first_byte': verifier.time_to_first_byte,
+                'bytes_per_sec': verifier.bytes_per_sec,
+                'hashes': dict((name, verifier.hexdigest(name))
+                               for name in verifier.hashes),
+            })
+        self.publish('image_download_integrity', {'downloads': downloads})
@@ -0,0 +1,145 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import time
+from urllib import parse
+
+from tempest.api.image import base
+from tempest import config
+from tempest.lib import decorators
+
+from glance_tempest_plugin.services import benchmark
+from glance_tempest_plugin.services import seeder
+from glance_tempest_plugin.tests.scenario import base as perf_base
+
+CONF = config.CONF
+
+
+class ImageListScalingTest(perf_base.PerfTest, base.BaseV2ImageTest):
+    """Measure how paging through the image list scales with its size.
+
+    The project is seeded up to each catalog size in turn. At each size
+    the whole list is paged through with limit/marker at every page size,
+    then with a set of filters and sorts. The pages/sec and page latencies
+    are published as the image_list_scaling report.
+
+    The catalog sizes, page sizes and seeding workers are the
+    [glance_perf] catalog_sizes, page_sizes and workers. Each round pages
+    through a whole list, and the page latencies are checked against
+    latency_slo.
+    """
+
+    # The page size of the filtered and sorted lists.
+    query_page_size = 100
+
+    # The seeded images are spread over these visibilities and tags.
+    visibilities = ['private', 'shared', 'community']
+    tag_count = 10
+
+    @classmethod
+    def resource_setup(cls):
+        super().resource_setup()
+        cls.seeder = seeder.ImageSeeder(cls.client,
+                                        workers=CONF.glance_perf.workers)
+        cls.addClassResourceCleanup(cls.seeder.cleanup)
+
+    @classmethod
+    def _seed(cls, count):
+        cls.seeder.seed(
+            count - len(cls.seeder.images),
+            visibilities=dict((visibility, 1)
+                              for visibility in cls.visibilities),
+            properties={'disk_format': CONF.image.disk_formats[0]},
+            tags=lambda index: ['scale', 'scale-%d' % (index % cls.tag_count)],
+            name_prefix='scale')
+
+    def _page_through(self, params):
+        """List every page of the images matching params.
+
+        :returns: The number of images listed and the latency of each page.
+        """
+        latencies = []
+        listed = 0
+        while params is not None:
+            start = time.monotonic()
+            body = self.client.list_images(params=params)
+            latencies.append(time.monotonic() - start)
+            listed += len(body['images'])
+            params = None
+            if 'next' in body:
+                query = parse.urlsplit(body['next']).query
+                params = dict(parse.parse_qsl(query))
+        return listed, latencies
+
+    def _measure(self, params):
+        def timed():
+            start = time.monotonic()
+            listed, latencies = self._page_through(params)
+            return listed, latencies, time.monotonic() - start
+
+        listed, round_latencies, round_elapsed = zip(*self.repeat(timed))
+        latencies = [latency for latencies in round_latencies
+                     for latency in latencies]
+        elapsed = sum(round_elapsed)
+        return {
+            'params': params,
+            'images': listed[-1],
+            'pages': len(latencies) // len(round_elapsed),
+            'elapsed': elapsed,
+            'pages_per_sec': len(latencies) / elapsed,
+            'page_latency': benchmark.summarize(latencies),
+        }
+
+    def _queries(self):
+        owner = self.client.project_id
+        queries = [{'visibility': visibility}
+                   for visibility in self.visibilities]
+        queries += [
+            {'status': 'queued'},
+            {'owner': owner},
+            {'tag': 'scale-0'},
+            {'sort_key': 'name', 'sort_dir': 'asc'},
+            {'sort_key': 'created_at', 'sort_dir': 'asc'},
+            {'owner': owner, 'tag': 'scale-0',
+             'sort_key': 'name', 'sort_dir': 'desc'},
+        ]
+        for query in queries:
+            query['limit'] = self.query_page_size
+        return queries
+
+    @decorators.attr(type='slow')
+    @decorators.idempotent_id('9b21db63-357a-4e62-aa75-03cb45abde86')
+    def test_list_images_scaling(self):
+        catalogs = []
+        latencies = []
+        for size in sorted(CONF.glance_perf.catalog_sizes):
+            start = time.monotonic()
+            self._seed(size)
+            seed_time = time.monotonic() - start
+
+            paging = [self._measure({'limit': page_size})
+                      for page_size in CONF.glance_perf.page_sizes]
+            # Every seeded image is in the project's own list, along with
+            # whatever else the project can see.
+            for result in paging:
+                self.assertGreaterEqual(result['images'], size)
+            queries = [self._measure(query) for query in self._queries()]
+            catalogs.append({
+                'catalog_size': size,
+                'seed_time': seed_time,
+                'paging': paging,
+                'queries': queries,
+            })
+            latencies += [
+                ('list_images %s with %d images' % (result['params'], size),
+                 result['page_latency'])
+                for result in paging + queries]
+        self.publish('image_list_scaling', {'catalogs': catalogs}, latencies)
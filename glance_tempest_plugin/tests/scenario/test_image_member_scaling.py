@@ -0,0 +1,145 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from concurrent import futures
+import time
+
+from tempest.api.image import base
+from tempest import config
+from tempest.lib.common.utils import data_utils
+from tempest.lib import decorators
+from tempest.lib import exceptions
+
+from glance_tempest_plugin.services import benchmark
+from glance_tempest_plugin.services import seeder
+from glance_tempest_plugin.tests.scenario import base as perf_base
+
+CONF = config.CONF
+
+
+class ImageMemberScalingTest(perf_base.PerfTest, base.BaseV2MemberImageTest):
+    """Measure how image sharing scales with the number of members.
+
+    An image is shared with the alt project, which accepts it, then with
+    made-up projects up to each of the [glance_perf] member_counts in turn.
+    Glance doesn't check that members exist. At each count, the latency of
+    listing the members of the image, the throughput of the alt project
+    updating its member status and the latency of the alt project listing
+    the images shared with it are published as the image_member_scaling
+    report.
+
+    Glance limits the members of an image to its image_member_quota
+    option, 128 by default. Once sharing the image fails with a 413, it is
+    measured with the members it was given and the counts above are
+    skipped. The limit is published along with the results.
+    """
+
+    # The number of member status updates made at each count.
+    status_updates = 50
+
+    @classmethod
+    def resource_setup(cls):
+        super().resource_setup()
+        cls.image = cls.create_image(**cls.image_fields('members',
+                                                        visibility='shared'))
+        cls.seeder = seeder.ImageSeeder(
+            cls.client, member_client=cls.image_member_client,
+            workers=CONF.glance_perf.workers)
+        cls.seeder.share(cls.image['id'], [cls.alt_tenant_id])
+        cls.alt_image_member_client.update_image_member(
+            cls.image['id'], cls.alt_tenant_id, status='accepted')
+
+    def _latencies(self, call, *args, **kwargs):
+        """Time a call in each round of PerfTest.repeat().
+
+        :returns: The result of the last call and the latency of each.
+        """
+        def timed():
+            start = time.monotonic()
+            result = call(*args, **kwargs)
+            return result, time.monotonic() - start
+
+        results, latencies = zip(*self.repeat(timed))
+        return results[-1], list(latencies)
+
+    def _update_status(self, status):
+        start = time.monotonic()
+        self.alt_image_member_client.update_image_member(
+            self.image['id'], self.alt_tenant_id, status=status)
+        return time.monotonic() - start
+
+    def _measure(self, count):
+        members, list_members = self._latencies(
+            self.image_member_client.list_image_members, self.image['id'])
+        self.assertEqual(count, len(members['members']))
+
+        statuses = ['pending', 'accepted'] * (self.status_updates // 2)
+        start = time.monotonic()
+        with futures.ThreadPoolExecutor(
+                max_workers=CONF.glance_perf.workers) as executor:
+            updates = list(executor.map(self._update_status, statuses))
+        elapsed = time.monotonic() - start
+        # The updates race, so make sure the image is left accepted.
+        self._update_status('accepted')
+
+        images, list_images = self._latencies(
+            self.alt_img_client.list_images, params={'visibility': 'shared'})
+        self.assertIn(self.image['id'],
+                      [image['id'] for image in images['images']])
+        return {
+            'members': count,
+            'list_image_members': {
+                'latency': benchmark.summarize(list_members),
+            },
+            'update_image_member': {
+                'updates': len(updates),
+                'updates_per_sec': len(updates) / elapsed,
+                'latency': benchmark.summarize(updates),
+            },
+            'list_images': {
+                'latency': benchmark.summarize(list_images),
+            },
+        }
+
+    @decorators.attr(type='slow')
+    @decorators.idempotent_id('192f05e4-0b3c-4172-b4ea-d21857b4f1c8')
+    def test_image_member_scaling(self):
+        results = []
+        latencies = []
+        member_quota = None
+        # The image starts shared with the alt project.
+        members = 1
+        for count in sorted(CONF.glance_perf.member_counts):
+            start = time.monotonic()
+            try:
+                self.seeder.share(self.image['id'],
+                                  [data_utils.rand_uuid_hex()
+                                   for _ in range(count - members)])
+            except exceptions.OverLimit:
+                # Every member was attempted, so the image is at the limit.
+                member_quota = len(self.image_member_client.list_image_members(
+                    self.image['id'])['members'])
+            share_time = time.monotonic() - start
+            members = member_quota or max(count, members)
+
+            result = self._measure(members)
+            result['share_time'] = share_time
+            results.append(result)
+            latencies += [('%s with %d members' % (api, members),
+                           result[api]['latency'])
+                          for api in ('list_image_members',
+                                      'update_image_member', 'list_images')]
+            if member_quota is not None:
+                break
+        self.publish('image_member_scaling', {
+            'member_quota': member_quota,
+            'results': results,
+        }, latencies)
@@ -0,0 +1,116 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import functools
+import time
+
+from tempest.api.image import base
+from tempest import config
+from tempest.lib.common.utils import test_utils
+from tempest.lib import decorators
+
+from glance_tempest_plugin.services import benchmark
+from glance_tempest_plugin.services import payload
+from glance_tempest_plugin.tests.scenario import base as perf_base
+
+CONF = config.CONF
+
+
+class ImageThroughputTest(perf_base.PerfTest, base.BaseV2ImageTest):
+    """Measure the throughput of image uploads and downloads.
+
+    Every combination of the [glance_perf] image_sizes and
+    concurrency_levels runs as a batch of transfers. Each transfer creates
+    an image, uploads its data, downloads it again and deletes the image.
+    The latencies, time to first byte and throughput of each batch are
+    published as the image_throughput report, and the upload and download
+    latencies are checked against latency_slo.
+    """
+
+    # The size of the chunks the downloads are read in.
+    chunk_size = 64 * 1024
+
+    def _create_image(self):
+        image = self.client.create_image(**self.image_fields('throughput'))
+        self.addCleanup(test_utils.call_and_ignore_notfound_exc,
+                        self.client.delete_image, image['id'])
+        return image
+
+    def _transfer(self, size):
+        image = self._create_image()
+        # The data is generated while it is sent, so the size of the
+        # images is not bounded by the memory of the test node.
+        data = payload.Payload(size, seed=image['id'], checksums=False)
+
+        start = time.monotonic()
+        self.client.store_image_file(image['id'], data)
+        upload = time.monotonic() - start
+
+        start = time.monotonic()
+        first_byte = None
+        received = 0
+        resp = self.client.show_image_file(image['id'], chunked=True)
+        try:
+            for chunk in resp.stream(self.chunk_size):
+                if first_byte is None:
+                    first_byte = time.monotonic() - start
+                received += len(chunk)
+        finally:
+            resp.release_conn()
+        download = time.monotonic() - start
+
+        self.assertEqual(size, received)
+        # Large images are deleted right away rather than when the test
+        # ends, so the batches don't pile up in the store.
+        self.client.delete_image(image['id'])
+        return upload, download, first_byte
+
+    def _run_batch(self, size, concurrency):
+        results, elapsed = self.repeat_concurrently(
+            functools.partial(self._transfer, size), concurrency)
+
+        uploads, downloads, first_bytes = zip(*results)
+        return {
+            'size_bytes': size,
+            'concurrency': concurrency,
+            'transfers': len(results),
+            'elapsed': elapsed,
+            # Both directions over the wall time of the whole batch.
+            'aggregate_mb_per_sec': benchmark.throughput(
+                2 * size * len(results), elapsed),
+            'upload': {
+                'latency': benchmark.summarize(uploads),
+                'mb_per_sec': benchmark.summarize(
+                    [benchmark.throughput(size, t) for t in uploads]),
+            },
+            'download': {
+                'latency': benchmark.summarize(downloads),
+                'time_to_first_byte': benchmark.summarize(first_bytes),
+                'mb_per_sec': benchmark.summarize(
+                    [benchmark.throughput(size, t) for t in downloads]),
+            },
+        }
+
+    @decorators.attr(type='slow')
+    @decorators.idempotent_id('ffd9618c-8784-4c2a-b4a5-06b0c8511bd3')
+    def test_image_throughput(self):
+        batches = []
+        latencies = []
+        for size in CONF.glance_perf.image_sizes:
+            for concurrency in CONF.glance_perf.concurrency_levels:
+                batch = self._run_batch(size * benchmark.MiB, concurrency)
+                batches.append(batch)
+                latencies += [
+                    ('%s of %d MiB at concurrency %d' %
+                     (direction, size, concurrency),
+                     batch[direction]['latency'])
+                    for direction in ('upload', 'download')]
+        self.publish('image_throughput', {'batches': batches}, latencies)
@@ -0,0 +1,126 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from concurrent import futures
+import functools
+import time
+
+from tempest.api.image import base
+from tempest import config
+from tempest.lib.common.utils import test_utils
+from tempest.lib import decorators
+from tempest.lib import exceptions
+
+from glance_tempest_plugin.services import benchmark
+from glance_tempest_plugin.services import concurrency
+from glance_tempest_plugin.services import payload
+from glance_tempest_plugin.tests.scenario import base as perf_base
+
+CONF = config.CONF
+
+
+class ImageTransitionLatencyTest(perf_base.PerfTest,
+                                 base.BaseV2ImageAdminTest):
+    """Measure how quickly images are deactivated and reactivated.
+
+    A pool of active images with data, one per worker at the highest
+    concurrency level, is created once. At each concurrency level, that
+    many images are cycled through deactivate and reactivate by an admin,
+    a cycle a round. After each transition the owner polls show_image
+    until it reports the new status.
+
+    The latency of the calls and the consistency window, from the call
+    returning to the owner seeing the new status, are published as the
+    image_transitions report.
+    """
+
+    # The interval the owner polls the status of the images at.
+    poll_interval = 0.01
+
+    @classmethod
+    def resource_setup(cls):
+        super().resource_setup()
+        size = min(CONF.glance_perf.image_sizes) * benchmark.MiB
+        builder = concurrency.FixtureBuilder(
+            cls.addClassResourceCleanup, max_workers=CONF.glance_perf.workers)
+        delete = functools.partial(test_utils.call_and_ignore_notfound_exc,
+                                   cls.client.delete_image)
+        for _ in range(max(CONF.glance_perf.concurrency_levels)):
+            builder.add(cls._create_active_image, size, cleanup=delete)
+        cls.images = builder.build()
+
+    @classmethod
+    def _create_active_image(cls, size):
+        image = cls.client.create_image(**cls.image_fields('transition'))
+        cls.client.store_image_file(
+            image['id'], payload.Payload(size, seed=image['id'],
+                                         checksums=False))
+        return image['id']
+
+    def _transition(self, image_id, action, status):
+        """Apply an action and wait for the owner to see its status.
+
+        :returns: The latency of the call and the consistency window.
+        """
+        start = time.monotonic()
+        getattr(self.admin_client, action)(image_id)
+        returned = time.monotonic()
+        while self.client.show_image(image_id)['status'] != status:
+            if time.monotonic() - returned > CONF.image.build_timeout:
+                raise exceptions.TimeoutException(
+                    'Image %s did not become %s within %ds' %
+                    (image_id, status, CONF.image.build_timeout))
+            time.sleep(self.poll_interval)
+        return returned - start, time.monotonic() - returned
+
+    def _cycle(self, image_id):
+        def cycle():
+            return {
+                'deactivate': self._transition(image_id, 'deactivate_image',
+                                               'deactivated'),
+                'reactivate': self._transition(image_id, 'reactivate_image',
+                                               'active'),
+            }
+        return self.repeat(cycle)
+
+    def _run_level(self, concurrency_level):
+        start = time.monotonic()
+        with futures.ThreadPoolExecutor(
+                max_workers=concurrency_level) as executor:
+            cycles = list(executor.map(self._cycle,
+                                       self.images[:concurrency_level]))
+        elapsed = time.monotonic() - start
+
+        report = {'concurrency': concurrency_level, 'elapsed': elapsed}
+        for action in ('deactivate', 'reactivate'):
+            transitions = [rounds[action] for cycle in cycles
+                           for rounds in cycle]
+            latencies, windows = zip(*transitions)
+            report[action] = {
+                'transitions': len(transitions),
+                'latency': benchmark.summarize(latencies),
+                'consistency_window': benchmark.summarize(windows),
+            }
+        return report
+
+    @decorators.attr(type='slow')
+    @decorators.idempotent_id('3a5150bf-4c48-4700-93df-1e8213e69ac5')
+    def test_transition_latency(self):
+        levels = []
+        latencies = []
+        for concurrency_level in CONF.glance_perf.concurrency_levels:
+            level = self._run_level(concurrency_level)
+            levels.append(level)
+            latencies += [('%s_image at concurrency %d' % (action,
+                                                           concurrency_level),
+                           level[action]['latency'])
+                          for action in ('deactivate', 'reactivate')]
+        self.publish('image_transitions', {'levels': levels}, latencies)
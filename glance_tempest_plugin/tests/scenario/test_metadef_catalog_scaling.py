@@ -0,0 +1,190 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import itertools
+import json
+import time
+from urllib import parse
+
+from tempest.api.image import base
+from tempest import config
+from tempest.lib import decorators
+
+from glance_tempest_plugin.services import benchmark
+from glance_tempest_plugin.services import seeder
+from glance_tempest_plugin.tests.scenario import base as perf_base
+
+CONF = config.CONF
+
+
+class MetadefCatalogScalingTest(perf_base.PerfTest, base.BaseV2ImageAdminTest):
+    """Measure the metadef calls against a large catalog.
+
+    A catalog of [glance_perf] metadef_namespaces namespaces, each with
+    metadef_objects objects, metadef_properties properties, metadef_tags
+    tags and a resource type association, is created by an admin. Half the
+    namespaces are public.
+
+    The namespaces are then listed, with and without visibility and
+    resource type filters, by the admin and by a user, who only sees the
+    public ones. The list and show calls of each resource type are timed
+    against the namespaces in turn. The latencies are published as the
+    metadef_catalog_scaling report.
+    """
+
+    # The resource types the namespaces are associated with, in turn.
+    resource_types = ['OS::Glance::Image', 'OS::Cinder::Volume',
+                      'OS::Nova::Flavor']
+
+    @classmethod
+    def resource_setup(cls):
+        super().resource_setup()
+        cls.seeder = seeder.MetadefSeeder(
+            cls.namespaces_client, cls.namespace_objects_client,
+            cls.namespace_properties_client, cls.namespace_tags_client,
+            cls.resource_types_client, workers=CONF.glance_perf.workers)
+        cls.addClassResourceCleanup(cls.seeder.cleanup)
+
+        start = time.monotonic()
+        cls.namespaces = cls.seeder.seed(
+            CONF.glance_perf.metadef_namespaces,
+            objects=CONF.glance_perf.metadef_objects,
+            properties=CONF.glance_perf.metadef_properties,
+            tags=CONF.glance_perf.metadef_tags,
+            visibilities={'public': 1, 'private': 1},
+            resource_types=cls.resource_types,
+            name_prefix='catalog')
+        cls.seed_time = time.monotonic() - start
+
+    def _list_namespaces(self, client, params):
+        """Page through the namespaces matching params.
+
+        The namespaces client takes no filters, so the calls are made
+        through its get().
+
+        :returns: The number of namespaces listed and the latency of each
+                  page.
+        """
+        url = 'metadefs/namespaces'
+        if params:
+            url += '?' + parse.urlencode(params)
+        listed = 0
+        latencies = []
+        while url:
+            start = time.monotonic()
+            resp, body = client.get(url)
+            latencies.append(time.monotonic() - start)
+            client.expected_success(200, resp.status)
+            body = json.loads(body)
+            listed += len(body['namespaces'])
+            url = None
+            if 'next' in body:
+                url = body['next'].replace('/v2/', '', 1)
+        return listed, latencies
+
+    def _measure_list(self, persona, client, params):
+        def timed():
+            start = time.monotonic()
+            listed, page_latencies = self._list_namespaces(client, params)
+            return listed, page_latencies, time.monotonic() - start
+
+        listed, page_latencies, elapsed = zip(*self.repeat(timed))
+        latencies = [latency for latencies in page_latencies
+                     for latency in latencies]
+        return {
+            'persona': persona,
+            'params': params,
+            'namespaces': listed[-1],
+            'pages': len(latencies) // len(elapsed),
+            'latency': benchmark.summarize(elapsed),
+            'page_latency': benchmark.summarize(latencies),
+        }
+
+    def _calls(self):
+        """Return the calls to time, by API, taking a namespace name."""
+        calls = {
+            'show_namespace': self.namespaces_client.show_namespace,
+            'list_resource_type_association':
+                self.resource_types_client.list_resource_type_association,
+        }
+        objects = self.namespace_objects_client
+        properties = self.namespace_properties_client
+        tags = self.namespace_tags_client
+        if CONF.glance_perf.metadef_objects:
+            calls.update(
+                list_namespace_objects=objects.list_namespace_objects,
+                show_namespace_object=lambda namespace: (
+                    objects.show_namespace_object(namespace, 'object-0')))
+        if CONF.glance_perf.metadef_properties:
+            calls.update(
+                list_namespace_properties=(
+                    properties.list_namespace_properties),
+                show_namespace_properties=lambda namespace: (
+                    properties.show_namespace_properties(namespace,
+                                                         'property-0')))
+        if CONF.glance_perf.metadef_tags:
+            calls.update(
+                list_namespace_tags=tags.list_namespace_tags,
+                show_namespace_tag=lambda namespace: (
+                    tags.show_namespace_tag(namespace, 'tag-0')))
+        return calls
+
+    def _measure_call(self, call):
+        namespaces = itertools.cycle(self.namespaces)
+
+        def timed():
+            namespace = next(namespaces)
+            start = time.monotonic()
+            call(namespace)
+            return time.monotonic() - start
+
+        return benchmark.summarize(self.repeat(timed))
+
+    @decorators.attr(type='slow')
+    @decorators.idempotent_id('7b0a2dba-2ec5-4e4b-a491-28f066e24dec')
+    def test_metadef_catalog_scaling(self):
+        queries = [
+            {},
+            {'visibility': 'public'},
+            {'resource_types': self.resource_types[0]},
+            {'visibility': 'public',
+             'resource_types': self.resource_types[0]},
+        ]
+        lists = []
+        for persona, client in [
+                ('admin', self.namespaces_client),
+                ('user', self.os_primary.namespaces_client)]:
+            lists += [self._measure_list(persona, client, params)
+                      for params in queries]
+        # Every namespace seeded is visible to the admin.
+        self.assertGreaterEqual(lists[0]['namespaces'],
+                                len(self.namespaces))
+
+        calls = dict((api, {'latency': self._measure_call(call)})
+                     for api, call in self._calls().items())
+
+        latencies = [('list_namespaces %s as %s' % (result['params'],
+                                                    result['persona']),
+                      result['page_latency'])
+                     for result in lists]
+        latencies += [(api, result['latency'])
+                      for api, result in sorted(calls.items())]
+        self.publish('metadef_catalog_scaling', {
+            'catalog': {
+                'namespaces': len(self.namespaces),
+                'objects': CONF.glance_perf.metadef_objects,
+                'properties': CONF.glance_perf.metadef_properties,
+                'tags': CONF.glance_perf.metadef_tags,
+                'seed_time': self.seed_time,
+            },
+            'list_namespaces': lists,
+            'calls': calls,
+        }, latencies)
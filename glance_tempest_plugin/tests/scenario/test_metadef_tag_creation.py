@@ -0,0 +1,139 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from concurrent import futures
+import json
+import time
+
+from tempest.api.image import base
+from tempest import config
+from tempest.lib import decorators
+
+from glance_tempest_plugin.services import benchmark
+from glance_tempest_plugin.services import seeder
+from glance_tempest_plugin.tests.scenario import base as perf_base
+
+CONF = config.CONF
+
+
+class MetadefTagCreationTest(perf_base.PerfTest, base.BaseV2ImageAdminTest):
+    """Compare creating metadef tags in bulk and one at a time.
+
+    For each of the [glance_perf] tag_counts, that many tags are created in
+    a new namespace in several ways:
+
+    * bulk: a single create_namespace_tags call.
+    * batch_<size>: create_namespace_tags calls of tag_batch_sizes tags,
+      appending to the tags created by the previous ones.
+    * per_tag: a create_namespace_tag call per tag, from the [glance_perf]
+      workers concurrent workers.
+
+    The number of calls, the time taken to create all the tags, the tags
+    created per second and the latency of the calls are published as the
+    metadef_tag_creation report. The latencies of the calls of each mode
+    are checked against latency_slo.
+    """
+
+    @classmethod
+    def resource_setup(cls):
+        super().resource_setup()
+        cls.seeder = seeder.MetadefSeeder(
+            cls.namespaces_client, cls.namespace_objects_client,
+            cls.namespace_properties_client, cls.namespace_tags_client,
+            workers=CONF.glance_perf.workers)
+        cls.addClassResourceCleanup(cls.seeder.cleanup)
+
+    def _create_tags(self, namespace, names, append=False):
+        """Create tags with a create_namespace_tags call.
+
+        The tags client doesn't send the X-Openstack-Append header, so the
+        call is made through its post().
+        """
+        client = self.namespace_tags_client
+        headers = {'X-Openstack-Append': 'True'} if append else None
+        resp, body = client.post(
+            'metadefs/namespaces/%s/tags' % namespace,
+            json.dumps({'tags': [{'name': name} for name in names]}),
+            headers=headers, extra_headers=True)
+        client.expected_success(201, resp.status)
+
+    def _batches(self, batch_size):
+        def create(namespace, names):
+            latencies = []
+            for first in range(0, len(names), batch_size):
+                start = time.monotonic()
+                self._create_tags(namespace,
+                                  names[first:first + batch_size],
+                                  append=first > 0)
+                latencies.append(time.monotonic() - start)
+            return latencies
+        return create
+
+    def _per_tag(self, namespace, names):
+        def create(name):
+            start = time.monotonic()
+            self.namespace_tags_client.create_namespace_tag(namespace, name)
+            return time.monotonic() - start
+
+        with futures.ThreadPoolExecutor(
+                max_workers=CONF.glance_perf.workers) as executor:
+            return list(executor.map(create, names))
+
+    def _measure(self, count, create):
+        """Time creating count tags in new namespaces.
+
+        :param create: A callable creating tags in a namespace and returning
+                       the latency of each call it made.
+        """
+        names = ['tag-%d' % i for i in range(count)]
+
+        def timed():
+            namespace = self.seeder.seed(1, name_prefix='tags')[0]
+            start = time.monotonic()
+            latencies = create(namespace, names)
+            elapsed = time.monotonic() - start
+            # Unlike the tag list, the namespace isn't paginated.
+            tags = self.namespaces_client.show_namespace(namespace)['tags']
+            self.assertEqual(sorted(names),
+                             sorted(tag['name'] for tag in tags))
+            return latencies, elapsed
+
+        calls, elapsed = zip(*self.repeat(timed))
+        latencies = [latency for latencies in calls for latency in latencies]
+        return {
+            'requests': len(latencies) // len(elapsed),
+            'elapsed': benchmark.summarize(elapsed),
+            'tags_per_sec': count * len(elapsed) / sum(elapsed),
+            'request_latency': benchmark.summarize(latencies),
+        }
+
+    @decorators.attr(type='slow')
+    @decorators.idempotent_id('c5a7c473-3491-480a-911e-2fed01b0ef76')
+    def test_metadef_tag_creation(self):
+        results = []
+        latencies = []
+        for count in sorted(CONF.glance_perf.tag_counts):
+            modes = {'bulk': self._batches(count),
+                     'per_tag': self._per_tag}
+            for batch_size in CONF.glance_perf.tag_batch_sizes:
+                if batch_size < count:
+                    modes['batch_%d' % batch_size] = self._batches(
+                        batch_size)
+            results.append({
+                'tags': count,
+                'modes': dict((mode, self._measure(count, create))
+                              for mode, create in sorted(modes.items())),
+            })
+            latencies += [('%s creation of %d tags' % (mode, count),
+                           result['request_latency'])
+                          for mode, result in sorted(
+                              results[-1]['modes'].items())]
+        self.publish('metadef_tag_creation', {'results': results}, latencies)